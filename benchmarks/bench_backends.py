@@ -0,0 +1,70 @@
+"""Compare the ctypes and cffi backends on small and large batches.
+
+Run with each interpreter of interest, e.g.:
+
+    python benchmarks/bench_backends.py
+    pypy3 benchmarks/bench_backends.py
+
+Each backend is measured in a fresh subprocess, selected with the HYPERHYPHEN_BACKEND environment variable.
+The package is imported from this source tree, so build it in place first (`python setup.py build_ext --inplace`).
+"""
+import argparse
+import os
+import pathlib
+import random
+import subprocess
+import sys
+import timeit
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+DICTIONARY = ROOT / "tests" / "hyph_en_US.dic"
+
+SENTENCE = "The internationalization committee discussed telecommunications infrastructure modernization"
+
+
+def measure(dictionary, repeat):
+    from hyperhyphen import Hyphenator
+    from hyperhyphen._lib import BACKEND
+
+    h = Hyphenator(mode="int", dictionary=dictionary)
+    rng = random.Random(0)
+    words = SENTENCE.split()
+    large = ' '.join(rng.choice(words) for _ in range(100_000))
+
+    small_time = min(timeit.repeat(lambda: h(SENTENCE), number=10_000, repeat=repeat)) / 10_000
+    large_time = min(timeit.repeat(lambda: h(large), number=1, repeat=repeat))
+    tokens_time = min(timeit.repeat(lambda: h.hyphenate_tokens(large.split()), number=1, repeat=repeat))
+
+    print(f"{sys.implementation.name:8} {BACKEND:7} "
+          f"small: {small_time * 1e6:8.1f} us/call   "
+          f"large: {100_000 / large_time:12,.0f} words/s   "
+          f"tokens: {100_000 / tokens_time:12,.0f} words/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dictionary", default=str(DICTIONARY))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--backend", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.backend:
+        measure(args.dictionary, args.repeat)
+        return
+
+    for backend in ("ctypes", "cffi"):
+        pythonpath = os.pathsep.join(filter(None, [str(ROOT), os.environ.get("PYTHONPATH")]))
+        env = {**os.environ, "HYPERHYPHEN_BACKEND": backend, "PYTHONPATH": pythonpath}
+        result = subprocess.run(
+            [sys.executable, __file__, "--backend", backend, "--dictionary", args.dictionary,
+             "--repeat", str(args.repeat)],
+            env=env, capture_output=True, text=True,
+        )
+        if result.returncode:
+            print(f"{sys.implementation.name:8} {backend:7} not available: {result.stderr.strip().splitlines()[-1]}")
+        else:
+            print(result.stdout, end="")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Measure the hyphenation throughput of a two-level (compound) dictionary.
+
+A German-style dictionary is generated with compound boundary patterns for a set of word stems on its first
+level and the en_US patterns on its second level, and words made of one to four stems are hyphenated with it
+and with the plain en_US dictionary:
+
+    python benchmarks/bench_compound.py
+
+The package is imported from this source tree, so build it in place first (`python setup.py build_ext --inplace`).
+Run the script on two builds to compare them.
+"""
+import argparse
+import pathlib
+import random
+import sys
+import tempfile
+import timeit
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from hyperhyphen._lib import free_dictionary, hyphenate_tokens, open_dictionary  # noqa: E402
+
+DICTIONARY = ROOT / "tests" / "hyph_en_US.dic"
+
+STEMS = ["donau", "dampf", "schiff", "fahrt", "gesellschaft", "kapitän", "haus", "tür", "schlüssel", "bund",
+         "bahn", "post", "amt", "leiter", "zimmer", "wasser", "kraft", "werk", "straße", "bau"]
+
+
+def write_dictionary(directory, patterns):
+    path = pathlib.Path(directory) / "hyph_compound.dic"
+    lines = ["UTF-8", "COMPOUNDLEFTHYPHENMIN 2", "COMPOUNDRIGHTHYPHENMIN 2"]
+    lines += [stem + "1" for stem in STEMS]
+    lines += ["NEXTLEVEL", patterns]
+    path.write_text("\n".join(lines), encoding="utf-8")
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dictionary", default=str(DICTIONARY), help="single-level dictionary with the patterns")
+    parser.add_argument("--words", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    patterns = pathlib.Path(args.dictionary).read_text(encoding="utf-8").split("\n", 1)[1]
+    rng = random.Random(0)
+    words = ["".join(rng.choice(STEMS) for _ in range(rng.randint(1, 4))) + rng.choice(["", "", "s", "es"])
+             for _ in range(args.words)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name, path in (("en_US", args.dictionary), ("compound", write_dictionary(directory, patterns))):
+            dict_ptr = open_dictionary(str(path))
+            try:
+                hyphenate_tokens(dict_ptr, words)  # warm up
+                elapsed = min(timeit.repeat(lambda: hyphenate_tokens(dict_ptr, words), number=1, repeat=args.repeat))
+            finally:
+                free_dictionary(dict_ptr)
+            print(f"{name:10} {len(words) / elapsed:12,.0f} words/s")
+
+
+if __name__ == "__main__":
+    main()
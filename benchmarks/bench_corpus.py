@@ -0,0 +1,84 @@
+"""Compare the corpus runner with hyphenating files one by one into JSON lists of spans.
+
+Random texts made of words of the dictionary are written to many files, which are then hyphenated
+
+- one by one: every file is read, hyphenated in "spans" mode and written out as a JSON list, as a script around
+  `Hyphenator` does;
+- with `run_corpus`: the files are grouped into shards that are hyphenated with one native call each and written as
+  binary break arrays.
+
+    python benchmarks/bench_corpus.py --files 2000 --jobs 1,4
+
+The package is imported from this source tree, so build it in place first (`python setup.py build_ext --inplace`).
+"""
+import argparse
+import json
+import os
+import pathlib
+import random
+import string
+import sys
+import tempfile
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from hyperhyphen import Hyphenator  # noqa: E402
+from hyperhyphen.corpus import run_corpus  # noqa: E402
+
+DICTIONARY = ROOT / "tests" / "hyph_en_US.dic"
+
+
+def size_of(directory):
+    return sum(path.stat().st_size for path in pathlib.Path(directory).rglob("*") if path.is_file())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dictionary", default=str(DICTIONARY))
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--words", type=int, default=1000, help="words per file")
+    parser.add_argument("--jobs", default="1")
+    parser.add_argument("--shard-size", type=int, default=16, help="MiB of input per shard")
+    args = parser.parse_args()
+
+    patterns = pathlib.Path(args.dictionary).read_text(encoding="utf-8").split("\n", 1)[1]
+    vocabulary = [w for w in patterns.translate(str.maketrans("", "", string.digits)).split()
+                  if len(w) > 3 and w.isalpha()]
+    rng = random.Random(0)
+
+    with tempfile.TemporaryDirectory() as directory:
+        corpus = pathlib.Path(directory) / "corpus"
+        corpus.mkdir()
+        files = []
+        for i in range(args.files):
+            path = corpus / f"doc{i:06d}.txt"
+            lines = (" ".join(rng.choice(vocabulary) + rng.choice(vocabulary) for _ in range(10))
+                     for _ in range(args.words // 10))
+            path.write_text("\n".join(lines), encoding="utf-8")
+            files.append(str(path))
+        n_bytes = size_of(corpus)
+        print(f"{args.files} files, {n_bytes / 1e6:.1f} MB, {os.cpu_count()} CPUs")
+
+        hyphenator = Hyphenator(mode="spans", dictionary=args.dictionary)
+        output = pathlib.Path(directory) / "json"
+        output.mkdir()
+        start = time.perf_counter()
+        for path in files:
+            text = pathlib.Path(path).read_text(encoding="utf-8")
+            with open(output / (pathlib.Path(path).name + ".json"), "w") as f:
+                json.dump(hyphenator(text.strip()), f)
+        elapsed = time.perf_counter() - start
+        print(f"one by one, JSON spans:   {args.files / elapsed:10,.0f} files/s {n_bytes / 1e6 / elapsed:7.1f} MB/s"
+              f"   output {size_of(output) / 1e6:7.1f} MB")
+
+        for jobs in map(int, args.jobs.split(",")):
+            output = pathlib.Path(directory) / f"shards{jobs}"
+            stats = run_corpus(output, files, dictionary=args.dictionary, jobs=jobs, shard_bytes=args.shard_size << 20)
+            print(f"run_corpus, {jobs:2} jobs:      {stats['files_per_second']:10,.0f} files/s "
+                  f"{stats['bytes_per_second'] / 1e6:7.1f} MB/s   output {size_of(output) / 1e6:7.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Measure the native hyphenation throughput of every output kind.
+
+A word list is hyphenated in a single native call per output kind: the hyphenation vector ("-n"), the
+standard-only hyphenated word ("-s"), the chunk lengths ("-nn"), the hyphenated word (default) and the
+chunk lengths of the tokens API. Python-side encoding and decoding are left out of the timing:
+
+    python benchmarks/bench_modes.py
+
+The package is imported from this source tree, so build it in place first (`python setup.py build_ext --inplace`).
+Run the script on two builds to compare them.
+"""
+import argparse
+import pathlib
+import random
+import string
+import sys
+import timeit
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from hyperhyphen._lib import (  # noqa: E402
+    _new_buffer, _new_int, _ref, free_dictionary, hyphenate_tokens, libhyphenate, open_dictionary,
+)
+
+DICTIONARY = ROOT / "tests" / "hyph_en_US.dic"
+
+# (optn, opts, optnn, optdd) of parse_words_from
+MODES = {
+    "vector (-n)": (1, 0, 0, 0),
+    "standard (-s)": (0, 1, 0, 0),
+    "chunks (-nn)": (0, 0, 1, 0),
+    "hyphenated": (0, 0, 0, 0),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dictionary", default=str(DICTIONARY))
+    parser.add_argument("--words", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    patterns = pathlib.Path(args.dictionary).read_text(encoding="utf-8").split("\n", 1)[1]
+    vocabulary = [w for w in patterns.translate(str.maketrans("", "", string.digits)).split()
+                  if len(w) > 3 and w.isalpha()]
+    rng = random.Random(0)
+    words = [rng.choice(vocabulary) + rng.choice(vocabulary) for _ in range(args.words)]
+    data = "\0".join(words).encode("utf-8")
+    capacity = len(data) * 4 + 64
+    buffer = _new_buffer(capacity)
+    written = _new_int()
+
+    dict_ptr = open_dictionary(args.dictionary)
+    try:
+        for name, options in MODES.items():
+            def run():
+                position = _new_int()
+                done = libhyphenate.parse_words_from(
+                    dict_ptr, data, len(words), 0, _ref(position), buffer, capacity, _ref(written), *options
+                )
+                assert done == len(words)
+
+            run()  # warm up
+            elapsed = min(timeit.repeat(run, number=1, repeat=args.repeat))
+            print(f"{name:16} {len(words) / elapsed:12,.0f} words/s")
+
+        hyphenate_tokens(dict_ptr, words)
+        elapsed = min(timeit.repeat(lambda: hyphenate_tokens(dict_ptr, words), number=1, repeat=args.repeat))
+        print(f"{'tokens':16} {len(words) / elapsed:12,.0f} words/s")
+    finally:
+        free_dictionary(dict_ptr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Measure the cost of NOHYPHEN entries on hyphenation throughput.
+
+Two-level dictionaries are generated from the en_US patterns with NOHYPHEN lists of growing size on their
+first level, and a word list is hyphenated with each of them:
+
+    python benchmarks/bench_nohyphen.py
+
+The package is imported from this source tree, so build it in place first (`python setup.py build_ext --inplace`).
+Run the script on two builds to compare them.
+"""
+import argparse
+import itertools
+import pathlib
+import random
+import string
+import sys
+import tempfile
+import timeit
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from hyperhyphen._lib import free_dictionary, hyphenate_tokens, open_dictionary  # noqa: E402
+
+DICTIONARY = ROOT / "tests" / "hyph_en_US.dic"
+
+# The defaults of a single-level dictionary, followed by letter pairs that occur in English words
+DEFAULT_ENTRIES = ["'", "–", "’", "-"]
+
+
+# The loader reads lines of less than 100 bytes, which bounds the NOHYPHEN list
+MAX_LINE = 98
+
+
+def nohyphen_entries(n):
+    pairs = (''.join(p) for p in itertools.product(string.ascii_lowercase, repeat=2))
+    entries = (DEFAULT_ENTRIES + [p for p in pairs if p[0] != p[1]])[:n]
+    while len(("NOHYPHEN " + ",".join(entries)).encode("utf-8")) > MAX_LINE:
+        entries.pop()
+    return entries
+
+
+def write_dictionary(directory, patterns, entries):
+    path = pathlib.Path(directory) / f"hyph_nohyphen_{len(entries)}.dic"
+    lines = ["UTF-8"]
+    if entries:
+        lines.append("NOHYPHEN " + ",".join(entries))
+    lines += ["1-1", "1'1", "NEXTLEVEL", patterns]
+    path.write_text("\n".join(lines), encoding="utf-8")
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dictionary", default=str(DICTIONARY), help="single-level dictionary with the patterns")
+    parser.add_argument("--sizes", default="0,4,12,26", help="numbers of NOHYPHEN entries to measure")
+    parser.add_argument("--words", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    patterns = pathlib.Path(args.dictionary).read_text(encoding="utf-8").split("\n", 1)[1]
+    rng = random.Random(0)
+    # Word material made of pattern letters
+    vocabulary = [w for w in patterns.translate(str.maketrans("", "", string.digits)).split()
+                  if len(w) > 3 and w.isalpha()]
+    words = [rng.choice(vocabulary) + rng.choice(["", "-", "'s", "ing", "’s"]) + rng.choice(vocabulary)
+             for _ in range(args.words)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        for n in map(int, args.sizes.split(",")):
+            entries = nohyphen_entries(n)
+            path = write_dictionary(directory, patterns, entries)
+            dict_ptr = open_dictionary(str(path))
+            try:
+                hyphenate_tokens(dict_ptr, words)  # warm up
+                elapsed = min(timeit.repeat(lambda: hyphenate_tokens(dict_ptr, words), number=1, repeat=args.repeat))
+            finally:
+                free_dictionary(dict_ptr)
+            print(f"NOHYPHEN entries: {len(entries):4}   {len(words) / elapsed:12,.0f} words/s")
+
+
+if __name__ == "__main__":
+    main()
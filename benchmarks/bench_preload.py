@@ -0,0 +1,89 @@
+"""Measure the time to load many dictionaries at startup, one by one and with `preload` on several threads.
+
+Copies of a dictionary stand for the dictionaries of many languages. Every run loads fresh copies, as a
+dictionary is only loaded once per process:
+
+    python benchmarks/bench_preload.py --dictionaries 24 --workers 1,2,4,8
+
+The native loader releases the GIL, so the loads overlap on machines with several cores. A Python thread
+counts while the dictionaries load, to show that it is not blocked by the loads.
+
+The package is imported from this source tree, so build it in place first (`python setup.py build_ext --inplace`).
+"""
+import argparse
+import os
+import pathlib
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from hyperhyphen import Hyphenator, preload  # noqa: E402
+
+DICTIONARY = ROOT / "tests" / "hyph_en_US.dic"
+
+
+def copies(directory, content, n, run):
+    paths = []
+    for i in range(n):
+        path = pathlib.Path(directory) / f"hyph_run{run}_{i}.dic"
+        path.write_bytes(content + f"% copy {run} {i}\n".encode())
+        paths.append(str(path))
+    return paths
+
+
+def count_while(func):
+    """Run func while a Python thread counts, return (seconds, counts per second)."""
+    done = threading.Event()
+    count = 0
+
+    def counter():
+        nonlocal count
+        while not done.is_set():
+            count += 1
+
+    thread = threading.Thread(target=counter)
+    thread.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    done.set()
+    thread.join()
+    return elapsed, count / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dictionary", default=str(DICTIONARY))
+    parser.add_argument("--dictionaries", type=int, default=24, help="number of dictionaries to load")
+    parser.add_argument("--workers", default=f"1,2,4,{os.cpu_count() or 1}")
+    args = parser.parse_args()
+
+    content = pathlib.Path(args.dictionary).read_bytes()
+    print(f"{args.dictionaries} dictionaries of {len(content) / 1024:.0f} KiB, {os.cpu_count()} CPUs")
+    with tempfile.TemporaryDirectory() as directory:
+        paths = copies(directory, content, args.dictionaries, "sequential")
+        elapsed, counts = count_while(lambda: [Hyphenator(dictionary=path) for path in paths])
+        print(f"one by one:     {elapsed * 1e3:8.1f} ms   Python thread {counts:12,.0f} counts/s")
+
+        for workers in map(int, args.workers.split(",")):
+            paths = copies(directory, content, args.dictionaries, workers)
+            loaded = {}
+            elapsed, counts = count_while(lambda: loaded.update(preload(dictionaries=paths, workers=workers)))
+            memory = sum(info["memory"] for info in loaded.values())
+            slowest = max(info["load_time"] for info in loaded.values())
+            print(f"workers: {workers:3}   {elapsed * 1e3:8.1f} ms   Python thread {counts:12,.0f} counts/s   "
+                  f"slowest load {slowest * 1e3:6.1f} ms, {memory / 1024:,.0f} KiB in total")
+
+            start = time.perf_counter()
+            for path in paths:
+                Hyphenator(dictionary=path)
+            print(f"               Hyphenators of the preloaded dictionaries: "
+                  f"{(time.perf_counter() - start) / len(paths) * 1e6:.0f} us each")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Measure how many break candidates a line breaker keeps at each pattern priority threshold.
+
+Random compound words are hyphenated in one batch with the priority of every break, and the candidates of at
+least each priority are counted. The single-word `best_break` call is timed for every threshold:
+
+    python benchmarks/bench_priorities.py
+
+The package is imported from this source tree, so build it in place first (`python setup.py build_ext --inplace`).
+"""
+import argparse
+import collections
+import pathlib
+import random
+import string
+import sys
+import timeit
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from hyperhyphen._lib import best_break, free_dictionary, hyphenate_tokens, open_dictionary  # noqa: E402
+
+DICTIONARY = ROOT / "tests" / "hyph_en_US.dic"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dictionary", default=str(DICTIONARY))
+    parser.add_argument("--words", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    patterns = pathlib.Path(args.dictionary).read_text(encoding="utf-8").split("\n", 1)[1]
+    vocabulary = [w for w in patterns.translate(str.maketrans("", "", string.digits)).split()
+                  if len(w) > 3 and w.isalpha()]
+    rng = random.Random(0)
+    words = [rng.choice(vocabulary) + rng.choice(vocabulary) for _ in range(args.words)]
+
+    dict_ptr = open_dictionary(args.dictionary)
+    try:
+        _, _, priorities = hyphenate_tokens(dict_ptr, words, priorities=True)
+        counts = collections.Counter(p for p in priorities if p)
+        total = sum(counts.values())
+        sample = words[:10_000]
+        for min_priority in (1, 3, 5, 7, 9):
+            kept = sum(n for p, n in counts.items() if p >= min_priority)
+            elapsed = min(timeit.repeat(
+                lambda: [best_break(dict_ptr, w, len(w) // 2, min_priority) for w in sample], number=1,
+                repeat=args.repeat,
+            ))
+            print(f"priority >= {min_priority}   {kept / len(words):6.2f} breaks/word ({kept / total:6.1%})"
+                  f"   best_break {len(sample) / elapsed:12,.0f} words/s")
+    finally:
+        free_dictionary(dict_ptr)
+
+
+if __name__ == "__main__":
+    main()
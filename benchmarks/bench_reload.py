@@ -0,0 +1,92 @@
+"""Measure the hyphenation throughput while the dictionary is reloaded under load.
+
+Threads hyphenate texts with a shared Hyphenator and count the words done in every window of time, first
+without reloads, then while the dictionary is reloaded at a fixed period:
+
+    python benchmarks/bench_reload.py --threads 4 --period 0.5
+
+Calls keep the dictionary they started with, so the throughput of the windows with a reload should match
+the others, apart from the CPU time that the background load takes from the hyphenating threads.
+
+The package is imported from this source tree, so build it in place first (`python setup.py build_ext --inplace`).
+"""
+import argparse
+import os
+import pathlib
+import random
+import statistics
+import string
+import sys
+import threading
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from hyperhyphen import Hyphenator  # noqa: E402
+
+DICTIONARY = ROOT / "tests" / "hyph_en_US.dic"
+
+
+def measure(hyphenator, texts, n_threads, seconds, window, period):
+    """Return the words per second of every window, reloading the dictionary every period seconds if given."""
+    words_per_text = len(texts[0].split())
+    done = [0] * n_threads
+    stop = threading.Event()
+
+    def work(i):
+        while not stop.is_set():
+            hyphenator(texts[done[i] % len(texts)])
+            done[i] += 1
+
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(n_threads)]
+    for thread in threads:
+        thread.start()
+    rates, reloads = [], 0
+    start = last_reload = time.perf_counter()
+    previous = 0
+    while time.perf_counter() - start < seconds:
+        time.sleep(window)
+        now, total = time.perf_counter(), sum(done)
+        rates.append((total - previous) * words_per_text / window)
+        previous = total
+        if period and now - last_reload >= period:
+            hyphenator.reload()
+            last_reload = now
+            reloads += 1
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return rates, reloads
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dictionary", default=str(DICTIONARY))
+    parser.add_argument("--threads", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--window", type=float, default=0.1, help="seconds per throughput sample")
+    parser.add_argument("--period", type=float, default=0.5, help="seconds between reloads")
+    parser.add_argument("--words", type=int, default=100, help="words per text")
+    args = parser.parse_args()
+
+    patterns = pathlib.Path(args.dictionary).read_text(encoding="utf-8").split("\n", 1)[1]
+    vocabulary = [w for w in patterns.translate(str.maketrans("", "", string.digits)).split()
+                  if len(w) > 3 and w.isalpha()]
+    rng = random.Random(0)
+    texts = [" ".join(rng.choice(vocabulary) + rng.choice(vocabulary) for _ in range(args.words))
+             for _ in range(200)]
+
+    hyphenator = Hyphenator(mode="int", dictionary=args.dictionary)
+    start = time.perf_counter()
+    hyphenator.reload()
+    print(f"reload: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    for name, period in (("steady", 0), ("reloading", args.period)):
+        rates, reloads = measure(hyphenator, texts, args.threads, args.seconds, args.window, period)
+        print(f"{name:10} {statistics.median(rates):12,.0f} words/s median   {min(rates):12,.0f} words/s lowest"
+              f"   {reloads} reloads")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Load test of the hyphenation server against in-process calls.
+
+A server is started in a subprocess on a Unix socket, and client threads send requests of a few words, each
+thread waiting for its response before sending the next one (or keeping --depth requests in flight). The same
+requests are then hyphenated in-process by the same number of threads:
+
+    python benchmarks/bench_server.py --threads 8 --words 20
+
+Latency percentiles are per request, throughput is in words per second over all threads.
+
+The package is imported from this source tree, so build it in place first (`python setup.py build_ext --inplace`).
+"""
+import argparse
+import collections
+import concurrent.futures
+import os
+import pathlib
+import random
+import statistics
+import string
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from hyperhyphen import Hyphenator  # noqa: E402
+from hyperhyphen.server import HyphenationClient  # noqa: E402
+
+DICTIONARY = ROOT / "tests" / "hyph_en_US.dic"
+
+
+def run(call, requests, n_threads, depth):
+    """Submit requests from n_threads threads with depth of them in flight each, return (elapsed, latencies)."""
+    latencies = []
+    barrier = threading.Barrier(n_threads + 1)
+
+    def work(part):
+        barrier.wait()
+        in_flight = collections.deque()
+        for words in part:
+            in_flight.append((time.perf_counter(), call(words)))
+            if len(in_flight) >= depth:
+                start, future = in_flight.popleft()
+                future.result()
+                latencies.append(time.perf_counter() - start)
+        for start, future in in_flight:
+            future.result()
+            latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=work, args=(requests[i::n_threads],)) for i in range(n_threads)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, latencies
+
+
+def report(name, words, elapsed, latencies):
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99)]
+    print(f"{name:22} {words / elapsed:12,.0f} words/s   p50 {statistics.median(latencies) * 1e6:8,.0f} us"
+          f"   p99 {p99 * 1e6:8,.0f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dictionary", default=str(DICTIONARY))
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--words", type=int, default=20, help="words per request")
+    parser.add_argument("--depth", type=int, default=8, help="requests in flight per thread when pipelining")
+    parser.add_argument("--connections", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=1, help="batch workers of the server")
+    args = parser.parse_args()
+
+    patterns = pathlib.Path(args.dictionary).read_text(encoding="utf-8").split("\n", 1)[1]
+    vocabulary = [w for w in patterns.translate(str.maketrans("", "", string.digits)).split()
+                  if len(w) > 3 and w.isalpha()]
+    rng = random.Random(0)
+    requests = [[rng.choice(vocabulary) + rng.choice(vocabulary) for _ in range(args.words)]
+                for _ in range(args.requests)]
+    words = args.requests * args.words
+
+    hyphenator = Hyphenator(mode="tokens", dictionary=args.dictionary)
+
+    def in_process(words):
+        future = concurrent.futures.Future()
+        future.set_result(hyphenator.hyphenate_tokens(words))
+        return future
+
+    report("in-process", words, *run(in_process, requests, args.threads, 1))
+
+    with tempfile.TemporaryDirectory() as directory:
+        address = os.path.join(directory, "hyperhyphen.sock")
+        server = subprocess.Popen(
+            [sys.executable, "-m", "hyperhyphen", "serve", "-d", args.dictionary, "--socket", address,
+             "--workers", str(args.workers)],
+            cwd=ROOT,
+        )
+        try:
+            while not os.path.exists(address):
+                time.sleep(0.05)
+            with HyphenationClient(address, connections=args.connections) as client:
+                run(client.submit, requests[:1000], args.threads, 1)  # warm up
+                report("server", words, *run(client.submit, requests, args.threads, 1))
+                report(f"server, depth {args.depth}", words, *run(client.submit, requests, args.threads, args.depth))
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Measure how hyphenation throughput scales with the number of Python threads sharing one Hyphenator.
+
+The same texts are split between 1 to N threads that call a shared Hyphenator:
+
+    python benchmarks/bench_threads.py --threads 1,2,4,8
+
+The native calls release the GIL, so threads overlap in the native library on every build, while the Python
+work around the calls only runs in parallel on free-threaded builds (python3.13t and later). Run the script
+with both interpreters to compare them.
+
+The package is imported from this source tree, so build it in place first (`python setup.py build_ext --inplace`).
+"""
+import argparse
+import os
+import pathlib
+import random
+import string
+import sys
+import threading
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from hyperhyphen import Hyphenator  # noqa: E402
+
+DICTIONARY = ROOT / "tests" / "hyph_en_US.dic"
+
+
+def run(hyphenator, texts, n_threads):
+    barrier = threading.Barrier(n_threads + 1)
+
+    def work(part):
+        barrier.wait()
+        for text in part:
+            hyphenator(text)
+
+    threads = [threading.Thread(target=work, args=(texts[i::n_threads],)) for i in range(n_threads)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dictionary", default=str(DICTIONARY))
+    parser.add_argument("--threads", default=f"1,2,4,{os.cpu_count() or 1}")
+    parser.add_argument("--mode", default="int", help="output mode of the Hyphenator")
+    parser.add_argument("--texts", type=int, default=2000)
+    parser.add_argument("--words", type=int, default=100, help="words per text")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    patterns = pathlib.Path(args.dictionary).read_text(encoding="utf-8").split("\n", 1)[1]
+    vocabulary = [w for w in patterns.translate(str.maketrans("", "", string.digits)).split()
+                  if len(w) > 3 and w.isalpha()]
+    rng = random.Random(0)
+    texts = [" ".join(rng.choice(vocabulary) + rng.choice(vocabulary) for _ in range(args.words))
+             for _ in range(args.texts)]
+    words = args.texts * args.words
+
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"Python {sys.version.split()[0]}, GIL {'enabled' if gil else 'disabled'}, {os.cpu_count()} CPUs")
+
+    hyphenator = Hyphenator(mode=args.mode, dictionary=args.dictionary)
+    run(hyphenator, texts[:100], 1)  # warm up
+    base = None
+    for n in map(int, args.threads.split(",")):
+        elapsed = min(run(hyphenator, texts, n) for _ in range(args.repeat))
+        base = base or elapsed
+        print(f"threads: {n:3}   {words / elapsed:12,.0f} words/s   speedup {base / elapsed:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,5 @@
-from .core import Hyphenator, to_spans
\ No newline at end of file
+from .core import Hyphenator, to_spans
+from .results import Chunks
+from .index import VocabularyIndex, build_index
+from .cache import ResultCache
+from .dictionaries import DictionaryWatcher, preload
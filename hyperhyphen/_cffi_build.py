@@ -0,0 +1,50 @@
+"""Build script of the optional cffi backend (API mode), used by setup.py when cffi is installed.
+
+Run `python hyperhyphen/_cffi_build.py` to build the extension in place for development.
+"""
+import os
+import pathlib
+
+from cffi import FFI
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+
+ffibuilder = FFI()
+
+# Keep in sync with lib/hyphen.h and lib/hyphenate.h
+ffibuilder.cdef("""
+    typedef struct _HyphenDict HyphenDict;
+
+    HyphenDict *hnj_hyphen_load(const char *fn);
+    int hnj_hyphen_compact(HyphenDict *dict);
+    size_t hnj_hyphen_memsize(HyphenDict *dict);
+    void hnj_hyphen_free(HyphenDict *dict);
+    int hnj_hyphen_profile(HyphenDict *dict, int level, int *hits);
+    int hnj_hyphen_state_keys(HyphenDict *dict, int level, char *out, int kk);
+
+    int parse_word(HyphenDict *dict, char *word, char *out, int k, int kk, int optn, int opts, int optnn, int optdd);
+    int parse_words(HyphenDict *dict, char *words, char *out, int n, int kk, int optn, int opts, int optnn, int optdd);
+    int parse_words_from(HyphenDict *dict, char *words, int n, int start, int *position,
+                         char *out, int kk, int *written, int optn, int opts, int optnn, int optdd);
+    int hyphenate_column(HyphenDict *dict, const char *data, long long size, const void *offsets,
+                         int offset_width, int n, int start, int *out_offsets, int *values, int capacity,
+                         int *casing);
+    int hyphenate_tokens(HyphenDict *dict, const char *words, int n, int start, int *position,
+                         int *out_offsets, int *values, unsigned char *priorities, int capacity);
+    int hyphenate_insert(HyphenDict *dict, const char *text, int k, const char *sep, int seplen,
+                         char *out, int kk, int *consumed, int *casing);
+    int word_breaks(HyphenDict *dict, const char *word, int k, int *breaks, int cap, int min_priority);
+    int best_break(HyphenDict *dict, const char *word, int k, int column, int min_priority);
+""")
+
+ffibuilder.set_source(
+    "hyperhyphen._hyphen_cffi",
+    '#include "hyphen.h"\n#include "hyphenate.h"\n',
+    # Paths are relative to the project root, where setup.py runs
+    sources=["lib/hnjalloc.c", "lib/hyphen.c", "lib/hyphenate.c"],
+    include_dirs=["lib"],
+)
+
+if __name__ == "__main__":
+    os.chdir(ROOT)
+    ffibuilder.compile(tmpdir=".", verbose=True)
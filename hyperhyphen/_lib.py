@@ -1,11 +1,34 @@
 import ctypes.util
+import os
 import pathlib
+import re
 import sys
+import threading
+from array import array
 from ctypes import *
-from functools import cache
+
+from .cache import dictionary_hash
+
+# Backend used to call the native library: 'cffi' when the compiled cffi module and its runtime are
+# available, 'ctypes' otherwise. Can be forced with the HYPERHYPHEN_BACKEND environment variable.
+BACKEND = os.environ.get('HYPERHYPHEN_BACKEND', 'auto')
+if BACKEND not in ('auto', 'cffi', 'ctypes'):
+    raise ImportError(f"Unknown HYPERHYPHEN_BACKEND '{BACKEND}', expected 'auto', 'cffi' or 'ctypes'")
+
+ffi = None
+if BACKEND != 'ctypes':
+    try:
+        from ._hyphen_cffi import ffi, lib as libhyphenate
+    except ImportError:
+        if BACKEND == 'cffi':
+            raise
+BACKEND = 'ctypes' if ffi is None else 'cffi'
 
 _libs_info, _libs = {}, {}
 
+# Words and whitespace runs, with the whitespace of str.isspace() as in the native library
+_token_pattern = re.compile(r'\S+|\s+')
+
 
 def _find_library(name, dirs, search_sys):
     if sys.platform in ("win32", "cygwin", "msys"):
@@ -37,33 +60,305 @@ def _register_library(name, dllclass, **kwargs):
     _libs[name] = dllclass(libpath)
 
 
-_register_library(
-    name='hyphenate',
-    dllclass=ctypes.CDLL,
-    dirs=['.'],
-    search_sys=False,
-)
+if BACKEND == 'cffi':
+    def _new_buffer(size):
+        return ffi.new('char[]', size)
+
+    def _buffer_bytes(buffer, size=None):
+        """Contents of a buffer, up to the first zero byte if no size is given."""
+        return ffi.string(buffer) if size is None else ffi.buffer(buffer, size)[:]
+
+    def _new_int():
+        return ffi.new('int *')
+
+    def _ref(value):
+        return value
+
+    def _int_value(value):
+        return value[0]
+
+    def _int_pointer(values):
+        """Pointer to the contents of an int32 array."""
+        return ffi.from_buffer('int[]', values)
+
+    def _byte_pointer(values):
+        """Pointer to the contents of a uint8 array."""
+        return ffi.from_buffer('unsigned char[]', values)
+
+    _null = ffi.NULL
+
+    def _owned(dict_ptr):
+        """Dictionary pointer that releases the dictionary once it is garbage collected."""
+        return ffi.gc(dict_ptr, _free_owned)
+
+    def _readable(buffer):
+        """Return a pointer to the contents of buffer, without copying."""
+        view = memoryview(buffer)
+        if not view.c_contiguous:
+            raise ValueError("Buffer must be C-contiguous")
+        return ffi.from_buffer(view)
+
+else:
+    _register_library(
+        name='hyphenate',
+        dllclass=ctypes.CDLL,
+        dirs=['.'],
+        search_sys=False,
+    )
+
+    class struct_hyphendict(Structure):
+        pass
+
+    HyphenDict = POINTER(struct_hyphendict)
+
+    libhyphenate = _libs['hyphenate']
+
+    libhyphenate.hnj_hyphen_load.restype = HyphenDict
+    libhyphenate.hnj_hyphen_load.argtypes = (c_char_p,)
+
+    libhyphenate.parse_word.restype = c_int
+    libhyphenate.parse_word.argtypes = (HyphenDict, c_char_p, c_char_p, c_int, c_int, c_int, c_int, c_int, c_int)
+
+    libhyphenate.parse_words.restype = c_int
+    libhyphenate.parse_words.argtypes = (HyphenDict, c_char_p, c_char_p, c_int, c_int, c_int, c_int, c_int, c_int)
+
+    libhyphenate.parse_words_from.restype = c_int
+    libhyphenate.parse_words_from.argtypes = (
+        HyphenDict, c_char_p, c_int, c_int, POINTER(c_int), c_char_p, c_int, POINTER(c_int), c_int, c_int, c_int, c_int
+    )
+
+    libhyphenate.hyphenate_column.restype = c_int
+    libhyphenate.hyphenate_column.argtypes = (
+        HyphenDict, c_void_p, c_longlong, c_void_p, c_int, c_int, c_int, c_void_p, c_void_p, c_int, POINTER(c_int)
+    )
+
+    libhyphenate.hyphenate_tokens.restype = c_int
+    libhyphenate.hyphenate_tokens.argtypes = (
+        HyphenDict, c_char_p, c_int, c_int, POINTER(c_int), c_void_p, c_void_p, c_void_p, c_int
+    )
+
+    libhyphenate.hyphenate_insert.restype = c_int
+    libhyphenate.hyphenate_insert.argtypes = (
+        HyphenDict, c_char_p, c_int, c_char_p, c_int, c_char_p, c_int, POINTER(c_int), POINTER(c_int)
+    )
+
+    libhyphenate.word_breaks.restype = c_int
+    libhyphenate.word_breaks.argtypes = (HyphenDict, c_char_p, c_int, c_void_p, c_int, c_int)
+
+    libhyphenate.best_break.restype = c_int
+    libhyphenate.best_break.argtypes = (HyphenDict, c_char_p, c_int, c_int, c_int)
 
+    libhyphenate.hnj_hyphen_compact.restype = c_int
+    libhyphenate.hnj_hyphen_compact.argtypes = (HyphenDict,)
 
-class struct_hyphendict(Structure):
-    pass
+    libhyphenate.hnj_hyphen_memsize.restype = c_size_t
+    libhyphenate.hnj_hyphen_memsize.argtypes = (HyphenDict,)
 
+    libhyphenate.hnj_hyphen_free.restype = None
+    libhyphenate.hnj_hyphen_free.argtypes = (HyphenDict,)
 
-HyphenDict = POINTER(struct_hyphendict)
+    libhyphenate.hnj_hyphen_profile.restype = c_int
+    libhyphenate.hnj_hyphen_profile.argtypes = (HyphenDict, c_int, c_void_p)
 
-libhyphenate = _libs['hyphenate']
+    libhyphenate.hnj_hyphen_state_keys.restype = c_int
+    libhyphenate.hnj_hyphen_state_keys.argtypes = (HyphenDict, c_int, c_char_p, c_int)
 
-libhyphenate.hnj_hyphen_load.restype = HyphenDict
-libhyphenate.hnj_hyphen_load.argtypes = (c_char_p,)
+    def _new_buffer(size):
+        return create_string_buffer(size)
 
-libhyphenate.parse_word.restype = c_int
-libhyphenate.parse_word.argtypes = (HyphenDict, c_char_p, c_char_p, c_int, c_int, c_int, c_int, c_int, c_int)
+    def _buffer_bytes(buffer, size=None):
+        """Contents of a buffer, up to the first zero byte if no size is given."""
+        return buffer.value if size is None else buffer.raw[:size]
 
-libhyphenate.parse_words.restype = c_int
-libhyphenate.parse_words.argtypes = (HyphenDict, c_char_p, c_char_p, c_int, c_int, c_int, c_int, c_int, c_int)
+    def _new_int():
+        return c_int(0)
 
-@cache
-def load_dictionary(path: str):
+    def _ref(value):
+        return byref(value)
+
+    def _int_value(value):
+        return value.value
+
+    def _int_pointer(values):
+        """Pointer to the contents of an int32 array."""
+        return values.buffer_info()[0]
+
+    def _byte_pointer(values):
+        """Pointer to the contents of a uint8 array."""
+        return values.buffer_info()[0]
+
+    _null = None
+
+    class _OwnedHyphenDict(HyphenDict):
+        _type_ = struct_hyphendict
+
+        def __del__(self):
+            _free_owned(self)
+
+    def _owned(dict_ptr):
+        """Dictionary pointer that releases the dictionary once it is garbage collected."""
+        return cast(dict_ptr, _OwnedHyphenDict)
+
+    class _Py_buffer(Structure):
+        _fields_ = [
+            ('buf', c_void_p), ('obj', c_void_p), ('len', c_ssize_t), ('itemsize', c_ssize_t),
+            ('readonly', c_int), ('ndim', c_int), ('format', c_char_p),
+            ('shape', c_void_p), ('strides', c_void_p), ('suboffsets', c_void_p), ('internal', c_void_p),
+        ]
+
+    # ctypes can only point into writable buffers, read-only ones (e.g. Arrow buffers) are exported with the
+    # buffer protocol of the interpreter, as cffi's from_buffer does
+    _PyObject_GetBuffer = pythonapi.PyObject_GetBuffer
+    _PyObject_GetBuffer.restype = c_int
+    _PyObject_GetBuffer.argtypes = (py_object, POINTER(_Py_buffer), c_int)
+    _PyBuffer_Release = pythonapi.PyBuffer_Release
+    _PyBuffer_Release.restype = None
+    _PyBuffer_Release.argtypes = (POINTER(_Py_buffer),)
+
+    class _ExportedBuffer:
+        """Pointer to the contents of a buffer, which stays exported until this object is garbage collected."""
+
+        def __init__(self, buffer):
+            self._view = _Py_buffer()
+            # PyBUF_SIMPLE: the contiguous bytes of the buffer, read-only ones included
+            _PyObject_GetBuffer(buffer, byref(self._view), 0)
+            self._as_parameter_ = c_void_p(self._view.buf)
+
+        def __del__(self):
+            if self._view.obj:
+                _PyBuffer_Release(byref(self._view))
+
+    def _readable(buffer):
+        """Return an object that ctypes can pass as a pointer to the contents of buffer, without copying."""
+        if isinstance(buffer, bytes):
+            return buffer
+        view = memoryview(buffer)
+        if not view.c_contiguous:
+            raise ValueError("Buffer must be C-contiguous")
+        if view.nbytes and not view.readonly:
+            return (c_char * view.nbytes).from_buffer(view)
+        return _ExportedBuffer(view)
+
+
+def _free_owned(dict_ptr):
+    # Daemon threads may still be in a native call while the interpreter shuts down, the process frees everything
+    if not sys.is_finalizing():
+        libhyphenate.hnj_hyphen_free(dict_ptr)
+
+
+# Dictionaries loaded by `load_dictionary`, per process. Forked children inherit the loaded dictionaries, which
+# are never modified after loading, while spawned processes load each dictionary once on first use. A reload
+# replaces the entry, the previous dictionary is freed when the last call or Hyphenator using it lets it go.
+_registry = {}
+_registry_lock = threading.Lock()
+# Locks of the loads in progress, per registry key, so that different dictionaries load in parallel
+_loading = {}
+# File signature of every loaded path at the time it was (re)loaded, see `changed_dictionaries`
+_signatures = {}
+# (dictionary pointer, content hash) of every registry key, replaced together with the registry entry
+_hashes = {}
+
+# Attempts to load a dictionary file that is being changed at the same time
+_MAX_LOAD_ATTEMPTS = 10
+
+
+def _signature(path: str):
+    stat = os.stat(path)
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+def _load_hashed(open_function, path: str, *args):
+    """
+    Load a dictionary with open_function and hash the content of its file, the same content that was loaded.
+
+    The file signature is checked around the hash and the load, and both are done again if the file changed meanwhile.
+
+    Returns:
+        tuple: (dictionary, file signature, `cache.dictionary_hash` of the loaded content)
+    """
+    for _ in range(_MAX_LOAD_ATTEMPTS):
+        signature = _signature(path)
+        digest = dictionary_hash(path)
+        dictionary = open_function(path, *args)
+        if _signature(path) == signature:
+            return dictionary, signature, digest
+    raise RuntimeError(f"Dictionary file kept changing while it was loaded: {path}")
+
+
+def load_dictionary(path: str, compact: bool = True):
+    """Load a dictionary once per process and return the shared pointer. Safe to call from many threads."""
+    # Lookups do not lock: entries are replaced atomically, and a lock of the path is only taken to load a
+    # missing one, so that concurrent first calls for the same path load it once, and other paths meanwhile
+    key = (path, compact)
+    dict_ptr = _registry.get(key)
+    if dict_ptr is None:
+        with _registry_lock:
+            lock = _loading.setdefault(key, threading.Lock())
+        with lock:
+            dict_ptr = _registry.get(key)
+            if dict_ptr is None:
+                dict_ptr, signature, digest = _load_hashed(_open_owned, path, compact)
+                with _registry_lock:
+                    _registry[key] = dict_ptr
+                    _hashes[key] = (dict_ptr, digest)
+                    _loading.pop(key, None)
+                _signatures.setdefault(path, signature)
+    return dict_ptr
+
+
+def is_loaded(path: str, compact: bool = True) -> bool:
+    """Whether `load_dictionary` has a dictionary of the path, so that it returns it without loading anything."""
+    return (path, compact) in _registry
+
+
+def reload_dictionary(path: str) -> bool:
+    """
+    Load a dictionary file again and swap it in for the calls that start afterwards, if it is loaded.
+
+    The new dictionary is built without holding any lock, so lookups and calls with the previous one go on
+    meanwhile. Calls that already started finish with the previous dictionary, which is freed once no call
+    or Hyphenator refers to it anymore.
+
+    Returns:
+        bool: False if the dictionary was not loaded in this process, the next `load_dictionary` loads the file
+    """
+    keys = [key for key in list(_registry) if key[0] == path]
+    if not keys:
+        return False
+    # A file that fails to load is not retried by `changed_dictionaries` until it changes again
+    _signatures[path] = _signature(path)
+    for key in keys:
+        dict_ptr, signature, digest = _load_hashed(_open_owned, *key)
+        with _registry_lock:
+            _registry[key] = dict_ptr
+            _hashes[key] = (dict_ptr, digest)
+        _signatures[path] = signature
+    return True
+
+
+def content_hash(path: str, dict_ptr, compact: bool = True) -> "bytes | None":
+    """
+    Return the `cache.dictionary_hash` of the content that a dictionary of `load_dictionary` was loaded from,
+    or None if it is no longer the loaded dictionary of its path, i.e. it was swapped by a reload since.
+    """
+    entry = _hashes.get((path, compact))
+    return entry[1] if entry is not None and entry[0] is dict_ptr else None
+
+
+def changed_dictionaries() -> list:
+    """Return the paths of the loaded dictionaries whose files were changed or replaced since they were loaded."""
+    changed = []
+    for path, signature in list(_signatures.items()):
+        try:
+            if _signature(path) != signature:
+                changed.append(path)
+        except OSError:
+            pass  # Removed, or being replaced non-atomically: keep the loaded dictionary
+    return changed
+
+
+def open_dictionary(path: str, compact: bool = True):
+    """Load a private copy of a dictionary, which has to be released with `free_dictionary`."""
     if not path or len(path.encode('utf-8')) > 4096:  # Reasonable path length limit
         raise ValueError("Invalid dictionary path")
 
@@ -71,10 +366,118 @@ def load_dictionary(path: str):
     if not dict_ptr:
         raise RuntimeError(f"Failed to load dictionary: {path}")
 
+    # Pack the automaton into one arena, which also frees the slack of its growing arrays
+    if compact and libhyphenate.hnj_hyphen_compact(dict_ptr) != 0:
+        raise MemoryError(f"Failed to compact dictionary: {path}")
+
     return dict_ptr
 
 
-def hyphenate_words(dict, words: list[str], optn: bool, opts: bool, optnn: bool, optdd: bool):
+def _open_owned(path: str, compact: bool = True):
+    return _owned(open_dictionary(path, compact))
+
+
+def free_dictionary(dict):
+    """Release a dictionary loaded with `open_dictionary`."""
+    if not dict:
+        raise ValueError("Dictionary pointer is null")
+    libhyphenate.hnj_hyphen_free(dict)
+
+
+# Pattern strings are shorter than MAX_CHARS in lib/hyphen.h
+_MAX_PATTERN = 100
+
+
+def dictionary_states(dict, level: int):
+    """
+    Return the pattern strings of the automaton states of a dictionary level, or None if there is no such level.
+
+    Level 0 is the dictionary itself and level 1 its next level. The strings are bytes in the dictionary encoding.
+    """
+    if not dict:
+        raise ValueError("Dictionary pointer is null")
+
+    num_states = libhyphenate.hnj_hyphen_profile(dict, level, _null)
+    if num_states < 0:
+        return None
+
+    buffer_size = num_states * _MAX_PATTERN
+    buffer = _new_buffer(buffer_size)
+    size = libhyphenate.hnj_hyphen_state_keys(dict, level, buffer, buffer_size)
+    if size < 0:
+        raise RuntimeError(f"Failed to read the states of dictionary level {level}")
+    return _buffer_bytes(buffer, size).split(b'\0')[:-1]
+
+
+def count_state_visits(dict, level: int, hits):
+    """
+    Count the visits of every automaton state of a dictionary level in hits, an int32 array with one
+    counter per state, until it is detached by passing None. The array must stay alive while attached.
+    """
+    if not dict:
+        raise ValueError("Dictionary pointer is null")
+
+    pointer = _null if hits is None else _int_pointer(hits)
+    if libhyphenate.hnj_hyphen_profile(dict, level, pointer) < 0:
+        raise ValueError(f"Dictionary has no level {level}")
+
+
+def dictionary_footprint(dict) -> int:
+    """Return the number of bytes of memory used by a loaded dictionary."""
+    if not dict:
+        raise ValueError("Dictionary pointer is null")
+    return libhyphenate.hnj_hyphen_memsize(dict)
+
+
+class BufferPool:
+    """
+    Small pool of native output buffers, reused across calls so that repeated calls do not allocate
+    and zero-fill new buffers. Every thread has buffers of its own, so threads that share a pool
+    never share a buffer and do not lock. Pickling gives an empty pool.
+    """
+
+    def __init__(self, max_buffers: int = 4):
+        self.max_buffers = max_buffers
+        self._local = threading.local()
+
+    def __reduce__(self):
+        return BufferPool, (self.max_buffers,)
+
+    @property
+    def _free(self) -> list:
+        """Free buffers of the current thread."""
+        try:
+            return self._local.free
+        except AttributeError:
+            free = self._local.free = []
+            return free
+
+    def acquire(self, size: int):
+        """Return a (buffer, capacity) tuple of at least size bytes."""
+        try:
+            buffer, capacity = self._free.pop()
+        except IndexError:
+            pass
+        else:
+            if capacity >= size:
+                return buffer, capacity
+        # Powers of two (of at least 4 KiB), so that buffers fit many similar requests
+        capacity = 1 << max(size - 1, 4095).bit_length()
+        return _new_buffer(capacity), capacity
+
+    def release(self, buffer, capacity: int):
+        """Return a buffer to the pool."""
+        free = self._free
+        if len(free) < self.max_buffers:
+            free.append((buffer, capacity))
+
+
+# Largest output buffer used for a batch, larger outputs are written in several rounds
+_MAX_BUFFER = 1 << 20
+
+
+def hyphenate_words(dict, words: list[str], optn: bool, opts: bool, optnn: bool, optdd: bool,
+                    buffers: "BufferPool | None" = None):
     if not dict:
         raise ValueError("Dictionary pointer is null")
 
@@ -88,46 +491,52 @@ def hyphenate_words(dict, words: list[str], optn: bool, opts: bool, optnn: bool,
         if len(word.encode('utf-8')) > 1024:  # Reasonable word length limit
             raise ValueError(f"Word too long: {word[:50]}...")
 
-    # Calculate safe buffer size with generous margin
     bwords = '\0'.join(words).encode('utf-8')
-    input_size = len(bwords)
-
-    # Use much larger buffer to prevent overflow - hyphenation can significantly expand text
-    buffer_size = max(input_size * 4, 8192)  # At least 4x input size or 8KB minimum
-
-    try:
-        buffer = create_string_buffer(buffer_size)
-
-        result = libhyphenate.parse_words(
-            dict, bwords, buffer, len(words), buffer_size,
+    n = len(words)
+
+    # The output is rarely more than twice the input. When the buffer is full, its contents are collected
+    # and the native call resumes from the first word that did not fit, so the buffer is never oversized.
+    buffers = buffers if buffers is not None else BufferPool()
+    buffer, capacity = buffers.acquire(min(len(bwords) * 2 + 64, _MAX_BUFFER))
+    position, written = _new_int(), _new_int()
+    pieces = []
+
+    start = 0
+    while start < n:
+        done = libhyphenate.parse_words_from(
+            dict, bwords, n, start, _ref(position), buffer, capacity, _ref(written),
             int(optn), int(opts), int(optnn), int(optdd)
         )
+        if done < 0:
+            raise RuntimeError(f"Hyphenation failed with error code: {done}")
+        pieces.append(_buffer_bytes(buffer, _int_value(written)))
+        if done == start:
+            # Not even one word fitted, continue with a larger buffer
+            buffer, capacity = buffers.acquire(capacity * 2)
+        start = done
+    buffers.release(buffer, capacity)
 
-        if result != 0:
-            raise BufferError(f"Hyphenation failed with error code: {result}")
+    try:
+        buffer_content = b''.join(pieces).decode('utf-8')
+    except UnicodeDecodeError:
+        raise RuntimeError("Invalid UTF-8 output from hyphenation library")
 
-        # Ensure null termination
-        buffer_content = buffer.value.decode('utf-8')
+    # Validate output format
+    output_lines = buffer_content.split('\n')
+    if output_lines and output_lines[-1] == '':
+        output_lines = output_lines[:-1]
 
-        # Validate output format
-        output_lines = buffer_content.split('\n')
-        if output_lines and output_lines[-1] == '':
-            output_lines = output_lines[:-1]
+    if len(output_lines) != len(words):
+        raise RuntimeError(f"Output mismatch: expected {len(words)} lines, got {len(output_lines)}")
 
-        if len(output_lines) != len(words):
-            raise RuntimeError(f"Output mismatch: expected {len(words)} lines, got {len(output_lines)}")
+    return output_lines
 
-        return output_lines
 
-    except UnicodeDecodeError:
-        raise RuntimeError("Invalid UTF-8 output from hyphenation library")
-
-
-def hyphenate_words_numbers(dict, words: list[str]):
+def hyphenate_words_numbers(dict, words: list[str], buffers: "BufferPool | None" = None):
     if not words:
         return []
 
-    out = hyphenate_words(dict, words, False, False, True, False)
+    out = hyphenate_words(dict, words, False, False, True, False, buffers)
     result = []
 
     for i, line in enumerate(out):
@@ -140,5 +549,205 @@ def hyphenate_words_numbers(dict, words: list[str]):
     return result
 
 
-def hyphenate_words_simple(dict, words: list[str]):
-    return hyphenate_words(dict, words, False, True, False, False)
\ No newline at end of file
+def hyphenate_words_simple(dict, words: list[str], buffers: "BufferPool | None" = None):
+    return hyphenate_words(dict, words, False, True, False, False, buffers)
+
+
+def hyphenate_column(dict, offsets, data):
+    """
+    Hyphenate an Arrow-style string column in a single native call.
+
+    Args:
+        dict: Dictionary pointer from `load_dictionary`
+        offsets: buffer of n + 1 int32 or int64 row offsets into data
+        data: buffer with the UTF-8 text of all rows
+
+    Returns:
+        tuple: (offsets, values) as int32 arrays, where values[offsets[i]:offsets[i + 1]] are the
+            chunk lengths of row i as in the "int" mode of `Hyphenator`
+    """
+    if not dict:
+        raise ValueError("Dictionary pointer is null")
+
+    view = memoryview(offsets)
+    if view.ndim != 1 or view.itemsize not in (4, 8):
+        raise TypeError("Offsets must be a one-dimensional buffer of int32 or int64 values")
+    n = len(view) - 1
+    if n < 0:
+        raise ValueError("Offsets must hold at least one value")
+
+    data_ptr, offsets_ptr = _readable(data), _readable(view)
+    size = memoryview(data).nbytes
+    out_offsets = array('i', bytes(4 * (n + 1)))
+    values = array('i', bytes(4 * max(n * 8, 1024)))
+    casing = _new_int()
+
+    start = 0
+    while start < n:
+        start = libhyphenate.hyphenate_column(
+            dict, data_ptr, size, offsets_ptr, view.itemsize, n, start,
+            _int_pointer(out_offsets), _int_pointer(values), len(values), _ref(casing)
+        )
+        if start == -3:
+            raise ValueError("Offsets must be non-decreasing and within the data")
+        if start < 0:
+            raise RuntimeError(f"Hyphenation failed with error code: {start}")
+        if start < n and _int_value(casing):
+            # A row with letters that only Python lowercases, hyphenated like the "int" mode does it
+            row = memoryview(data).cast('B')[view[start]:view[start + 1]].tobytes().decode('utf-8')
+            tokens = _token_pattern.findall(row)
+            word_values, word_offsets = hyphenate_tokens(dict, [token for token in tokens if not token.isspace()])
+            v, w = out_offsets[start], 0
+            for token in tokens:
+                if token.isspace():
+                    row_values = [-len(token)]
+                else:
+                    row_values = word_values[word_offsets[w]:word_offsets[w + 1]]
+                    w += 1
+                if v + len(row_values) > len(values):
+                    values.frombytes(bytes(4 * len(values)))
+                values[v:v + len(row_values)] = array('i', row_values)
+                v += len(row_values)
+            start += 1
+            out_offsets[start] = v
+        elif start < n:
+            # Grow the values buffer and resume from the first row that did not fit
+            values.frombytes(bytes(4 * len(values)))
+
+    del values[out_offsets[n]:]
+    return out_offsets, values
+
+
+def hyphenate_tokens(dict, tokens, priorities: bool = False):
+    """
+    Hyphenate a sequence of tokens in a single native pass.
+
+    Args:
+        priorities (bool): also return the pattern priority of every break
+
+    Returns:
+        tuple: (values, offsets) int32 arrays in CSR layout, values[offsets[i]:offsets[i + 1]] holds the
+            chunk lengths of token i. With priorities, a third uint8 array holds the priority (1, 3, 5, 7 or 9)
+            of the break after each chunk, at the same index, and 0 after the last chunk of a token.
+    """
+    # One join, lower and encode for all tokens; join also rejects anything that is not a str
+    return hyphenate_joined_tokens(dict, '\0'.join(tokens).lower().encode('utf-8'), len(tokens), priorities)
+
+
+def hyphenate_joined_tokens(dict, bwords: bytes, n: int, priorities: bool = False):
+    """Like `hyphenate_tokens`, for n lowercase UTF-8 tokens separated by zero bytes."""
+    if not dict:
+        raise ValueError("Dictionary pointer is null")
+
+    offsets = array('i', bytes(4 * (n + 1)))
+    values = array('i', bytes(4 * max(n * 4, 1024)))
+    levels = array('B', bytes(len(values))) if priorities else None
+    position = _new_int()
+
+    start = 0
+    while start < n:
+        start = libhyphenate.hyphenate_tokens(
+            dict, bwords, n, start, _ref(position), _int_pointer(offsets), _int_pointer(values),
+            _null if levels is None else _byte_pointer(levels), len(values)
+        )
+        if start < 0:
+            raise RuntimeError(f"Hyphenation failed with error code: {start}")
+        if start < n:
+            values.frombytes(bytes(4 * len(values)))
+            if levels is not None:
+                levels.frombytes(bytes(len(levels)))
+
+    del values[offsets[n]:]
+    if levels is None:
+        return values, offsets
+    del levels[offsets[n]:]
+    return values, offsets, levels
+
+
+def _split(word: str, lengths) -> list[str]:
+    """Chunks of word, with anything left over after the chunk lengths in the last chunk."""
+    chunks, start = [], 0
+    for length in lengths:
+        chunks.append(word[start:start + length])
+        start += length
+    if chunks:
+        chunks[-1] += word[start:]
+    return chunks or [word]
+
+
+def hyphenate_insert(dict, text: bytes, separator: bytes, buffers: "BufferPool | None" = None) -> bytes:
+    """Return the UTF-8 text with the separator inserted at every hyphenation point, in a single native pass."""
+    if not dict:
+        raise ValueError("Dictionary pointer is null")
+
+    buffers = buffers if buffers is not None else BufferPool()
+    pieces = []
+    consumed, casing = _new_int(), _new_int()
+    # Room for a separator every other character, the rest is written in further rounds
+    buffer, capacity = buffers.acquire(min(len(text) + len(text) // 2 * len(separator) + 64, _MAX_BUFFER))
+
+    while text:
+        written = libhyphenate.hyphenate_insert(
+            dict, text, len(text), separator, len(separator), buffer, capacity, _ref(consumed), _ref(casing)
+        )
+        if written < 0:
+            raise RuntimeError(f"Hyphenation failed with error code: {written}")
+        pieces.append(_buffer_bytes(buffer, written))
+        text = text[_int_value(consumed):]
+        word_size = _int_value(casing)
+        if word_size:
+            # A word with letters that only Python lowercases, hyphenated as `hyphenate_tokens` does it
+            word = text[:word_size].decode('utf-8')
+            values, _ = hyphenate_tokens(dict, [word])
+            pieces.append(separator.join(chunk.encode('utf-8') for chunk in _split(word, values)))
+            text = text[word_size:]
+        elif not _int_value(consumed):
+            # The next word does not fit at all
+            buffer, capacity = buffers.acquire(capacity * 2)
+    buffers.release(buffer, capacity)
+
+    return b''.join(pieces)
+
+
+def word_breaks(dict, word: str, min_priority: int = 1) -> tuple:
+    """Return the positions of the breaks of a single word of at least min_priority, in code points from its start."""
+    if not dict:
+        raise ValueError("Dictionary pointer is null")
+
+    bword = word.encode('utf-8')
+    # A word has fewer breaks than bytes
+    breaks = array('i', bytes(4 * len(bword)))
+    n = libhyphenate.word_breaks(dict, bword, len(bword), _int_pointer(breaks), len(breaks), min_priority)
+    if n == -3:
+        return _lowered_word_breaks(dict, word, min_priority)
+    if n < 0:
+        raise RuntimeError(f"Hyphenation failed with error code: {n}")
+    return tuple(breaks[:n])
+
+
+def _lowered_word_breaks(dict, word: str, min_priority: int) -> tuple:
+    """`word_breaks` of a word with letters that only Python lowercases, found with `hyphenate_tokens`."""
+    values, _, levels = hyphenate_tokens(dict, [word], priorities=True)
+    breaks, position = [], 0
+    for length, level in zip(values, levels):
+        position += length
+        if level >= min_priority:
+            breaks.append(position)
+    return tuple(breaks)
+
+
+def best_break(dict, word: str, column: int, min_priority: int = 1) -> int:
+    """
+    Return the last position at or before column of a break of a single word of at least min_priority,
+    or 0 if there is none.
+    """
+    if not dict:
+        raise ValueError("Dictionary pointer is null")
+
+    bword = word.encode('utf-8')
+    position = libhyphenate.best_break(dict, bword, len(bword), column, min_priority)
+    if position == -3:
+        return max((p for p in _lowered_word_breaks(dict, word, min_priority) if p <= column), default=0)
+    if position < 0:
+        raise RuntimeError(f"Hyphenation failed with error code: {position}")
+    return position
@@ -0,0 +1,246 @@
+"""Persistent cache of hyphenation results, shared by processes and runs.
+
+Results are stored in a local SQLite database under a key made of a hash of the dictionary file content,
+the output kind and a hash of the text, so a document that did not change since a previous run is not
+hyphenated again. The database is in WAL mode: readers do not block, and concurrent writers wait for each
+other. When the stored values exceed `max_bytes`, the least recently used entries are evicted.
+
+Lookups only read the database; the recency of the results found and the hit counters are written out in
+batches, with the next store or on `flush`, `stats` and `close`.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+_SCHEMA = """
+BEGIN IMMEDIATE;
+CREATE TABLE IF NOT EXISTS results (
+    dictionary BLOB NOT NULL,
+    mode TEXT NOT NULL,
+    text BLOB NOT NULL,
+    value BLOB NOT NULL,
+    used REAL NOT NULL,
+    PRIMARY KEY (dictionary, mode, text)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS results_used ON results (used);
+CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL) WITHOUT ROWID;
+INSERT OR IGNORE INTO counters VALUES ('size', 0), ('hits', 0), ('misses', 0);
+CREATE TRIGGER IF NOT EXISTS results_insert AFTER INSERT ON results BEGIN
+    UPDATE counters SET value = value + length(new.value) WHERE name = 'size';
+END;
+CREATE TRIGGER IF NOT EXISTS results_delete AFTER DELETE ON results BEGIN
+    UPDATE counters SET value = value - length(old.value) WHERE name = 'size';
+END;
+COMMIT;
+"""
+
+# Eviction frees space down to this fraction of the size bound, so that it does not run on every store
+_LOW_WATERMARK = 0.9
+
+# Hits are recorded in memory and written out in batches of this size
+_FLUSH_HITS = 256
+
+
+def text_hash(text) -> bytes:
+    """Hash of a text (str or UTF-8 bytes) as used in cache keys."""
+    if isinstance(text, str):
+        text = text.encode('utf-8', 'surrogatepass')
+    return hashlib.blake2b(text, digest_size=16).digest()
+
+
+def _is_busy(error: sqlite3.OperationalError) -> bool:
+    """Whether an error is a lock held by another connection, which clears once that connection is done."""
+    code = getattr(error, 'sqlite_errorcode', None)  # Python 3.11 and later
+    if code is not None:
+        return code & 0xff in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+    message = str(error)
+    return 'locked' in message or 'busy' in message
+
+
+def dictionary_hash(path) -> bytes:
+    """Hash of the content of a dictionary file as used in cache keys."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b''):
+            h.update(block)
+    return h.digest()
+
+
+class ResultCache:
+    """
+    Size-bounded store of hyphenation results in a SQLite database file.
+
+    Args:
+        path (str): database file, created if needed. Any number of processes may open the same file.
+        max_bytes (int): bound of the size of the stored values, the least recently used ones are evicted
+            beyond it
+        timeout (float): seconds to wait for another writer before giving up
+    """
+
+    def __init__(self, path, max_bytes: int = 256 << 20, timeout: float = 30.0):
+        self.path = str(path)
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+        self._hits_flushed = self._misses_flushed = 0
+        self._used = {}  # keys of the hits not written out yet, with the time of their last use
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, timeout=timeout, isolation_level=None, check_same_thread=False)
+        self._setup()
+
+    def _setup(self):
+        # Switching a new database to WAL mode while other processes open it can fail as busy without waiting
+        # on the timeout, as SQLite does not wait where waiting could deadlock, so it is retried until then
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                self._db.execute('PRAGMA journal_mode=WAL')
+                self._db.execute('PRAGMA synchronous=NORMAL')
+                self._db.executescript(_SCHEMA)
+                return
+            except sqlite3.OperationalError as error:
+                if self._db.in_transaction:
+                    self._db.execute('ROLLBACK')
+                if not _is_busy(error) or time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.01)
+
+    def __reduce__(self):
+        # Unpickling opens the same database file again, counters start over
+        return ResultCache, (self.path, self.max_bytes, self.timeout)
+
+    def _transaction(self):
+        return _Transaction(self._db)
+
+    def get(self, dictionary: bytes, mode: str, text) -> "bytes | None":
+        """
+        Look up a result.
+
+        Args:
+            dictionary (bytes): `dictionary_hash` of the dictionary
+            mode (str): kind of result, e.g. the output mode and its options
+            text (str or bytes): hyphenated text
+
+        Returns:
+            bytes: the stored result, or None
+        """
+        key = (dictionary, mode, text_hash(text))
+        with self._lock:
+            row = self._db.execute(
+                'SELECT value FROM results WHERE dictionary = ? AND mode = ? AND text = ?', key
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._used[key] = time.time()
+            if len(self._used) >= _FLUSH_HITS:
+                self._flush()
+            return bytes(row[0])
+
+    def put(self, dictionary: bytes, mode: str, text, value: bytes):
+        """Store a result, evicting the least recently used ones if the cache exceeds its size bound."""
+        if len(value) > self.max_bytes:
+            return
+        key = (dictionary, mode, text_hash(text))
+        with self._lock, self._transaction():
+            # Another process may have stored the same result meanwhile, which is as good
+            self._db.execute(
+                'INSERT OR IGNORE INTO results VALUES (?, ?, ?, ?, ?)', (*key, value, time.time())
+            )
+            self._write_usage()
+            size = self._db.execute("SELECT value FROM counters WHERE name = 'size'").fetchone()[0]
+            if size > self.max_bytes:
+                self._evict(size - int(self.max_bytes * _LOW_WATERMARK))
+
+    def _evict(self, excess: int):
+        victims = []
+        rows = self._db.execute('SELECT dictionary, mode, text, length(value) FROM results ORDER BY used')
+        for dictionary, mode, text, size in rows:
+            victims.append((dictionary, mode, text))
+            excess -= size
+            if excess <= 0:
+                break
+        rows.close()
+        self._db.executemany('DELETE FROM results WHERE dictionary = ? AND mode = ? AND text = ?', victims)
+
+    def _flush(self):
+        if self._used or self.hits != self._hits_flushed or self.misses != self._misses_flushed:
+            with self._transaction():
+                self._write_usage()
+
+    def _write_usage(self):
+        self._db.executemany(
+            'UPDATE results SET used = max(used, ?) WHERE dictionary = ? AND mode = ? AND text = ?',
+            ((used, *key) for key, used in self._used.items()),
+        )
+        self._db.executemany(
+            'UPDATE counters SET value = value + ? WHERE name = ?',
+            ((self.hits - self._hits_flushed, 'hits'), (self.misses - self._misses_flushed, 'misses')),
+        )
+        self._used.clear()
+        self._hits_flushed, self._misses_flushed = self.hits, self.misses
+
+    def flush(self):
+        """Write out the recency of the results looked up and the hit counters, so other processes see them."""
+        with self._lock:
+            self._flush()
+
+    def stats(self) -> dict:
+        """
+        Return the usage of the cache.
+
+        Returns:
+            dict: 'hits', 'misses' and 'hit_rate' of this instance, 'total_hits' and 'total_misses' of all
+                processes since the database was created, 'entries', 'size' (bytes of stored values) and
+                'file_size' (bytes on disk, write-ahead log included)
+        """
+        with self._lock:
+            self._flush()
+            counters = dict(self._db.execute('SELECT name, value FROM counters'))
+            entries = self._db.execute('SELECT count(*) FROM results').fetchone()[0]
+        lookups = self.hits + self.misses
+        file_size = sum(os.path.getsize(p) for p in (self.path, self.path + '-wal') if os.path.exists(p))
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'total_hits': counters['hits'],
+            'total_misses': counters['misses'],
+            'entries': entries,
+            'size': counters['size'],
+            'file_size': file_size,
+        }
+
+    def clear(self):
+        """Remove all stored results."""
+        with self._lock, self._transaction():
+            self._db.execute('DELETE FROM results')
+            self._used.clear()
+
+    def close(self):
+        with self._lock:
+            self._flush()
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class _Transaction:
+    """Write transaction that takes the database lock up front, so concurrent writers queue on the busy timeout."""
+
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        self.db.execute('BEGIN IMMEDIATE')
+
+    def __exit__(self, exc_type, *exc_info):
+        self.db.execute('ROLLBACK' if exc_type else 'COMMIT')
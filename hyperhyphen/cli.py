@@ -0,0 +1,408 @@
+"""Command-line interface, installed as the `hyperhyphen` console script."""
+import argparse
+import glob
+import multiprocessing
+import os
+import pathlib
+import re
+import struct
+import sys
+import time
+
+from .core import Hyphenator, interleave_whitespace, to_spans
+from .dictionaries import get_default_manager
+
+MODES = ("raw", "str", "int", "spans", "binary")
+
+# Hyphenator and options of the current (worker) process, set by `_init_worker`
+_worker = {}
+
+
+def _init_worker(dictionary, mode, separator, index, engine=None):
+    _worker['hyphenator'] = Hyphenator(mode="int", index=index, dictionary=dictionary, engine=engine)
+    _worker['mode'] = mode
+    _worker['separator'] = separator
+
+
+def _format_line(line, lens, mode, separator):
+    if mode == "int":
+        return ' '.join(map(str, lens))
+    elif mode == "spans":
+        return ' '.join(f'{i}:{j}' for i, j in to_spans(lens, skip_whitespace=True))
+    else:
+        # Original text with the separator inserted between the chunks of each word
+        out = []
+        for i, j in to_spans(lens, skip_whitespace=False):
+            if out and not line[i].isspace() and not line[i - 1].isspace():
+                out.append(separator)
+            out.append(line[i:j])
+        return ''.join(out)
+
+
+def process_block(block: bytes) -> tuple[bytes, int]:
+    """
+    Hyphenate a block of complete lines with a single native call.
+
+    Returns:
+        tuple: (output bytes, number of words)
+    """
+    hyphenator, mode, separator = _worker['hyphenator'], _worker['mode'], _worker['separator']
+
+    lines = block.decode('utf-8').split('\n')
+    if lines[-1] == '':
+        lines.pop()
+
+    line_words = [line.split() for line in lines]
+    words = [word.lower() for linewords in line_words for word in linewords]
+
+    if mode == "raw":
+        hyphenated = iter(hyphenator.engine.hyphenate_words_simple(hyphenator.dict, words, hyphenator._buffers))
+        out = '\n'.join(' '.join(next(hyphenated) for _ in linewords) for linewords in line_words)
+        return (out + '\n' if lines else '').encode('utf-8'), len(words)
+
+    wordparts = iter(hyphenator._hyphenate_numbers(words))
+    binary = []
+    text = []
+    for line, linewords in zip(lines, line_words):
+        stripped = line.strip()
+        lens = interleave_whitespace(stripped, [next(wordparts) for _ in linewords])
+        leading = len(line) - len(line.lstrip())
+        trailing = len(line) - len(line.rstrip()) if stripped else 0
+        lens = ([-leading] if leading else []) + lens + ([-trailing] if trailing else [])
+
+        if mode == "binary":
+            binary.append(struct.pack(f'<I{len(lens)}i', len(lens), *lens))
+        else:
+            text.append(_format_line(line, lens, mode, separator))
+
+    if mode == "binary":
+        return b''.join(binary), len(words)
+    return ('\n'.join(text) + '\n' if lines else '').encode('utf-8'), len(words)
+
+
+def read_blocks(files, block_size):
+    """Read files in large blocks that always end on a line boundary."""
+    for f in files:
+        remainder = b''
+        while True:
+            data = f.read(block_size)
+            if not data:
+                break
+            data = remainder + data
+            cut = data.rfind(b'\n') + 1
+            if cut == 0:
+                remainder = data
+                continue
+            remainder = data[cut:]
+            yield data[:cut]
+        if remainder:
+            yield remainder + b'\n'
+
+
+def _open_inputs(paths, buffer_size):
+    for path in paths or ['-']:
+        if path == '-':
+            yield sys.stdin.buffer
+        else:
+            with open(path, 'rb', buffering=buffer_size) as f:
+                yield f
+
+
+def hyphenate_command(args):
+    dictionary = args.dictionary or get_default_manager().install(args.language)
+    initargs = (dictionary, args.mode, args.separator, args.index, args.engine)
+
+    if args.output == '-':
+        out = sys.stdout.buffer
+    else:
+        out = open(args.output, 'wb', buffering=args.block_size)
+
+    blocks = read_blocks(_open_inputs(args.files, args.block_size), args.block_size)
+    n_bytes = n_words = 0
+    start = time.perf_counter()
+
+    def counted(blocks):
+        nonlocal n_bytes
+        for block in blocks:
+            n_bytes += len(block)
+            yield block
+
+    try:
+        if args.jobs > 1:
+            with multiprocessing.Pool(args.jobs, initializer=_init_worker, initargs=initargs) as pool:
+                for data, words in pool.imap(process_block, counted(blocks)):
+                    out.write(data)
+                    n_words += words
+        else:
+            _init_worker(*initargs)
+            for data, words in map(process_block, counted(blocks)):
+                out.write(data)
+                n_words += words
+        out.flush()
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+
+    if not args.quiet:
+        elapsed = max(time.perf_counter() - start, 1e-9)
+        print(
+            f'hyperhyphen: {n_words} words, {n_bytes / 1e6:.1f} MB in {elapsed:.2f} s '
+            f'({n_words / elapsed:,.0f} words/s, {n_bytes / 1e6 / elapsed:.1f} MB/s)',
+            file=sys.stderr,
+        )
+
+
+def _read_words(paths):
+    for f in _open_inputs(paths, 1 << 20):
+        for line in f:
+            yield from line.decode('utf-8').split()
+
+
+def prune_command(args):
+    from .pruning import measure_dictionary, profile_patterns, prune_dictionary, verify_dictionary
+
+    dictionary = args.dictionary or get_default_manager().install(args.language)
+
+    profile = profile_patterns(dictionary, _read_words(args.files))
+    kept, total = prune_dictionary(dictionary, args.output, profile)
+    print(f'hyperhyphen: kept {kept} of {total} patterns in {args.output}', file=sys.stderr)
+
+    if not args.held_out:
+        return
+
+    held_out = list(_read_words(args.held_out))
+    mismatches = verify_dictionary(dictionary, args.output, held_out)
+    for word in mismatches[:10]:
+        print(f'hyperhyphen: different hyphenation of {word!r}', file=sys.stderr)
+    print(
+        f'hyperhyphen: {len(held_out) - len(mismatches)} of {len(held_out)} held-out words hyphenated identically',
+        file=sys.stderr,
+    )
+
+    before, after = measure_dictionary(dictionary, held_out), measure_dictionary(args.output, held_out)
+    for name, key, unit, scale in (('load time', 'load_time', 'ms', 1e3), ('memory', 'memory', 'KiB', 1 / 1024),
+                                   ('throughput', 'words_per_second', 'words/s', 1)):
+        gain = after[key] / before[key] if before[key] else float('nan')
+        print(
+            f'hyperhyphen: {name}: {before[key] * scale:,.1f} -> {after[key] * scale:,.1f} {unit} ({gain:.2f}x)',
+            file=sys.stderr,
+        )
+
+    if mismatches:
+        sys.exit(1)
+
+
+def verify_command(args):
+    from .engines import compare_engines
+
+    dictionary = args.dictionary or get_default_manager().install(args.language)
+    words = list(_read_words(args.files))
+    start = time.perf_counter()
+    mismatches = compare_engines(dictionary, words, args.engine, args.reference)
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    for word in mismatches[:10]:
+        print(f'hyperhyphen: different hyphenation of {word!r}', file=sys.stderr)
+    print(
+        f'hyperhyphen: {len(words) - len(mismatches)} of {len(words)} words hyphenated identically by the '
+        f'{args.engine} and {args.reference} engines ({elapsed:.2f} s)',
+        file=sys.stderr,
+    )
+    if mismatches:
+        sys.exit(1)
+
+
+def _corpus_files(args):
+    """Files of the globs (sorted) and then of the manifest (in its order), None if neither is given."""
+    if not args.patterns and not args.manifest:
+        return None
+    files = sorted({path for pattern in args.patterns for path in glob.glob(pattern, recursive=True)
+                    if os.path.isfile(path)})
+    if args.manifest:
+        with open(args.manifest, encoding='utf-8') as f:
+            files.extend(line.rstrip('\n') for line in f if line.strip())
+    return files
+
+
+def run_command(args):
+    from .corpus import run_corpus
+
+    last_report = 0.0
+
+    def report(stats, final=False):
+        nonlocal last_report
+        if args.quiet or (not final and stats['elapsed'] - last_report < 1.0):
+            return
+        last_report = stats['elapsed']
+        print(
+            f"hyperhyphen: {stats['shards'] + stats['skipped']} of {stats['total_shards']} shards, "
+            f"{stats['files']} files, {stats['bytes'] / 1e6:.1f} MB in {stats['elapsed']:.2f} s "
+            f"({stats['files_per_second']:,.0f} files/s, {stats['bytes_per_second'] / 1e6:.1f} MB/s)",
+            file=sys.stderr,
+        )
+
+    files = _corpus_files(args)
+    if files is not None and not files:
+        sys.exit('hyperhyphen: no input files')
+    stats = run_corpus(
+        args.output, files, dictionary=args.dictionary, language=args.language, jobs=args.jobs,
+        shard_bytes=args.shard_size << 20, engine=args.engine, progress=report,
+    )
+    if stats['skipped'] and not args.quiet:
+        print(f"hyperhyphen: resumed, {stats['skipped']} of {stats['total_shards']} shards were done already",
+              file=sys.stderr)
+    report(stats, final=True)
+
+
+def serve_command(args):
+    from .dictionaries import DictionaryWatcher
+    from .server import HyphenationServer
+
+    dictionaries = {}
+    for language in args.language or ([] if args.dictionary else ['en_US']):
+        dictionaries[language] = get_default_manager().install(language)
+    for path in args.dictionary or []:
+        # Named by the language of hyph_<language>.dic files, by the file name otherwise
+        match = re.match(r'^hyph_(.+)\.dic$', pathlib.Path(path).name)
+        dictionaries[match.group(1) if match else pathlib.Path(path).stem] = path
+
+    address = args.socket or (args.host, args.port)
+    server = HyphenationServer(address, dictionaries, workers=args.workers, max_batch=args.max_batch)
+    watcher = DictionaryWatcher(args.watch) if args.watch else None
+    print(f'hyperhyphen: serving {", ".join(dictionaries)} on {address}', file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if watcher is not None:
+            watcher.stop()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='hyperhyphen', description='Hyper fast hyphenation.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    hyphenate = commands.add_parser(
+        'hyphenate',
+        help='hyphenate text files or stdin',
+        description='Hyphenate text line by line. Every input line produces one output line '
+                    '(or one record in binary mode).',
+    )
+    hyphenate.add_argument('files', nargs='*', help='input files (default: stdin)')
+    group = hyphenate.add_mutually_exclusive_group()
+    group.add_argument('-l', '--language', default='en_US', help='language of the dictionary (default: en_US)')
+    group.add_argument('-d', '--dictionary', help='path to a hyphenation dictionary file')
+    hyphenate.add_argument(
+        '-m', '--mode', choices=MODES, default='str',
+        help="'str': text with separators inserted, 'raw': lowercased hyphenated words, "
+             "'int': chunk lengths, 'spans': start:end of every chunk, "
+             "'binary': little-endian uint32 count followed by int32 chunk lengths (default: str)",
+    )
+    hyphenate.add_argument('-s', '--separator', default='=', help="separator inserted in 'str' mode (default: =)")
+    hyphenate.add_argument('-o', '--output', default='-', help='output file (default: stdout)')
+    hyphenate.add_argument('-i', '--index', help='vocabulary index to consult first')
+    hyphenate.add_argument('-j', '--jobs', type=int, default=1, help='number of worker processes (default: 1)')
+    hyphenate.add_argument(
+        '--block-size', type=int, default=1 << 20,
+        help='bytes of input hyphenated per native call (default: 1 MiB)',
+    )
+    hyphenate.add_argument('-e', '--engine', help='hyphenation engine (default: HYPERHYPHEN_ENGINE or auto)')
+    hyphenate.add_argument('-q', '--quiet', action='store_true', help='do not report throughput on stderr')
+    hyphenate.set_defaults(func=hyphenate_command)
+
+    prune = commands.add_parser(
+        'prune',
+        help='write a dictionary specialized for a corpus',
+        description='Profile which patterns match while hyphenating a sample corpus and write a dictionary with '
+                    'only those patterns. The sample is hyphenated identically by the pruned dictionary, '
+                    'other text is checked with --held-out.',
+    )
+    prune.add_argument('files', nargs='*', help='sample corpus files (default: stdin)')
+    group = prune.add_mutually_exclusive_group()
+    group.add_argument('-l', '--language', default='en_US', help='language of the dictionary (default: en_US)')
+    group.add_argument('-d', '--dictionary', help='path to a hyphenation dictionary file')
+    prune.add_argument('-o', '--output', required=True, help='path of the pruned dictionary to write')
+    prune.add_argument(
+        '--held-out', nargs='+', metavar='FILE',
+        help='corpus files to verify the pruned dictionary on, and to measure load time, memory and throughput '
+             'with; exits with status 1 if any word is hyphenated differently',
+    )
+    prune.set_defaults(func=prune_command)
+
+    verify = commands.add_parser(
+        'verify',
+        help='check that two engines hyphenate a word list identically',
+        description='Hyphenate a word list with an engine and a reference engine, and report the words whose '
+                    'breaks or break priorities differ. Exits with status 1 if there are any.',
+    )
+    verify.add_argument('files', nargs='*', help='word list files, words separated by whitespace (default: stdin)')
+    group = verify.add_mutually_exclusive_group()
+    group.add_argument('-l', '--language', default='en_US', help='language of the dictionary (default: en_US)')
+    group.add_argument('-d', '--dictionary', help='path to a hyphenation dictionary file')
+    verify.add_argument('-e', '--engine', default='native', help='engine to verify (default: native)')
+    verify.add_argument(
+        '-r', '--reference', default='reference',
+        help='engine to verify it against (default: reference, the unmodified upstream libhyphen)',
+    )
+    verify.set_defaults(func=verify_command)
+
+    run = commands.add_parser(
+        'run',
+        help='hyphenate a corpus of files into binary shards, resumable',
+        description='Hyphenate many files with worker processes into shard files holding the break arrays of '
+                    'the files, with an index of the files. Running the same command again after an interruption '
+                    'resumes where it stopped. See hyperhyphen.corpus for the output format.',
+    )
+    run.add_argument(
+        'patterns', nargs='*',
+        help='glob patterns of the input files (** matches directories recursively), may be left out to resume',
+    )
+    run.add_argument('-m', '--manifest', help='file listing further input files, one path per line')
+    run.add_argument('-o', '--output', required=True, help='output directory')
+    group = run.add_mutually_exclusive_group()
+    group.add_argument('-l', '--language', default='en_US', help='language of the dictionary (default: en_US)')
+    group.add_argument('-d', '--dictionary', help='path to a hyphenation dictionary file')
+    run.add_argument('-j', '--jobs', type=int, default=1, help='number of worker processes (default: 1)')
+    run.add_argument('--shard-size', type=int, default=64, help='MiB of input per shard (default: 64)')
+    run.add_argument('-e', '--engine', help='hyphenation engine (default: HYPERHYPHEN_ENGINE or auto)')
+    run.add_argument('-q', '--quiet', action='store_true', help='do not report progress on stderr')
+    run.set_defaults(func=run_command)
+
+    serve = commands.add_parser(
+        'serve',
+        help='serve hyphenation requests to local processes',
+        description='Hold dictionaries loaded once for all local processes and hyphenate the words of concurrent '
+                    'requests together. See hyperhyphen.server for the protocol and the Python client.',
+    )
+    serve.add_argument(
+        '-l', '--language', action='append',
+        help='language of a dictionary to serve, may be repeated (default: en_US without --dictionary)',
+    )
+    serve.add_argument(
+        '-d', '--dictionary', action='append',
+        help='path to a dictionary file to serve, named by the language of its hyph_<language>.dic file name',
+    )
+    group = serve.add_mutually_exclusive_group(required=True)
+    group.add_argument('--socket', help='path of the Unix socket to listen on')
+    group.add_argument('--port', type=int, help='TCP port to listen on')
+    serve.add_argument('--host', default='127.0.0.1', help='address to listen on with --port (default: 127.0.0.1)')
+    serve.add_argument('-w', '--workers', type=int, default=1, help='batches hyphenated at once (default: 1)')
+    serve.add_argument(
+        '--max-batch', type=int, default=1 << 16, help='words hyphenated per native call at most (default: 65536)',
+    )
+    serve.add_argument(
+        '--watch', type=float, metavar='SECONDS',
+        help='reload the dictionaries when their files change, checking at this interval',
+    )
+    serve.set_defaults(func=serve_command)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+"""Helpers for columnar data. pyarrow is only imported when these functions are used."""
+
+
+def hyphenate_arrow(hyphenator, strings):
+    """
+    Hyphenate a pyarrow string or large_string array without converting it to Python strings.
+
+    Args:
+        hyphenator (Hyphenator): hyphenator to use
+        strings (pyarrow.Array): array of type string or large_string
+
+    Returns:
+        pyarrow.ListArray: list<int32> array with the "int" mode output for every row, null where the input is null
+    """
+    import pyarrow as pa
+
+    if isinstance(strings, pa.ChunkedArray):
+        return pa.chunked_array(
+            [hyphenate_arrow(hyphenator, chunk) for chunk in strings.chunks],
+            type=pa.list_(pa.int32()),
+        )
+
+    if pa.types.is_large_string(strings.type):
+        fmt = 'q'
+    elif pa.types.is_string(strings.type):
+        fmt = 'i'
+    else:
+        raise TypeError(f"Expected a string or large_string array, got {strings.type}")
+
+    _, offsets_buffer, data_buffer = strings.buffers()
+    offsets = memoryview(offsets_buffer).cast('B').cast(fmt)[strings.offset:strings.offset + len(strings) + 1]
+    data = memoryview(data_buffer) if data_buffer is not None else b''
+
+    out_offsets, values = hyphenator.hyphenate_column(offsets, data)
+    return pa.ListArray.from_arrays(
+        pa.Array.from_buffers(pa.int32(), len(out_offsets), [None, pa.py_buffer(out_offsets)]),
+        pa.Array.from_buffers(pa.int32(), len(values), [None, pa.py_buffer(values)]),
+        mask=strings.is_null() if strings.null_count else None,
+    )
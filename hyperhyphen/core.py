@@ -1,12 +1,18 @@
 import pathlib
 import re
+from array import array
 from itertools import zip_longest, chain, accumulate
 from typing import Literal
 
-from ._lib import load_dictionary, hyphenate_words_numbers, hyphenate_words_simple
+from ._lib import BufferPool
+from .engines import Engine, get_engine
 from .dictionaries import get_default_manager, DictionaryManager
+from .index import VocabularyIndex
+from .cache import ResultCache
+from .results import Chunks
 
 whitespace_pattern = re.compile(r'\s+')
+token_pattern = re.compile(r'\S+|\s+')
 
 def clean_whitespace(text: str) -> str:
     """Hyphenation is only defined for words. This function breaks the text into words seperated by newline characters."""
@@ -18,54 +24,258 @@ def to_spans(int_output: list[int], skip_whitespace: bool=True) -> list[tuple[in
         (a, a + abs(l)) for a, l in zip(acc, int_output) if not skip_whitespace or l > 0
     ]
 
+def interleave_whitespace(text: str, wordparts: list[list[int]]) -> list[int]:
+    """Interleave the chunk lengths of the words in text with the (negative) lengths of the whitespace between them."""
+    whitespaces = (-len(m.group(0)) for m in whitespace_pattern.finditer(text))
+    return [
+               i
+               for wplens, wslen in zip_longest(wordparts, whitespaces, fillvalue=0)
+               for i in (*wplens, wslen)
+           ][:-1]
+
 class Hyphenator:
     def __init__(
         self,
         dictionary_manager: "DictionaryManager" = get_default_manager(),
         language: str = "en_US",
-        mode: Literal["raw", "str", "int", "spans"] = "str",
+        mode: Literal["raw", "str", "int", "spans", "lazy", "insert", "tokens", "weighted"] = "str",
+        index: "str | VocabularyIndex | None" = None,
+        dictionary: "str | None" = None,
+        separator: str = "\u00ad",
+        cache: "str | ResultCache | None" = None,
+        engine: "str | Engine | None" = None,
     ):
         assert mode in (
             "raw",
             "str",
             "int",
             "spans",
-        ), "mode must be 'str' or 'int' or 'spans' or 'raw'"
+            "lazy",
+            "insert",
+            "tokens",
+            "weighted",
+        ), "mode must be 'str' or 'int' or 'spans' or 'raw' or 'lazy' or 'insert' or 'tokens' or 'weighted'"
 
-        dictpath = dictionary_manager.install(language)
+        dictpath = str(dictionary or dictionary_manager.install(language))
         p = pathlib.Path(dictpath)
         if not p.exists():
             raise FileNotFoundError(f'File not found: {p.absolute()}')
 
         self.mode = mode
-        self.dict = load_dictionary(dictpath)
+        self.separator = separator
+        self.language = language
+        self.dictpath = dictpath
+        # Only a dictionary installed for the language may be installed again where the path is missing
+        self._from_language = not dictionary
+        # Engine that loads the dictionary and hyphenates with it, see hyperhyphen.engines
+        self.engine = get_engine(engine)
+        self._dict = self.engine.load(dictpath)
+        # (handle, content hash) of the dictionary last used with the cache or the index
+        self._dictionary_hash = None
+        self.index = VocabularyIndex(index) if isinstance(index, (str, pathlib.Path)) else index
+        if self.index is not None and self.index.dictionary_hash != self._content_hash(self._dict):
+            raise ValueError(f"The index {self.index.path} was built with another dictionary than {dictpath}")
+        self.cache = ResultCache(cache) if isinstance(cache, (str, pathlib.Path)) else cache
+        # Output buffers reused by the native calls of this hyphenator
+        self._buffers = BufferPool()
+
+    @property
+    def dict(self):
+        """Engine handle of the loaded dictionary, loaded on first use after unpickling and swapped after a reload."""
+        if self._dict is None and not pathlib.Path(self.dictpath).exists():
+            if not self._from_language:
+                raise FileNotFoundError(f'File not found: {pathlib.Path(self.dictpath).absolute()}')
+            # Pickled on another machine, install the dictionary of the same language here
+            self.dictpath = get_default_manager().install(self.language)
+        dict_ptr = self.engine.load(self.dictpath)
+        self._dict = dict_ptr
+        return dict_ptr
+
+    def reload(self) -> None:
+        """
+        Load the dictionary file again, e.g. after it was updated, for this and all other Hyphenators using it.
+
+        Calls in progress in other threads finish with the previous dictionary.
+        """
+        self.engine.reload(self.dictpath)
+
+    def __getstate__(self):
+        # The dictionary handle is only valid in this process, it is reloaded from its path on first use
+        state = self.__dict__.copy()
+        state['_dict'] = None
+        state['_dictionary_hash'] = None
+        return state
+
+    @property
+    def dictionary_hash(self) -> "bytes | None":
+        """Hash of the content the dictionary was loaded from, which keys the results in the cache."""
+        return self._content_hash(self.dict)
+
+    def _content_hash(self, handle) -> "bytes | None":
+        """Hash of the content a dictionary handle was loaded from, None if a reload swapped it out since."""
+        entry = self._dictionary_hash
+        if entry is not None and entry[0] is handle:
+            return entry[1]
+        digest = self.engine.content_hash(self.dictpath, handle)
+        if digest is not None:
+            self._dictionary_hash = (handle, digest)
+        return digest
+
+    def _cache_key(self, handle) -> "bytes | None":
+        """Dictionary hash of the cache entries of results of handle, None if they are not cached."""
+        return None if self.cache is None else self._content_hash(handle)
+
+    def _cache_get(self, key: "bytes | None", kind: str, text) -> "bytes | None":
+        if key is None:
+            return None
+        return self.cache.get(key, kind, text)
+
+    def _cache_put(self, key: "bytes | None", kind: str, text, value: bytes):
+        if key is not None:
+            self.cache.put(key, kind, text, value)
+
+    @property
+    def memory_footprint(self) -> int:
+        """Number of bytes of memory used by the loaded dictionary."""
+        return self.engine.footprint(self.dict)
+
+    def _hyphenate_numbers(self, words: list[str], handle=None) -> list[list[int]]:
+        """Hyphenate words, looking them up in the vocabulary index first if there is one."""
+        handle = self.dict if handle is None else handle
+        # An index of the dictionary before a reload is ignored, until it is rebuilt
+        index = self.index
+        if index is None or index.dictionary_hash != self._content_hash(handle):
+            return self.engine.hyphenate_words_numbers(handle, words, self._buffers)
+
+        wordparts = [index.get(word) for word in words]
+        misses = [i for i, parts in enumerate(wordparts) if parts is None]
+        if misses:
+            missed = self.engine.hyphenate_words_numbers(handle, [words[i] for i in misses], self._buffers)
+            for i, parts in zip(misses, missed):
+                wordparts[i] = parts
+        return wordparts
+
+    def _hyphenate_weighted(self, text: str, words: list[str], handle) -> tuple[list[int], array]:
+        """The "int" mode output of text, with the priority of the break after every chunk in a byte array."""
+        values, offsets, levels = self.engine.hyphenate_tokens(handle, words, priorities=True)
+        whitespaces = [-len(m.group(0)) for m in whitespace_pattern.finditer(text)]
+        lens, priorities = [], array('B')
+        for i in range(len(words)):
+            if i:
+                lens.append(whitespaces[i - 1])
+                priorities.append(0)
+            lens.extend(values[offsets[i]:offsets[i + 1]])
+            priorities.extend(levels[offsets[i]:offsets[i + 1]])
+        return lens, priorities
 
     def __call__(self, text: str):
+        # One dictionary for the whole call, with the cache key of its results, even if a reload swaps it meanwhile
+        handle = self.dict
+        key = self._cache_key(handle)
+
+        if self.mode == 'insert':
+            # The native library copies the text and inserts the separators in a single pass
+            data = text if isinstance(text, bytes) else text.encode('utf-8')
+            kind = 'insert:' + self.separator
+            out = self._cache_get(key, kind, data)
+            if out is None:
+                out = self.engine.hyphenate_insert(handle, data, self.separator.encode('utf-8'), self._buffers)
+                self._cache_put(key, kind, data, out)
+            return out if isinstance(text, bytes) else out.decode('utf-8')
+
+        if self.mode == 'tokens':
+            # Words and whitespace runs only, words are hyphenated on demand with `breaks` or `break_before`
+            return Chunks(text, array('I', chain((m.start() for m in token_pattern.finditer(text)), (len(text),))))
+
         clean_text = clean_whitespace(text)
         inputs = clean_text.lower()
 
         # Some safety checks before proceeding in int output mode
-        if self.mode in ('int', 'str') and (text[0].isspace() or text[-1].isspace()):
-                raise ValueError("Input text cannot start or end with whitespace in 'int' or 'str' mode.")
+        if self.mode in ('int', 'str', 'lazy', 'weighted') and (text[0].isspace() or text[-1].isspace()):
+                raise ValueError(
+                    "Input text cannot start or end with whitespace in 'int', 'str', 'lazy' or 'weighted' mode."
+                )
 
-        words = inputs.split('\n')
+        if self.mode == 'weighted':
+            return self._hyphenate_weighted(text, inputs.split('\n'), handle)
 
         if self.mode == 'raw':
-            return '\n'.join(hyphenate_words_simple(self.dict, words))
+            out = self._cache_get(key, 'raw', text)
+            if out is not None:
+                return out.decode('utf-8')
+            out = '\n'.join(self.engine.hyphenate_words_simple(handle, inputs.split('\n'), self._buffers))
+            self._cache_put(key, 'raw', text, out.encode('utf-8'))
+            return out
 
-        wordparts = hyphenate_words_numbers(self.dict, words)
-        whitespaces = (-len(m.group(0)) for m in whitespace_pattern.finditer(text))
-
-        # Interleave the word chunk lengths with the whitespace
-        lens = [
-                   i
-                   for wplens, wslen in zip_longest(wordparts, whitespaces, fillvalue=0)
-                   for i in (*wplens, wslen)
-               ][:-1]
+        # The chunk lengths of the "int" mode are cached for all the modes derived from them
+        out = self._cache_get(key, 'int', text)
+        if out is not None:
+            lens = array('i', out).tolist()
+        else:
+            wordparts = self._hyphenate_numbers(inputs.split('\n'), handle)
+            lens = interleave_whitespace(text, wordparts)
+            self._cache_put(key, 'int', text, array('i', lens).tobytes())
 
         if self.mode == "int":
             return lens
         elif self.mode == "spans":
             return list(to_spans(lens, skip_whitespace=True))
+        elif self.mode == "lazy":
+            return Chunks.from_lengths(text, lens)
         else:
             return [text[i:j] for i, j in to_spans(lens, skip_whitespace=False)]
+
+    def hyphenate_column(self, offsets, data):
+        """
+        Hyphenate a column of texts held as an Arrow-style offsets buffer and UTF-8 data buffer.
+
+        All rows are processed in one native call, without creating Python objects per row. Rows may
+        start or end with whitespace, which is reported like the whitespace between words.
+
+        Args:
+            offsets: buffer of n + 1 int32 or int64 offsets, row i is data[offsets[i]:offsets[i + 1]]. A ValueError
+                is raised if they decrease or point outside data.
+            data: buffer with the UTF-8 encoded text of all rows
+
+        Returns:
+            tuple: (offsets, values) int32 arrays in the layout of an Arrow list<int32> column, with the
+                "int" mode output of row i in values[offsets[i]:offsets[i + 1]]
+        """
+        return self.engine.hyphenate_column(self.dict, offsets, data)
+
+    def hyphenate_tokens(self, tokens, priorities: bool = False):
+        """
+        Hyphenate pre-tokenized words in a single native pass, without whitespace handling.
+
+        Args:
+            tokens (sequence of str): words to hyphenate
+            priorities (bool): also return the pattern priority of every break
+
+        Returns:
+            tuple: (breaks, offsets) int32 arrays in CSR layout, where breaks[offsets[i]:offsets[i + 1]]
+                are the chunk lengths of token i. Empty tokens have no chunks. With priorities, a third
+                uint8 array holds the priority of the break after each chunk (0 after the last one).
+        """
+        return self.engine.hyphenate_tokens(self.dict, tokens, priorities)
+
+    def breaks(self, word: str, min_priority: int = 1) -> tuple:
+        """
+        Hyphenate a single word with one native call, e.g. the word that overflows a line.
+
+        Args:
+            min_priority (int): only return the breaks of at least this pattern priority (1, 3, 5, 7 or 9)
+
+        Returns:
+            tuple: positions where the word may be broken, in characters from its start
+        """
+        return self.engine.word_breaks(self.dict, word, min_priority)
+
+    def break_before(self, word: str, column: int, min_priority: int = 1) -> int:
+        """
+        Return the last position at or before column where a single word may be broken, or 0 if there is none.
+
+        Meant for line breakers: `word[:n]` plus a hyphen fits in the remaining space of a line when
+        column is that space minus the width of the hyphen. With a min_priority above 1, only the breaks
+        of at least that pattern priority are considered.
+        """
+        return self.engine.best_break(self.dict, word, column, min_priority)
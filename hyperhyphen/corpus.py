@@ -0,0 +1,258 @@
+"""Hyphenation of large corpora of files into compact binary shards, resumable after an interruption.
+
+The files of a run are planned into shards of about `shard_bytes` of input each. Every shard is hyphenated by a
+worker process with a single native call and written as one shard file, with the break arrays of its files in the
+layout of an Arrow list<int32> column:
+
+    magic b'HYPH', uint32 version, uint32 number of files n      (little-endian)
+    int32 offsets[n + 1]
+    int32 values[offsets[n]]
+
+values[offsets[i]:offsets[i + 1]] is the "int" mode output of file i of the shard: the lengths of the chunks of its
+words interleaved with the negative lengths of the whitespace, in characters, whitespace at the start and end of the
+file included. The output directory holds:
+
+    run.json          dictionary, engine and shard size of the run, checked when it resumes
+    index.tsv         shard, row in the shard, size in bytes and path of every file, tab-separated
+    checkpoint        number of every completed shard, one per line
+    shard-00000.bin   ...
+
+A shard is written to a temporary file and renamed into place before it is recorded in the checkpoint, so running
+the same job again into the same directory skips the completed shards and redoes the others.
+"""
+import json
+import multiprocessing
+import os
+import struct
+import sys
+import time
+from array import array
+
+from .cache import dictionary_hash
+from .core import Hyphenator
+from .dictionaries import get_default_manager
+from .engines import get_engine
+
+_MAGIC = b'HYPH'
+_VERSION = 1
+_HEADER = struct.Struct('<4sII')
+
+# Hyphenator of the current (worker) process, set by `_init_worker`
+_worker = {}
+
+
+def _init_worker(dictionary, engine):
+    _worker['hyphenator'] = Hyphenator(dictionary=dictionary, engine=engine)
+
+
+def plan_shards(files, shard_bytes: int = 64 << 20) -> list[list[tuple[str, int]]]:
+    """Group files in their order into shards of about shard_bytes of input, as lists of (path, size)."""
+    shards, shard, size = [], [], 0
+    for path in files:
+        path = str(path)
+        if '\t' in path or '\n' in path:
+            raise ValueError(f"Paths with tabs or newlines are not supported: {path!r}")
+        file_size = os.path.getsize(path)
+        if shard and size + file_size > shard_bytes:
+            shards.append(shard)
+            shard, size = [], 0
+        shard.append((path, file_size))
+        size += file_size
+    if shard:
+        shards.append(shard)
+    return shards
+
+
+def _shard_path(output: str, shard: int) -> str:
+    return os.path.join(output, f'shard-{shard:05d}.bin')
+
+
+def write_shard(path: str, offsets, values):
+    """Write the break arrays of the files of a shard, replacing the file atomically."""
+    offsets, values = array('i', offsets), array('i', values)
+    if sys.byteorder == 'big':
+        offsets.byteswap()
+        values.byteswap()
+    tmppath = f'{path}.tmp'
+    with open(tmppath, 'wb') as f:
+        f.write(_HEADER.pack(_MAGIC, _VERSION, len(offsets) - 1))
+        f.write(offsets.tobytes())
+        f.write(values.tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmppath, path)
+
+
+def read_shard(path: str) -> tuple[array, array]:
+    """
+    Read a shard file.
+
+    Returns:
+        tuple: (offsets, values) int32 arrays, values[offsets[i]:offsets[i + 1]] being the output of file i
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    magic, version, n = _HEADER.unpack_from(data)
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError(f"Not a shard file of version {_VERSION}: {path}")
+    start = _HEADER.size
+    offsets = array('i', data[start:start + 4 * (n + 1)])
+    values = array('i', data[start + 4 * (n + 1):])
+    if sys.byteorder == 'big':
+        offsets.byteswap()
+        values.byteswap()
+    if len(offsets) != n + 1 or len(values) != offsets[n]:
+        raise ValueError(f"Truncated shard file: {path}")
+    return offsets, values
+
+
+def read_index(output: str) -> list[tuple[int, int, int, str]]:
+    """Return the (shard, row, size, path) of every file of the run in an output directory."""
+    entries = []
+    with open(os.path.join(output, 'index.tsv'), encoding='utf-8') as f:
+        for line in f:
+            shard, row, size, path = line.rstrip('\n').split('\t', 3)
+            entries.append((int(shard), int(row), int(size), path))
+    return entries
+
+
+def iter_results(output: str):
+    """Yield the (path, "int" mode output) of every file of a completed run, in the order of the index."""
+    current, shard_data = None, None
+    for shard, row, size, path in read_index(output):
+        if shard != current:
+            current, shard_data = shard, read_shard(_shard_path(output, shard))
+        offsets, values = shard_data
+        yield path, values[offsets[row]:offsets[row + 1]]
+
+
+def _hyphenate_shard(task):
+    """Hyphenate the files of a shard with a single native call and write the shard file."""
+    output, shard, files = task
+    data = bytearray()
+    offsets = array('q', [0])
+    for path, _ in files:
+        with open(path, 'rb') as f:
+            data += f.read()
+        offsets.append(len(data))
+    out_offsets, values = _worker['hyphenator'].hyphenate_column(offsets, data)
+    write_shard(_shard_path(output, shard), out_offsets, values)
+    return shard, len(files), len(data)
+
+
+def _write_atomic(path: str, text: str):
+    tmppath = f'{path}.tmp'
+    with open(tmppath, 'w', encoding='utf-8') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmppath, path)
+
+
+def _start_run(output, files, dictionary, engine, shard_bytes):
+    """Plan a new run or read the plan of the interrupted one, and return its shards."""
+    settings = {
+        'version': _VERSION,
+        'dictionary': dictionary,
+        'dictionary_hash': dictionary_hash(dictionary).hex(),
+        'engine': engine.name,
+        'shard_bytes': shard_bytes,
+    }
+    run_path = os.path.join(output, 'run.json')
+    if os.path.exists(run_path):
+        with open(run_path, encoding='utf-8') as f:
+            previous = json.load(f)
+        changed = [key for key in ('version', 'dictionary_hash', 'engine', 'shard_bytes')
+                   if previous.get(key) != settings[key]]
+        if changed:
+            raise ValueError(f"{output} holds a run with another {', '.join(changed)}, use another output directory")
+        shards = {}
+        for shard, row, size, path in read_index(output):
+            shards.setdefault(shard, []).append((path, size))
+        shards = [shards[i] for i in range(len(shards))]
+        if files is not None and [str(path) for path in files] != [path for shard in shards for path, _ in shard]:
+            raise ValueError(f"{output} holds a run of other files, use another output directory")
+        return shards
+
+    if files is None:
+        raise ValueError(f"No files given and no run to resume in {output}")
+    os.makedirs(output, exist_ok=True)
+    shards = plan_shards(files, shard_bytes)
+    # The index is complete before any shard is written, so that an interrupted run resumes the same plan
+    _write_atomic(os.path.join(output, 'index.tsv'), ''.join(
+        f'{shard}\t{row}\t{size}\t{path}\n'
+        for shard, shard_files in enumerate(shards) for row, (path, size) in enumerate(shard_files)
+    ))
+    _write_atomic(run_path, json.dumps({**settings, 'files': sum(map(len, shards)), 'shards': len(shards)}, indent=2))
+    return shards
+
+
+def _completed_shards(output: str) -> set[int]:
+    try:
+        with open(os.path.join(output, 'checkpoint'), encoding='utf-8') as f:
+            done = {int(line) for line in f if line.strip()}
+    except FileNotFoundError:
+        return set()
+    # A shard file that went missing since is done again
+    return {shard for shard in done if os.path.exists(_shard_path(output, shard))}
+
+
+def run_corpus(output: str, files=None, dictionary: "str | None" = None, language: str = 'en_US', jobs: int = 1,
+               shard_bytes: int = 64 << 20, engine=None, progress=None) -> dict:
+    """
+    Hyphenate a corpus of files into shard files in an output directory, resuming an interrupted run there.
+
+    Args:
+        output (str): output directory, created if needed
+        files (iterable of str): paths of the files, in the order of the index. May be None to resume a run.
+        dictionary (str): path of the dictionary (default: the installed dictionary of language)
+        language (str): language of the dictionary when no dictionary path is given
+        jobs (int): number of worker processes
+        shard_bytes (int): input bytes per shard, a larger file is a shard of its own
+        engine: engine of the workers, see `hyperhyphen.engines.get_engine`
+        progress (callable): called with the statistics (see Returns) after every completed shard
+
+    Returns:
+        dict: 'files', 'bytes' and 'shards' done in this call, 'skipped' shards completed by an earlier call,
+            'total_files' and 'total_shards' of the run, 'elapsed' seconds, 'files_per_second' and
+            'bytes_per_second'
+    """
+    dictionary = str(dictionary or get_default_manager().install(language))
+    engine = get_engine(engine)
+    output = str(output)
+    shards = _start_run(output, files, dictionary, engine, shard_bytes)
+
+    done = _completed_shards(output)
+    tasks = [(output, shard, shard_files) for shard, shard_files in enumerate(shards) if shard not in done]
+    stats = {
+        'files': 0, 'bytes': 0, 'shards': 0, 'skipped': len(shards) - len(tasks),
+        'total_files': sum(map(len, shards)), 'total_shards': len(shards),
+        'elapsed': 0.0, 'files_per_second': 0.0, 'bytes_per_second': 0.0,
+    }
+    start = time.perf_counter()
+
+    with open(os.path.join(output, 'checkpoint'), 'a', encoding='utf-8') as checkpoint:
+        def record(results):
+            for shard, n_files, n_bytes in results:
+                checkpoint.write(f'{shard}\n')
+                checkpoint.flush()
+                os.fsync(checkpoint.fileno())
+                elapsed = max(time.perf_counter() - start, 1e-9)
+                stats.update(
+                    files=stats['files'] + n_files, bytes=stats['bytes'] + n_bytes, shards=stats['shards'] + 1,
+                    elapsed=elapsed,
+                )
+                stats.update(files_per_second=stats['files'] / elapsed, bytes_per_second=stats['bytes'] / elapsed)
+                if progress is not None:
+                    progress(dict(stats))
+
+        initargs = (dictionary, engine.name)
+        if jobs > 1 and len(tasks) > 1:
+            with multiprocessing.Pool(min(jobs, len(tasks)), initializer=_init_worker, initargs=initargs) as pool:
+                record(pool.imap_unordered(_hyphenate_shard, tasks))
+        else:
+            _init_worker(*initargs)
+            record(map(_hyphenate_shard, tasks))
+
+    stats['elapsed'] = time.perf_counter() - start
+    return stats
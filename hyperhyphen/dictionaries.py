@@ -1,9 +1,15 @@
+import os
 import re
+import tempfile
+import threading
+import time
 import urllib.error
 import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from xml.etree import ElementTree
 
+from .engines import changed_dictionaries, get_engine, reload_dictionary
 from .appdirs import user_data_dir
 
 DEFAULT_DICT_PATH = Path(user_data_dir('hyperhyphen', 'hyperhyphen'))
@@ -237,13 +243,21 @@ class DictionaryStorage:
         raise KeyError(f"Language '{language}' is not installed")
 
     def add_dictionary(self, language, content):
-        """Add a new dictionary file."""
+        """Add a new dictionary file, or replace it atomically, so that it is never read half written."""
         filename = f'hyph_{language}.dic'
         filepath = self.directory / filename
 
-        # Save dictionary file
-        with open(filepath, 'wb') as f:
-            f.write(content)
+        # Save dictionary file next to its destination, then rename it over the destination
+        fd, tmppath = tempfile.mkstemp(prefix=f'.{filename}.', suffix='.tmp', dir=self.directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmppath, filepath)
+        except BaseException:
+            os.unlink(tmppath)
+            raise
 
         return str(filepath)
 
@@ -277,6 +291,9 @@ class DictionaryManager:
         """
         self.storage = DictionaryStorage(directory)
         self.downloader = DictionaryDownloader(repository_url)
+        # Threads that install the same dictionary at once download it once, other languages install in parallel
+        self._install_locks = {}
+        self._lock = threading.Lock()
 
     def list_installed(self):
         """Return a list of locales for which dictionaries are installed."""
@@ -304,32 +321,37 @@ class DictionaryManager:
             language (str): code of the form 'll_CC'. Example: 'en_US' for English, USA
             use_description (bool): if True, parse dictionaries.xcu file to
                 automatically find the appropriate dictionary.
-            overwrite (bool): if True, overwrite any existing dictionary. Default: False
+            overwrite (bool): if True, overwrite any existing dictionary, and reload it if it is in use. Default: False
             **request_args: additional kwargs to be passed to `requests.get()` for HTTP configuration
 
         Returns:
             str: The path to the file that was downloaded or is already installed.
         """
-        # Return existing installation if not overwriting
-        if not overwrite and self.storage.is_installed(language):
-            return str(self.storage.get_filepath(language))
-
-        # Try to find dictionary location from metadata
-        dict_url = None
-
-        if use_description:
-            try:
-                dict_url, locales = self.downloader.find_dictionary_location(language, **request_args)
-            except IOError:
-                pass  # Fall back to guessing URL
-
-        # Fall back to guessing URL if metadata approach failed
-        if not dict_url:
-            dict_url = f'{self.downloader.repository_url.rstrip("/")}/{language}/hyph_{language}.dic'
-
-        # Download and install dictionary
-        content = self.downloader.download_dictionary(dict_url, **request_args)
-        return self.storage.add_dictionary(language, content)
+        with self._lock:
+            install_lock = self._install_locks.setdefault(language, threading.Lock())
+        with install_lock:
+            # Return existing installation if not overwriting
+            if not overwrite and self.storage.is_installed(language):
+                return str(self.storage.get_filepath(language))
+
+            # Try to find dictionary location from metadata
+            dict_url = None
+
+            if use_description:
+                try:
+                    dict_url, locales = self.downloader.find_dictionary_location(language, **request_args)
+                except IOError:
+                    pass  # Fall back to guessing URL
+
+            # Fall back to guessing URL if metadata approach failed
+            if not dict_url:
+                dict_url = f'{self.downloader.repository_url.rstrip("/")}/{language}/hyph_{language}.dic'
+
+            # Download and install dictionary, Hyphenators that use a previous version switch to the new one
+            content = self.downloader.download_dictionary(dict_url, **request_args)
+            path = self.storage.add_dictionary(language, content)
+            reload_dictionary(path)
+            return path
 
     def uninstall(self, language):
         """
@@ -341,11 +363,114 @@ class DictionaryManager:
         """
         self.storage.remove_dictionary(language)
 
+
+class DictionaryWatcher:
+    """
+    Reload the dictionaries in use when their files change, from a background thread.
+
+    The loaded dictionary files are checked every `interval` seconds. A changed one is loaded again in the
+    background and swapped into all Hyphenators that use it, while calls in progress finish with the previous
+    one. Dictionaries should be updated by replacing their files atomically, as `DictionaryManager.install`
+    does, a file that fails to load keeps the previous dictionary in use.
+
+    Args:
+        interval (float): seconds between checks
+    """
+
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+        self.reloads = 0
+        self.errors = []  # (path, exception) of the files that failed to load
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='hyperhyphen-dictionary-watcher', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def check(self) -> int:
+        """Reload the changed dictionaries now and return their number."""
+        reloaded = 0
+        for path in changed_dictionaries():
+            try:
+                reload_dictionary(path)
+                reloaded += 1
+            except (OSError, RuntimeError, MemoryError) as e:
+                self.errors.append((path, e))
+        self.reloads += reloaded
+        return reloaded
+
+    def stop(self):
+        """Stop watching, waiting for a reload in progress."""
+        self._stop.set()
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
 _default_manager = None
+_default_manager_lock = threading.Lock()
 
 def get_default_manager():
-    """Get the default DictionaryManager instance."""
+    """Get the default DictionaryManager instance. Safe to call from many threads."""
     global _default_manager
-    if _default_manager is None:
-        _default_manager = DictionaryManager()
-    return _default_manager
\ No newline at end of file
+    manager = _default_manager
+    if manager is None:
+        with _default_manager_lock:
+            if _default_manager is None:
+                _default_manager = DictionaryManager()
+            manager = _default_manager
+    return manager
+
+
+def preload(languages=(), workers: int = 4, dictionaries=(), manager: "DictionaryManager | None" = None,
+            engine=None) -> dict:
+    """
+    Load many dictionaries at once, e.g. when a service starts, so that creating Hyphenators for them afterwards
+    loads nothing.
+
+    A pool of threads installs the languages if needed and loads all dictionaries, so that downloads of different
+    languages run in parallel. The native loader releases the GIL, so the files are read and their automata built
+    in parallel too.
+
+    Args:
+        languages (iterable of str): language codes, installed with the manager if needed
+        workers (int): number of dictionaries loaded at once
+        dictionaries (iterable of str): paths of further dictionary files
+        manager (DictionaryManager): manager of the languages (default: `get_default_manager()`)
+        engine: engine that loads the dictionaries, by default the one of Hyphenators created without an engine
+
+    Returns:
+        dict: for every language and dictionary path, a dict of its 'path', 'load_time' (seconds spent loading it,
+            without the install, 0.0 for a dictionary that was loaded already) and 'memory' (bytes, None if the
+            engine does not report it)
+    """
+    manager = manager or get_default_manager()
+    engine = get_engine(engine)
+    # Whether every name is a language to install, or the path of a dictionary file
+    names = {language: True for language in languages}
+    names.update((str(path), False) for path in dictionaries)
+
+    def load(item):
+        name, language = item
+        path = str(manager.install(name)) if language else name
+        if engine.is_loaded(path):
+            handle, load_time = engine.load(path), 0.0
+        else:
+            start = time.perf_counter()
+            handle = engine.load(path)
+            load_time = time.perf_counter() - start
+        try:
+            memory = engine.footprint(handle)
+        except NotImplementedError:
+            memory = None
+        return {'path': path, 'load_time': load_time, 'memory': memory}
+
+    with ThreadPoolExecutor(max(1, min(workers, len(names) or 1)), thread_name_prefix='hyperhyphen-preload') as pool:
+        # A failed install or load raises here, once the others are done
+        return dict(zip(names, pool.map(load, names.items())))
\ No newline at end of file
@@ -0,0 +1,715 @@
+"""Hyphenation engines and their differential verification.
+
+An engine loads dictionaries and hyphenates batches of words with them. `Hyphenator` does all its work through
+one, chosen with its `engine` argument or the HYPERHYPHEN_ENGINE environment variable:
+
+- "native": the C library (libhyphen with the batch, cache and compact automaton extensions of this package),
+  called through the ctypes or cffi backend, see `_lib.BACKEND`.
+- "reference": the unmodified upstream libhyphen (lib/reference), without the extensions of the native library,
+  called word by word. It is the reference that the other engines are verified against with `compare_engines`.
+- "python": an independent pure-Python implementation of the libhyphen algorithm. It is much slower and does not
+  support dictionaries with non-standard hyphenation ("ff/f=f" patterns).
+
+"auto" picks the highest ranked engine that is available. New engines subclass `Engine`, implement `open`,
+`free` and `hyphenate_tokens`, override the other operations where they have a faster path, and are registered
+with `register_engine`.
+"""
+import ctypes
+import os
+import re
+import threading
+from array import array
+
+from . import _lib
+
+# Engine used by Hyphenators created without an engine argument: 'auto' or the name of an engine
+ENGINE = os.environ.get('HYPERHYPHEN_ENGINE', 'auto')
+
+_token_pattern = _lib._token_pattern
+_split = _lib._split
+
+
+class Engine:
+    """
+    Interface of the hyphenation engines.
+
+    A dictionary opened by an engine is an opaque handle that is only passed back to the same engine. `open`,
+    `free` and `hyphenate_tokens` are required, the other operations are implemented on top of
+    `hyphenate_tokens` and may be overridden with faster paths. The `buffers` arguments are a `BufferPool`
+    used by the native engine, other engines ignore them.
+    """
+
+    # Name used to select the engine
+    name = None
+    # 'auto' selects the available engine of the highest rank
+    rank = 0
+
+    def __init__(self):
+        # Handles shared by `load`, the file signature of every loaded path when it was (re)loaded, and the
+        # (handle, content hash) of every loaded path
+        self._loaded = {}
+        self._signatures = {}
+        self._hashes = {}
+        self._lock = threading.Lock()
+        # Locks of the loads in progress, per path, so that different dictionaries load in parallel
+        self._loading = {}
+
+    @classmethod
+    def available(cls) -> bool:
+        """Whether the engine can run in this process, e.g. its optional dependencies are installed."""
+        return True
+
+    def __reduce__(self):
+        # Engines are per process, unpickling gives the engine of the same name there
+        return get_engine, (self.name,)
+
+    def __repr__(self):
+        return f'<{type(self).__name__} {self.name!r}>'
+
+    def open(self, path: str):
+        """Load a private copy of a dictionary, which has to be released with `free`."""
+        raise NotImplementedError
+
+    def free(self, handle):
+        """Release a dictionary returned by `open`."""
+        raise NotImplementedError
+
+    def hyphenate_tokens(self, handle, tokens, priorities: bool = False):
+        """
+        Hyphenate a sequence of tokens, lowercased for the lookup.
+
+        Returns:
+            tuple: (values, offsets) int32 arrays in CSR layout, values[offsets[i]:offsets[i + 1]] holds the
+                chunk lengths of token i, empty tokens have no chunks. With priorities, a third uint8 array holds
+                the pattern priority of the break after each chunk, 0 after the last chunk of a token.
+        """
+        raise NotImplementedError
+
+    def load(self, path: str):
+        """Load a dictionary once per engine and return the shared handle. Safe to call from many threads."""
+        handle = self._loaded.get(path)
+        if handle is None:
+            with self._lock:
+                lock = self._loading.setdefault(path, threading.Lock())
+            with lock:
+                handle = self._loaded.get(path)
+                if handle is None:
+                    handle, signature, digest = _lib._load_hashed(self.open, path)
+                    with self._lock:
+                        self._loaded[path] = handle
+                        self._hashes[path] = (handle, digest)
+                        self._loading.pop(path, None)
+                    self._signatures.setdefault(path, signature)
+        return handle
+
+    def is_loaded(self, path: str) -> bool:
+        """Whether `load` has a dictionary of the path, so that it returns it without loading anything."""
+        return path in self._loaded
+
+    def reload(self, path: str) -> bool:
+        """
+        Load a dictionary file again and swap it in for the calls that start afterwards, if it is loaded.
+
+        The previous handle is left to the garbage collector, engines whose handles have to be freed explicitly
+        override this.
+        """
+        if path not in self._loaded:
+            return False
+        self._signatures[path] = _lib._signature(path)
+        handle, signature, digest = _lib._load_hashed(self.open, path)
+        with self._lock:
+            self._loaded[path] = handle
+            self._hashes[path] = (handle, digest)
+        self._signatures[path] = signature
+        return True
+
+    def content_hash(self, path: str, handle) -> "bytes | None":
+        """
+        Return the `cache.dictionary_hash` of the content that a dictionary of `load` was loaded from, or None if
+        it is no longer the loaded dictionary of its path, i.e. it was swapped by a reload since.
+        """
+        entry = self._hashes.get(path)
+        return entry[1] if entry is not None and entry[0] is handle else None
+
+    def changed_dictionaries(self) -> list:
+        """Return the paths of the loaded dictionaries whose files changed since they were loaded."""
+        changed = []
+        for path, signature in list(self._signatures.items()):
+            try:
+                if _lib._signature(path) != signature:
+                    changed.append(path)
+            except OSError:
+                pass
+        return changed
+
+    def footprint(self, handle) -> int:
+        """Return the number of bytes of memory used by a loaded dictionary."""
+        raise NotImplementedError(f"The {self.name} engine does not report the memory used by dictionaries")
+
+    def hyphenate_joined_tokens(self, handle, bwords: bytes, n: int, priorities: bool = False):
+        """Like `hyphenate_tokens`, for n lowercase UTF-8 tokens separated by zero bytes."""
+        tokens = bwords.decode('utf-8').split('\0') if n else []
+        if len(tokens) != n:
+            raise ValueError(f"Expected {n} tokens, got {len(tokens)}")
+        return self.hyphenate_tokens(handle, tokens, priorities)
+
+    def hyphenate_words_numbers(self, handle, words: list[str], buffers=None) -> list[list[int]]:
+        """Return the chunk lengths of every lowercase word."""
+        values, offsets = self.hyphenate_tokens(handle, words)
+        return [values[offsets[i]:offsets[i + 1]].tolist() for i in range(len(words))]
+
+    def hyphenate_words_simple(self, handle, words: list[str], buffers=None) -> list[str]:
+        """Return every lowercase word with '=' at its breaks."""
+        values, offsets = self.hyphenate_tokens(handle, words)
+        return ['='.join(_split(word, values[offsets[i]:offsets[i + 1]])) for i, word in enumerate(words)]
+
+    def hyphenate_insert(self, handle, text: bytes, separator: bytes, buffers=None) -> bytes:
+        """Return the UTF-8 text with the separator inserted at every break, whitespace and case preserved."""
+        tokens = _token_pattern.findall(text.decode('utf-8'))
+        words = [token for token in tokens if not token.isspace()]
+        values, offsets = self.hyphenate_tokens(handle, words)
+        sep = separator.decode('utf-8')
+        pieces = []
+        w = 0
+        for token in tokens:
+            if token.isspace():
+                pieces.append(token)
+            else:
+                pieces.append(sep.join(_split(token, values[offsets[w]:offsets[w + 1]])))
+                w += 1
+        return ''.join(pieces).encode('utf-8')
+
+    def hyphenate_column(self, handle, offsets, data):
+        """Hyphenate an Arrow-style string column, see `Hyphenator.hyphenate_column`."""
+        view, data = memoryview(offsets), bytes(memoryview(data))
+        if view.ndim != 1 or view.itemsize not in (4, 8):
+            raise TypeError("Offsets must be a one-dimensional buffer of int32 or int64 values")
+        if len(view) < 1:
+            raise ValueError("Offsets must hold at least one value")
+        if any(not 0 <= view[i] <= view[i + 1] <= len(data) for i in range(len(view) - 1)):
+            raise ValueError("Offsets must be non-decreasing and within the data")
+        rows = [data[view[i]:view[i + 1]].decode('utf-8') for i in range(len(view) - 1)]
+        words = [word for row in rows for word in row.split()]
+        values, word_offsets = self.hyphenate_tokens(handle, words)
+
+        out_offsets, out = array('i', [0]), array('i')
+        w = 0
+        for row in rows:
+            for token in _token_pattern.findall(row):
+                if token.isspace():
+                    out.append(-len(token))
+                else:
+                    out.extend(values[word_offsets[w]:word_offsets[w + 1]])
+                    w += 1
+            out_offsets.append(len(out))
+        return out_offsets, out
+
+    def word_breaks(self, handle, word: str, min_priority: int = 1) -> tuple:
+        """Return the positions of the breaks of a single word of at least min_priority."""
+        values, offsets, levels = self.hyphenate_tokens(handle, [word], priorities=True)
+        breaks, position = [], 0
+        for length, level in zip(values, levels):
+            position += length
+            if level >= min_priority:
+                breaks.append(position)
+        return tuple(breaks)
+
+    def best_break(self, handle, word: str, column: int, min_priority: int = 1) -> int:
+        """Return the last break of a single word at or before column of at least min_priority, or 0."""
+        return max((p for p in self.word_breaks(handle, word, min_priority) if p <= column), default=0)
+
+
+class NativeEngine(Engine):
+    """The C library, called through the backend chosen in `_lib` (ctypes or cffi)."""
+
+    name = 'native'
+    rank = 100
+
+    @property
+    def backend(self) -> str:
+        return _lib.BACKEND
+
+    # The native dictionaries are shared through the registry of `_lib`, which also tracks their files
+    load = staticmethod(_lib.load_dictionary)
+    is_loaded = staticmethod(_lib.is_loaded)
+    reload = staticmethod(_lib.reload_dictionary)
+    changed_dictionaries = staticmethod(_lib.changed_dictionaries)
+    content_hash = staticmethod(_lib.content_hash)
+
+    open = staticmethod(_lib.open_dictionary)
+    free = staticmethod(_lib.free_dictionary)
+    footprint = staticmethod(_lib.dictionary_footprint)
+    hyphenate_tokens = staticmethod(_lib.hyphenate_tokens)
+    hyphenate_joined_tokens = staticmethod(_lib.hyphenate_joined_tokens)
+    hyphenate_words_numbers = staticmethod(_lib.hyphenate_words_numbers)
+    hyphenate_words_simple = staticmethod(_lib.hyphenate_words_simple)
+    hyphenate_insert = staticmethod(_lib.hyphenate_insert)
+    hyphenate_column = staticmethod(_lib.hyphenate_column)
+    word_breaks = staticmethod(_lib.word_breaks)
+    best_break = staticmethod(_lib.best_break)
+
+
+# Bytes are compared as in the C library, where the pattern digits are ASCII
+_DIGITS = b'0123456789'
+_DIGITS_TO_DOTS = bytes.maketrans(_DIGITS, b'.' * 10)
+_MAX_CHARS = 100
+# Extra characters counted for the ligatures U+FB00 to U+FB06 (EF AC xx in UTF-8) by the hyphen minimums
+_LIGATURES = {0x83: 1, 0x84: 1}
+_KEYWORDS = (
+    (b'LEFTHYPHENMIN', 'lhmin'), (b'RIGHTHYPHENMIN', 'rhmin'),
+    (b'COMPOUNDLEFTHYPHENMIN', 'clhmin'), (b'COMPOUNDRIGHTHYPHENMIN', 'crhmin'),
+)
+
+
+class _Level:
+    """Patterns of one level of a dictionary, as loaded by libhyphen."""
+
+    __slots__ = ('utf8', 'patterns', 'prefixes', 'lhmin', 'rhmin', 'clhmin', 'crhmin', 'nohyphen', 'nextlevel')
+
+    def __init__(self, utf8: bool):
+        self.utf8 = utf8
+        self.patterns = {}  # letters -> values between and around them
+        self.prefixes = set()  # states of the automaton: all prefixes of the letters of the patterns
+        self.lhmin = self.rhmin = self.clhmin = self.crhmin = 0
+        self.nohyphen = []
+        self.nextlevel = None
+
+    def add_line(self, line: bytes):
+        for keyword, attribute in _KEYWORDS:
+            if line.startswith(keyword):
+                setattr(self, attribute, _atoi(line[len(keyword):]))
+                return
+        if line.startswith(b'NOHYPHEN'):
+            # Comma-separated entries up to the last character (the newline), a leading comma is an entry
+            entries = line[8:].lstrip(b' \t')[:-1]
+            parts = entries[1:].split(b',')
+            parts[0] = entries[:1] + parts[0]
+            self.nohyphen = [part for part in parts if part]
+            return
+        if b'/' in line:
+            raise ValueError("Dictionaries with non-standard hyphenation are not supported by the python engine")
+
+        letters, values = bytearray(), [0]
+        for c in line:
+            if c <= 32:
+                break
+            if 48 <= c <= 57:
+                values[-1] = c - 48
+            else:
+                letters.append(c)
+                values.append(0)
+        letters = bytes(letters)
+        if not letters:
+            return
+        self.patterns[letters] = values
+        self.prefixes.update(letters[:i] for i in range(1, len(letters) + 1))
+
+
+def _atoi(s: bytes) -> int:
+    match = re.match(rb'\s*([+-]?\d+)', s)
+    return int(match.group(1)) if match else 0
+
+
+def _load_levels(path: str) -> _Level:
+    """Load a dictionary file into its top level, with the patterns of the second level in its nextlevel."""
+    with open(path, 'rb') as f:
+        charset = f.readline()[:19]
+        utf8 = charset.split(b'\r')[0].split(b'\n')[0] == b'UTF-8'
+        levels = [_Level(utf8)]
+        for line in f:
+            if len(line.rstrip(b'\n')) >= _MAX_CHARS - 1:
+                continue  # Does not fit in the line buffer of the C loader
+            if line.startswith(b'NEXTLEVEL'):
+                if len(levels) == 2:
+                    break
+                levels.append(_Level(utf8))
+            elif not line.startswith(b'%'):
+                levels[-1].add_line(line)
+
+    if len(levels) == 2:
+        levels[0].nextlevel = levels[1]
+        return levels[0]
+
+    # A single level is loaded behind a default level that breaks at hyphens and apostrophes
+    patterns = levels[0]
+    top = _Level(utf8)
+    top.add_line(b"NOHYPHEN ',\xe2\x80\x93,\xe2\x80\x99,-\n" if utf8 else b"NOHYPHEN ',-\n")
+    for line in (b"1-1\n", b"1'1\n") + ((b"1\xe2\x80\x931\n", b"1\xe2\x80\x991\n") if utf8 else ()):
+        top.add_line(line)
+    top.nextlevel = patterns
+    top.lhmin, top.rhmin = patterns.lhmin, patterns.rhmin
+    top.clhmin = patterns.clhmin or patterns.lhmin or 3
+    top.crhmin = patterns.crhmin or patterns.rhmin or 3
+    return top
+
+
+def _match(level: _Level, word: bytes) -> list[int]:
+    """Pattern values of a word, the value at i being between byte i and i + 1."""
+    prep = b'.' + word.translate(_DIGITS_TO_DOTS) + b'.'
+    values = [0] * (len(prep) + 1)
+    patterns, prefixes = level.patterns, level.prefixes
+    state = b''
+    for i in range(len(prep)):
+        # Like the automaton, only the pattern of the longest suffix that is a state applies
+        state += prep[i:i + 1]
+        while state and state not in prefixes:
+            state = state[1:]
+        digits = patterns.get(state)
+        if digits is not None:
+            start = i - len(state)
+            for m, d in enumerate(digits, start):
+                if d > values[m] and m >= 0:
+                    values[m] = d
+    return values[1:len(word)] + [0]
+
+
+def _lhmin_end(utf8: bool, word: bytes, lhmin: int) -> int:
+    """End of the bytes without breaks at the start of word."""
+    n = len(word)
+    i = 1
+    if utf8 and word[:2] == b'\xef\xac' and n > 2:
+        i += _LIGATURES.get(word[2], 0)
+    j = 0
+    while j < n and 48 <= word[j] <= 57:
+        i -= 1
+        j += 1
+    j = 0
+    while i < lhmin and j < n:
+        while True:
+            j += 1
+            if utf8 and word[j:j + 2] == b'\xef\xac' and j + 2 < n:
+                i += _LIGATURES.get(word[j + 2], 0)
+            if not (utf8 and j < n and word[j] & 0xc0 == 0x80):
+                break
+        i += 1
+    return j
+
+
+def _rhmin_start(utf8: bool, word: bytes, rhmin: int) -> int:
+    """Start of the bytes without breaks at the end of word."""
+    i = 0
+    j = len(word) - 1
+    while j > 0 and 48 <= word[j] <= 57:
+        i -= 1
+        j -= 1
+    j = len(word) - 1
+    while i < rhmin and j > 0:
+        if not utf8 or word[j] & 0xc0 == 0xc0 or word[j] & 0x80 != 0x80:
+            i += 1
+        j -= 1
+    return j + 1
+
+
+def _hyphenate_level(level: _Level, word: bytes, clhmin: int, crhmin: int, lend: bool, rend: bool) -> list[int]:
+    """Values of a word or compound segment, hyphenating the segments between the breaks of a compound level."""
+    values = _match(level, word)
+    if level.nextlevel is None:
+        return values
+    n = len(word)
+
+    if not any(v & 1 for v in values):
+        values = _hyphenate_level(level.nextlevel, word, clhmin, crhmin, lend, rend)
+        if not lend:
+            end = _lhmin_end(level.utf8, word, clhmin)
+            values[:end] = [0] * end
+        if not rend:
+            start = _rhmin_start(level.utf8, word, crhmin)
+            values[start:] = [0] * (n - start)
+        return values
+
+    prep = bytearray(b'.' + word.translate(_DIGITS_TO_DOTS) + b'.')
+    begin = 0
+    for i in range(n):
+        if values[i] & 1 or (begin > 0 and i + 1 == n):
+            if i - begin > 0:
+                segment = _hyphenate_level(
+                    level, bytes(prep[begin + 1:i + 2]), clhmin, crhmin,
+                    lend if begin == 0 else False, False if values[i] & 1 else rend,
+                )
+                values[begin:i] = segment[:i - begin]
+                # As in libhyphen, the byte after a segment is restored from the word, so a digit there starts
+                # the next segment as it is instead of as a dot
+                if i + 1 < n:
+                    prep[i + 2] = word[i + 1]
+            begin = i + 1
+    return values
+
+
+def _hyphenate_word(top: _Level, word: bytes) -> list[int]:
+    """Pattern values of a lowercase UTF-8 word, per character: the breaks are after the odd ones."""
+    n = len(word)
+    values = _hyphenate_level(top, word, max(2, top.clhmin), max(2, top.crhmin), True, True)
+    left = _lhmin_end(top.utf8, word, max(4, top.lhmin))
+    right = _rhmin_start(top.utf8, word, max(3, top.rhmin))
+    for i in range(n):
+        if i < left or i >= right:
+            values[i] = 0
+    for entry in top.nohyphen:
+        start = word.find(entry)
+        while start >= 0:
+            values[start + len(entry) - 1] = 0
+            if start > 0:
+                values[start - 1] = 0
+            start = word.find(entry, start + 1)
+    if top.utf8:
+        # The value of a character is the one after its last byte
+        values = [v for c, v in zip(word[1:] + b'\0', values) if c & 0xc0 != 0x80]
+    return values
+
+
+class PythonEngine(Engine):
+    """
+    Pure-Python implementation of the libhyphen algorithm, written independently from the C library.
+
+    It is meant as a second, independent check of the other engines, not for speed: it hyphenates some ten
+    thousand words per second.
+    """
+
+    name = 'python'
+    rank = 0
+
+    def open(self, path: str):
+        return _load_levels(path)
+
+    def free(self, handle):
+        pass
+
+    def hyphenate_tokens(self, handle, tokens, priorities: bool = False):
+        offsets, values, levels = array('i', [0]), array('i'), array('B')
+        for word in '\0'.join(tokens).lower().split('\0') if tokens else []:
+            if word:
+                hyphens = _hyphenate_word(handle, word.encode('utf-8'))
+                length = len(word)
+                position = 0
+                for i in range(length - 1):
+                    if hyphens[i] & 1:
+                        values.append(i + 1 - position)
+                        levels.append(hyphens[i])
+                        position = i + 1
+                values.append(length - position)
+                levels.append(0)
+            offsets.append(len(values))
+        if priorities:
+            return values, offsets, levels
+        return values, offsets
+
+
+class _ReferenceDictionary:
+    """A dictionary loaded by the reference library, freed when it is garbage collected if not before."""
+
+    __slots__ = ('lib', 'ptr')
+
+    def __init__(self, lib, ptr):
+        self.lib, self.ptr = lib, ptr
+
+    def free(self):
+        ptr, self.ptr = self.ptr, None
+        if ptr:
+            self.lib.hnj_hyphen_free(ptr)
+
+    __del__ = free
+
+
+_reference_lib = None
+
+
+def _reference_library():
+    """The upstream libhyphen built next to the package, loaded on first use."""
+    global _reference_lib
+    if _reference_lib is None:
+        lib = ctypes.CDLL(_lib._find_library('hyphenref', dirs=['.'], search_sys=False))
+        lib.hnj_hyphen_load.restype = ctypes.c_void_p
+        lib.hnj_hyphen_load.argtypes = (ctypes.c_char_p,)
+        lib.hnj_hyphen_free.restype = None
+        lib.hnj_hyphen_free.argtypes = (ctypes.c_void_p,)
+        lib.hnj_hyphen_hyphenate3.restype = ctypes.c_int
+        lib.hnj_hyphen_hyphenate3.argtypes = (
+            ctypes.c_void_p, ctypes.c_char_p, ctypes.c_int, ctypes.c_char_p, ctypes.c_char_p,
+            ctypes.POINTER(ctypes.c_void_p), ctypes.POINTER(ctypes.c_void_p), ctypes.POINTER(ctypes.c_void_p),
+            ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+        )
+        lib.hnj_free.restype = None
+        lib.hnj_free.argtypes = (ctypes.c_void_p,)
+        _reference_lib = lib
+    return _reference_lib
+
+
+class ReferenceEngine(Engine):
+    """
+    The unmodified upstream libhyphen, built from lib/reference as a library of its own.
+
+    Dictionaries are loaded by the upstream loader, without the compact automaton, and every word is hyphenated
+    with `hnj_hyphen_hyphenate3` on its own, so none of the batch, cache and automaton extensions of the native
+    library are involved. The hyphen minimums and the chunks of a word are those of the native library.
+    """
+
+    name = 'reference'
+    rank = 10
+
+    @classmethod
+    def available(cls) -> bool:
+        try:
+            _reference_library()
+        except (ImportError, OSError):
+            return False
+        return True
+
+    def open(self, path: str):
+        lib = _reference_library()
+        ptr = lib.hnj_hyphen_load(path.encode('utf-8'))
+        if not ptr:
+            raise RuntimeError(f"Failed to load dictionary: {path}")
+        return _ReferenceDictionary(lib, ptr)
+
+    def free(self, handle):
+        handle.free()
+
+    def hyphenate_tokens(self, handle, tokens, priorities: bool = False):
+        lib = handle.lib
+        offsets, values, levels = array('i', [0]), array('i'), array('B')
+        words = '\0'.join(tokens).lower().split('\0') if tokens else []
+        hyphens = ctypes.create_string_buffer(max((len(word.encode('utf-8')) for word in words), default=0) + 5)
+        rep, pos, cut = ctypes.c_void_p(), ctypes.c_void_p(), ctypes.c_void_p()
+        for word in words:
+            if word:
+                bword = word.encode('utf-8')
+                k = len(bword)
+                if lib.hnj_hyphen_hyphenate3(handle.ptr, bword, k, hyphens, None, ctypes.byref(rep),
+                                             ctypes.byref(pos), ctypes.byref(cut), 4, 3, 2, 2):
+                    raise RuntimeError(f"Hyphenation failed: {word!r}")
+                length = len(word)
+                if rep:
+                    # Non-standard hyphenation can not be expressed in chunks of the original word
+                    values.append(length)
+                    levels.append(0)
+                    entries = ctypes.cast(rep, ctypes.POINTER(ctypes.c_void_p))
+                    for i in range(k):
+                        if entries[i]:
+                            lib.hnj_free(entries[i])
+                    for array_ptr in (rep, pos, cut):
+                        lib.hnj_free(array_ptr)
+                        array_ptr.value = None
+                else:
+                    # Pattern digits, or a zero byte where a NOHYPHEN entry cleared them, per character
+                    digits = hyphens.raw
+                    position = 0
+                    for i in range(length - 1):
+                        if digits[i] & 1:
+                            values.append(i + 1 - position)
+                            levels.append(digits[i] - 48)
+                            position = i + 1
+                    values.append(length - position)
+                    levels.append(0)
+            offsets.append(len(values))
+        if priorities:
+            return values, offsets, levels
+        return values, offsets
+
+
+_engine_classes = {}
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def register_engine(cls):
+    """Make an `Engine` subclass selectable by its name, usable as a class decorator."""
+    _engine_classes[cls.name] = cls
+    return cls
+
+
+register_engine(NativeEngine)
+register_engine(ReferenceEngine)
+register_engine(PythonEngine)
+
+
+def available_engines() -> list[str]:
+    """Return the names of the engines available in this process, the highest ranked first."""
+    classes = sorted(_engine_classes.values(), key=lambda cls: -cls.rank)
+    return [cls.name for cls in classes if cls.available()]
+
+
+def get_engine(engine: "str | Engine | None" = None) -> Engine:
+    """
+    Return the engine instance of a name, shared by all its users in this process.
+
+    Args:
+        engine: name of an engine, 'auto' for the highest ranked available engine, an `Engine` (returned as it
+            is), or None for the HYPERHYPHEN_ENGINE environment variable (default: 'auto')
+    """
+    if isinstance(engine, Engine):
+        return engine
+    name = engine or ENGINE
+    if name == 'auto':
+        name = available_engines()[0]
+    instance = _engines.get(name)
+    if instance is None:
+        cls = _engine_classes.get(name)
+        if cls is None:
+            raise ValueError(f"Unknown engine '{name}', expected 'auto' or one of {', '.join(_engine_classes)}")
+        if not cls.available():
+            raise ValueError(f"The {name} engine is not available")
+        with _engines_lock:
+            instance = _engines.setdefault(name, cls())
+    return instance
+
+
+def reload_dictionary(path: str) -> bool:
+    """Reload a dictionary file in every engine that loaded it, see `Engine.reload`."""
+    reloaded = False
+    for engine in list(_engines.values()):
+        reloaded = engine.reload(path) or reloaded
+    # The native dictionaries may be loaded before any Hyphenator, e.g. by a VocabularyIndex
+    if 'native' not in _engines:
+        reloaded = _lib.reload_dictionary(path) or reloaded
+    return reloaded
+
+
+def changed_dictionaries() -> list:
+    """Return the paths of the dictionaries loaded by any engine whose files changed since they were loaded."""
+    changed = set(_lib.changed_dictionaries())
+    for engine in list(_engines.values()):
+        changed.update(engine.changed_dictionaries())
+    return sorted(changed)
+
+
+def compare_engines(dictionary: str, words, engine: "str | Engine", reference: "str | Engine" = 'reference',
+                    batch_size: int = 10000) -> list[str]:
+    """
+    Hyphenate a corpus with two engines and return the words whose breaks or break priorities differ.
+
+    Args:
+        dictionary (str): path of the hyphenation dictionary
+        words (iterable of str): corpus, one word per item
+        engine: engine to verify
+        reference: engine to verify it against (default: the unmodified upstream libhyphen)
+        batch_size (int): number of words hyphenated per call
+    """
+    engines = [get_engine(engine), get_engine(reference)]
+    handles = [e.open(str(dictionary)) for e in engines]
+    mismatches = []
+    try:
+        batch = []
+        for word in words:
+            batch.append(word)
+            if len(batch) >= batch_size:
+                mismatches.extend(_compare_batch(engines, handles, batch))
+                batch = []
+        if batch:
+            mismatches.extend(_compare_batch(engines, handles, batch))
+    finally:
+        for e, handle in zip(engines, handles):
+            e.free(handle)
+    return mismatches
+
+
+def _compare_batch(engines, handles, batch) -> list[str]:
+    (values, offsets, levels), (ref_values, ref_offsets, ref_levels) = (
+        e.hyphenate_tokens(handle, batch, priorities=True) for e, handle in zip(engines, handles)
+    )
+    if values == ref_values and offsets == ref_offsets and levels == ref_levels:
+        return []
+    return [
+        word for i, word in enumerate(batch)
+        if (values[offsets[i]:offsets[i + 1]] != ref_values[ref_offsets[i]:ref_offsets[i + 1]]
+            or levels[offsets[i]:offsets[i + 1]] != ref_levels[ref_offsets[i]:ref_offsets[i + 1]])
+    ]
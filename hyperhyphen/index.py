@@ -0,0 +1,213 @@
+"""Precomputed vocabulary index mapping words to their hyphenation chunk lengths.
+
+The index is a single file that is memory-mapped read-only, so any number of
+processes opening the same index share its pages through the OS page cache.
+
+File layout (native byte order, every section padded to 8 bytes)::
+
+    header        magic, byte order mark, version, word count, slot count, dictionary hash
+    key_offsets   uint32[count + 1]   offsets of the words in `keys`
+    part_offsets  uint32[count + 1]   offsets of the chunk lengths in `parts`
+    slots         uint32[slot count]  open addressing table of word number + 1
+    keys          sorted, lowercased UTF-8 words
+    parts         uint16 chunk lengths, as returned by the "int" mode
+"""
+import argparse
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from pathlib import Path
+
+from ._lib import content_hash, load_dictionary, hyphenate_words_numbers
+
+MAGIC = b'HHIX'
+VERSION = 2
+BYTE_ORDER_MARK = 0x01020304
+
+# The dictionary hash is the `cache.dictionary_hash` of the content the index was built with
+_header = struct.Struct('=4sIIII16s')
+
+
+def _padding(size: int) -> bytes:
+    return b'\0' * (-size % 8)
+
+
+def _slot(key: bytes, mask: int) -> int:
+    return zlib.crc32(key) & mask
+
+
+def build_index(path, words, dictionary: str, batch_size: int = 10000) -> int:
+    """
+    Hyphenate a vocabulary once and write the results to an index file.
+
+    Args:
+        path (str): Destination of the index file. It is replaced atomically.
+        words (iterable of str): Vocabulary, duplicates and case are ignored.
+        dictionary (str): Path of the hyphenation dictionary to use.
+        batch_size (int): Number of words passed to the native library at once.
+
+    Returns:
+        int: The number of words in the index.
+    """
+    dictionary = str(dictionary)
+    digest = None
+    while digest is None:
+        # None if a reload swapped the dictionary in between, the next round takes the new one
+        dict_ptr = load_dictionary(dictionary)
+        digest = content_hash(dictionary, dict_ptr)
+    vocabulary = sorted({w.lower() for w in words if w and not w.isspace() and len(w.split()) == 1})
+
+    key_offsets = array('I', [0])
+    part_offsets = array('I', [0])
+    keys = bytearray()
+    parts = array('H')
+
+    for start in range(0, len(vocabulary), batch_size):
+        batch = vocabulary[start:start + batch_size]
+        for word, wordparts in zip(batch, hyphenate_words_numbers(dict_ptr, batch)):
+            keys += word.encode('utf-8')
+            parts.extend(wordparts)
+            key_offsets.append(len(keys))
+            part_offsets.append(len(parts))
+
+    count = len(vocabulary)
+    nslots = 1 << max(count * 2 - 1, 1).bit_length()
+    slots = array('I', bytes(4 * nslots))
+    mask = nslots - 1
+    for n in range(count):
+        key = bytes(keys[key_offsets[n]:key_offsets[n + 1]])
+        i = _slot(key, mask)
+        while slots[i]:
+            i = (i + 1) & mask
+        slots[i] = n + 1
+
+    path = Path(path)
+    tmp_path = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(_header.pack(MAGIC, BYTE_ORDER_MARK, VERSION, count, nslots, digest))
+            f.write(_padding(_header.size))
+            for section in (key_offsets.tobytes(), part_offsets.tobytes(), slots.tobytes(), bytes(keys)):
+                f.write(section)
+                f.write(_padding(len(section)))
+            f.write(parts.tobytes())
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+    return count
+
+
+class VocabularyIndex:
+    """
+    Read-only, memory-mapped view of an index written by `build_index`.
+
+    Its `dictionary_hash` is the `cache.dictionary_hash` of the dictionary content it was built with.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        with open(self.path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, bom, version = struct.unpack_from('=4sII', self._mmap)
+        if magic != MAGIC:
+            raise ValueError(f'Not a hyperhyphen index: {self.path}')
+        if bom != BYTE_ORDER_MARK or version != VERSION:
+            raise ValueError(f'Incompatible hyperhyphen index (version {version}): {self.path}')
+        _, _, _, count, nslots, self.dictionary_hash = _header.unpack_from(self._mmap)
+
+        self._count = count
+        self._mask = nslots - 1
+
+        view = memoryview(self._mmap)
+        offset = _header.size + len(_padding(_header.size))
+
+        def section(size, fmt=None):
+            nonlocal offset
+            data = view[offset:offset + size]
+            offset += size + len(_padding(size))
+            return data.cast(fmt) if fmt else data
+
+        self._key_offsets = section(4 * (count + 1), 'I')
+        self._part_offsets = section(4 * (count + 1), 'I')
+        self._slots = section(4 * nslots, 'I')
+        self._keys = section(self._key_offsets[count])
+        self._parts = section(2 * self._part_offsets[count], 'H')
+
+    def __reduce__(self):
+        # Unpickling maps the same file again, so the pages stay shared between processes
+        return VocabularyIndex, (self.path,)
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, word: str):
+        return self._find(word.encode('utf-8')) >= 0
+
+    def _find(self, key: bytes) -> int:
+        key_offsets, keys, slots, mask = self._key_offsets, self._keys, self._slots, self._mask
+        i = _slot(key, mask)
+        while slots[i]:
+            n = slots[i] - 1
+            if keys[key_offsets[n]:key_offsets[n + 1]] == key:
+                return n
+            i = (i + 1) & mask
+        return -1
+
+    def get(self, word: str):
+        """Return the chunk lengths of a lowercased word, or None if it is not in the index."""
+        n = self._find(word.encode('utf-8'))
+        if n < 0:
+            return None
+        return self._parts[self._part_offsets[n]:self._part_offsets[n + 1]].tolist()
+
+    def words(self):
+        """Iterate over the indexed words in sorted order."""
+        key_offsets, keys = self._key_offsets, self._keys
+        for n in range(self._count):
+            yield bytes(keys[key_offsets[n]:key_offsets[n + 1]]).decode('utf-8')
+
+    def close(self):
+        for name in ('_key_offsets', '_part_offsets', '_slots', '_keys', '_parts'):
+            getattr(self, name).release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main(argv=None):
+    from .dictionaries import get_default_manager
+
+    parser = argparse.ArgumentParser(
+        prog='python -m hyperhyphen.index',
+        description='Build a precomputed hyphenation index for a word list.',
+    )
+    parser.add_argument('wordlist', help='file with the vocabulary, whitespace separated ("-" for stdin)')
+    parser.add_argument('output', help='path of the index file to write')
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('-l', '--language', default='en_US', help='language of the dictionary (default: en_US)')
+    group.add_argument('-d', '--dictionary', help='path to a hyphenation dictionary file')
+    args = parser.parse_args(argv)
+
+    dictionary = args.dictionary or get_default_manager().install(args.language)
+
+    if args.wordlist == '-':
+        text = sys.stdin.read()
+    else:
+        text = Path(args.wordlist).read_text(encoding='utf-8')
+
+    count = build_index(args.output, text.split(), dictionary)
+    print(f'Indexed {count} words into {args.output}', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,175 @@
+"""Streaming hyphenation of HTML and XML documents.
+
+Tags, comments, declarations and entities are copied verbatim. The words of the text nodes are collected
+across many nodes and hyphenated together, and the document is written out again with a separator
+(a soft hyphen by default) inserted at every hyphenation point.
+"""
+import re
+
+SOFT_HYPHEN = '\u00ad'
+
+DEFAULT_SKIP = ('code', 'pre', 'script', 'style')
+
+# Elements whose content is not markup and is copied verbatim up to their end tag
+RAW_TEXT_ELEMENTS = ('script', 'style')
+
+_token_pattern = re.compile(
+    r'<!--.*?-->|<!--'
+    r'|<!\[CDATA\[.*?\]\]>|<!\[CDATA\['
+    r'|<[!?][^>]*>'
+    r'|<(/?)([A-Za-z][\w:.-]*)[^>]*?(/?)>'
+    r'|&(?:#[0-9]+|#[xX][0-9a-fA-F]+|[A-Za-z][A-Za-z0-9]*);',
+    re.S,
+)
+_split_pattern = re.compile(r'(\s+)')
+
+# Longest incomplete entity that is kept back at the end of a chunk
+_MAX_ENTITY = 32
+
+# Words longer than this are copied verbatim
+_MAX_WORD = 255
+
+
+def _read_chunks(source, chunk_size):
+    if isinstance(source, str):
+        yield source
+    elif hasattr(source, 'read'):
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    else:
+        yield from source
+
+
+def stream_markup(hyphenator, source, separator: str = SOFT_HYPHEN, skip=DEFAULT_SKIP,
+                  batch_size: int = 4096, chunk_size: int = 1 << 16, max_pending: int = 1 << 16):
+    """
+    Hyphenate an HTML or XML document in a single pass with bounded memory.
+
+    Args:
+        hyphenator (Hyphenator): hyphenator whose dictionary is used
+        source: document as a str, a text file object or an iterable of str chunks
+        separator (str): string inserted at every hyphenation point, e.g. '\\u00ad' or '&shy;'
+        skip (iterable of str): elements whose content is not hyphenated
+        batch_size (int): number of words hyphenated per native call
+        chunk_size (int): number of characters read at once from a file object
+        max_pending (int): number of buffered characters above which the buffered text is processed and yielded,
+            even inside a skipped element or without a token boundary
+
+    Yields:
+        str: consecutive pieces of the hyphenated document
+    """
+    skip = {name.lower() for name in skip}
+    pending = []  # output pieces, words are replaced by their hyphenated form on flush
+    pending_chars = 0  # number of characters in pending
+    slots = []  # indices of the words in pending
+    skipping = 0  # depth of skipped elements
+    raw_end = None  # end tag pattern while inside a raw text element
+
+    def emit(piece):
+        nonlocal pending_chars
+        pending.append(piece)
+        pending_chars += len(piece)
+
+    def add_text(text):
+        if skipping:
+            emit(text)
+            return
+        for i, part in enumerate(_split_pattern.split(text)):
+            if i % 2 == 0 and 0 < len(part) <= _MAX_WORD:
+                slots.append(len(pending))
+            if part:
+                emit(part)
+
+    def flush():
+        nonlocal pending_chars
+        if slots:
+            words = [pending[i] for i in slots]
+            wordparts = hyphenator._hyphenate_numbers([word.lower() for word in words])
+            for i, word, parts in zip(slots, words, wordparts):
+                if len(parts) > 1:
+                    chunks, start = [], 0
+                    for n in parts:
+                        chunks.append(word[start:start + n])
+                        start += n
+                    pending[i] = separator.join(chunks)
+            slots.clear()
+        out = ''.join(pending)
+        pending.clear()
+        pending_chars = 0
+        return out
+
+    buf = ''
+    chunks = _read_chunks(source, chunk_size)
+    final = False
+    while not final:
+        chunk = next(chunks, None)
+        final = chunk is None
+        buf += chunk or ''
+        pos = 0
+
+        while pos < len(buf):
+            if raw_end is not None:
+                m = raw_end.search(buf, pos)
+                if m is None:
+                    # Keep enough back to find an end tag that is split over two chunks
+                    cut = len(buf) if final else max(pos, len(buf) - 16)
+                    emit(buf[pos:cut])
+                    pos = cut
+                    break
+                emit(buf[pos:m.start()])
+                pos = m.start()
+                raw_end = None
+                continue
+
+            m = _token_pattern.search(buf, pos)
+            if m is None:
+                cut = len(buf)
+                if not final:
+                    lt = buf.find('<', pos)
+                    if lt >= 0:
+                        cut = lt
+                    amp = buf.find('&', max(pos, cut - _MAX_ENTITY), cut)
+                    if amp >= 0:
+                        cut = amp
+                    # Do not split a word over two batches
+                    space = max(buf.rfind(c, pos, cut) for c in ' \t\r\n')
+                    cut = space + 1 if space >= 0 else pos
+                    if len(buf) - cut > max_pending:
+                        cut = len(buf)
+                add_text(buf[pos:cut])
+                pos = cut
+                break
+
+            token = m.group(0)
+            if token in ('<!--', '<![CDATA[') and not final:
+                # Incomplete comment or CDATA section, wait for more input
+                add_text(buf[pos:m.start()])
+                pos = m.start()
+                break
+
+            add_text(buf[pos:m.start()])
+            emit(token)
+            pos = m.end()
+
+            closing, name, self_closing = m.group(1, 2, 3)
+            if name and not self_closing:
+                name = name.lower()
+                if name in skip:
+                    skipping = max(skipping - 1, 0) if closing else skipping + 1
+                if not closing and name in RAW_TEXT_ELEMENTS:
+                    raw_end = re.compile(f'</{re.escape(name)}\\b', re.I)
+
+        buf = buf[pos:]
+
+        if final or len(slots) >= batch_size or pending_chars > max_pending:
+            out = flush()
+            if out:
+                yield out
+
+
+def hyphenate_markup(hyphenator, source, separator: str = SOFT_HYPHEN, skip=DEFAULT_SKIP, **kwargs) -> str:
+    """Hyphenate an HTML or XML document and return it as a single string. See `stream_markup`."""
+    return ''.join(stream_markup(hyphenator, source, separator=separator, skip=skip, **kwargs))
@@ -0,0 +1,194 @@
+"""Pattern usage profiling and corpus-specialized dictionaries.
+
+A full dictionary holds thousands of patterns, and for a given corpus most of them never match. The profiler
+counts the automaton states reached while hyphenating a sample, and `prune_dictionary` writes a dictionary with
+only the patterns of those states. Every state reached by the sample is kept, so the pruned automaton visits
+the same states and yields the same hyphenation for the sample. Other text may differ, which is what
+`verify_dictionary` checks on a held-out corpus.
+"""
+import time
+from array import array
+
+from ._lib import (
+    count_state_visits, dictionary_footprint, dictionary_states, free_dictionary, hyphenate_tokens,
+    open_dictionary,
+)
+
+_KEYWORDS = (b'LEFTHYPHENMIN', b'RIGHTHYPHENMIN', b'COMPOUNDLEFTHYPHENMIN', b'COMPOUNDRIGHTHYPHENMIN', b'NOHYPHEN')
+
+
+def _pattern_key(line: bytes) -> bytes:
+    """Letters of a pattern line without the digits, as the automaton state is named by the native loader."""
+    pattern = line.split(b'/', 1)[0]
+    end = 0
+    while end < len(pattern) and pattern[end] > 32:
+        end += 1
+    return bytes(c for c in pattern[:end] if not 48 <= c <= 57)
+
+
+def _read_levels(path):
+    """Split a dictionary file into its charset line and a list of (keyword lines, pattern lines) per level."""
+    with open(path, 'rb') as f:
+        charset = f.readline()
+        levels = [([], [])]
+        for line in f:
+            if line.startswith(b'NEXTLEVEL'):
+                levels.append(([], []))
+            elif line.startswith(b'%') or not line.strip():
+                continue
+            elif line.startswith(_KEYWORDS):
+                levels[-1][0].append(line)
+            else:
+                levels[-1][1].append(line)
+    return charset, levels[:2]
+
+
+def _native_levels(levels) -> list[int]:
+    # A single-level file is loaded behind a default level (hyphens and apostrophes), so its patterns are level 1
+    return [0, 1] if len(levels) > 1 else [1]
+
+
+def _batches(words, batch_size):
+    batch = []
+    for word in words:
+        batch.append(word)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def profile_patterns(dictionary: str, words, batch_size: int = 10000) -> list[dict[bytes, int]]:
+    """
+    Hyphenate a sample corpus and count how often each pattern state of a dictionary is reached.
+
+    Args:
+        dictionary (str): path of the hyphenation dictionary
+        words (iterable of str): sample corpus, one word per item
+        batch_size (int): number of words passed to the native library at once
+
+    Returns:
+        list of dict: one mapping per pattern level of the dictionary file, from the pattern string (letters
+            in the dictionary encoding, without digits) of every reached state to its number of visits
+    """
+    _, levels = _read_levels(dictionary)
+    dict_ptr = open_dictionary(str(dictionary))
+    counters = []
+    try:
+        for level in _native_levels(levels):
+            keys = dictionary_states(dict_ptr, level)
+            hits = array('i', bytes(4 * len(keys)))
+            count_state_visits(dict_ptr, level, hits)
+            counters.append((keys, hits))
+
+        for batch in _batches(words, batch_size):
+            hyphenate_tokens(dict_ptr, batch)
+
+        for level in _native_levels(levels):
+            count_state_visits(dict_ptr, level, None)
+    finally:
+        free_dictionary(dict_ptr)
+
+    return [{keys[state]: n for state, n in enumerate(hits) if n and state} for keys, hits in counters]
+
+
+def prune_dictionary(dictionary: str, output: str, profile: list[dict[bytes, int]]) -> tuple[int, int]:
+    """
+    Write a copy of a dictionary with only the patterns of the states reached in a profile.
+
+    Reached states without a pattern of their own are kept as patterns without digits, so that the pruned
+    automaton still has them.
+
+    Args:
+        dictionary (str): path of the original dictionary
+        output (str): path of the pruned dictionary to write
+        profile (list of dict): result of `profile_patterns` for the same dictionary
+
+    Returns:
+        tuple: (patterns kept, patterns in the original dictionary)
+    """
+    charset, levels = _read_levels(dictionary)
+    if len(profile) != len(levels):
+        raise ValueError("Profile does not match the levels of the dictionary")
+
+    kept = total = 0
+    with open(output, 'wb') as f:
+        f.write(charset)
+        f.write(b'% pruned for a corpus by hyperhyphen\n')
+        for n, ((keywords, patterns), reached) in enumerate(zip(levels, profile)):
+            if n:
+                f.write(b'NEXTLEVEL\n')
+            f.writelines(keywords)
+            missing = set(reached)
+            for line in patterns:
+                key = _pattern_key(line)
+                total += 1
+                if key in reached:
+                    kept += 1
+                    missing.discard(key)
+                    f.write(line if line.endswith(b'\n') else line + b'\n')
+            f.writelines(key + b'\n' for key in sorted(missing))
+
+    return kept, total
+
+
+def verify_dictionary(original: str, pruned: str, words, batch_size: int = 10000) -> list[str]:
+    """
+    Hyphenate a corpus with two dictionaries and return the words whose hyphenation differs.
+
+    Args:
+        original (str): path of the original dictionary
+        pruned (str): path of the pruned dictionary
+        words (iterable of str): held-out corpus, one word per item
+        batch_size (int): number of words passed to the native library at once
+    """
+    dicts = [open_dictionary(str(original)), open_dictionary(str(pruned))]
+    mismatches = []
+    try:
+        for batch in _batches(words, batch_size):
+            (values, offsets), (pruned_values, pruned_offsets) = (hyphenate_tokens(d, batch) for d in dicts)
+            if values == pruned_values and offsets == pruned_offsets:
+                continue
+            for i, word in enumerate(batch):
+                if (values[offsets[i]:offsets[i + 1]] != pruned_values[pruned_offsets[i]:pruned_offsets[i + 1]]):
+                    mismatches.append(word)
+    finally:
+        for d in dicts:
+            free_dictionary(d)
+    return mismatches
+
+
+def measure_dictionary(dictionary: str, words, repeat: int = 5) -> dict:
+    """
+    Measure the load time, memory and throughput of a dictionary.
+
+    Returns:
+        dict: 'load_time' (best of `repeat` loads, in seconds), 'memory' (bytes) and 'words_per_second'
+            (best of `repeat` runs over words)
+    """
+    words = list(words)
+    load_time = throughput = 0.0
+    dict_ptr = None
+    try:
+        for i in range(repeat):
+            start = time.perf_counter()
+            loaded = open_dictionary(str(dictionary))
+            elapsed = time.perf_counter() - start
+            load_time = elapsed if i == 0 else min(load_time, elapsed)
+            if dict_ptr is None:
+                dict_ptr = loaded
+            else:
+                free_dictionary(loaded)
+
+        memory = dictionary_footprint(dict_ptr)
+
+        for _ in range(repeat if words else 0):
+            start = time.perf_counter()
+            hyphenate_tokens(dict_ptr, words)
+            throughput = max(throughput, len(words) / max(time.perf_counter() - start, 1e-9))
+    finally:
+        if dict_ptr is not None:
+            free_dictionary(dict_ptr)
+
+    return {'load_time': load_time, 'memory': memory, 'words_per_second': throughput}
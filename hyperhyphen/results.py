@@ -0,0 +1,86 @@
+from array import array
+from collections.abc import Sequence
+from itertools import accumulate
+
+
+class Chunks(Sequence):
+    """
+    Lazy result of the "lazy" mode: the same chunks as the "str" mode, created on demand.
+
+    Only the source text and one packed array with the boundaries of all chunks are kept.
+    Slicing returns a view that shares both.
+    """
+    __slots__ = ('text', 'offsets', 'start', 'stop')
+
+    def __init__(self, text: str, offsets: array, start: int = 0, stop: "int | None" = None):
+        self.text = text
+        self.offsets = offsets
+        self.start = start
+        self.stop = len(offsets) - 1 if stop is None else stop
+
+    @classmethod
+    def from_lengths(cls, text: str, int_output: list[int]) -> "Chunks":
+        return cls(text, array('I', accumulate(map(abs, int_output), initial=0)))
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(len(self))
+            if step != 1:
+                return [self[j] for j in range(start, stop, step)]
+            return Chunks(self.text, self.offsets, self.start + start, self.start + max(start, stop))
+
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError('chunk index out of range')
+        i += self.start
+        return self.text[self.offsets[i]:self.offsets[i + 1]]
+
+    def __iter__(self):
+        text, offsets = self.text, self.offsets
+        for i in range(self.start, self.stop):
+            yield text[offsets[i]:offsets[i + 1]]
+
+    def __eq__(self, other):
+        if isinstance(other, (Chunks, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self):
+        return f'Chunks({list(self)!r})'
+
+    def span(self, i: int) -> tuple[int, int]:
+        """Return the (start, end) position of chunk i in the text."""
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError('chunk index out of range')
+        i += self.start
+        return self.offsets[i], self.offsets[i + 1]
+
+    def spans(self, skip_whitespace: bool = True):
+        """Iterate over the (start, end) positions of the chunks, like the "spans" mode."""
+        text, offsets = self.text, self.offsets
+        for i in range(self.start, self.stop):
+            a, b = offsets[i], offsets[i + 1]
+            if not skip_whitespace or not text[a].isspace():
+                yield a, b
+
+    def words(self):
+        """Iterate over the words, each as a `Chunks` view of its syllables."""
+        text, offsets = self.text, self.offsets
+        begin = None
+        for i in range(self.start, self.stop):
+            if text[offsets[i]].isspace():
+                if begin is not None:
+                    yield Chunks(text, offsets, begin, i)
+                    begin = None
+            elif begin is None:
+                begin = i
+        if begin is not None:
+            yield Chunks(text, offsets, begin, self.stop)
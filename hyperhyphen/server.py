@@ -0,0 +1,406 @@
+"""Local hyphenation server and client.
+
+A server holds the dictionaries once for all the processes of a machine, in any language, and hyphenates the
+words of concurrent requests together in single native calls. It listens on a Unix socket or on localhost TCP.
+
+Protocol: every message is a frame of a little-endian uint32 body length followed by the body, and a connection
+may send any number of requests without waiting for the responses (pipelining), of which the server reads at most
+`MAX_IN_FLIGHT` ahead of the responses it wrote. Responses carry the id of their request and come back in any
+order.
+
+Request body::
+
+    uint32   request id, chosen by the client
+    uint32   number of words n
+    uint16   length of the dictionary name, then the UTF-8 name (empty for the default dictionary)
+    bytes    the n UTF-8 words separated by zero bytes
+
+Response body::
+
+    uint32   request id
+    uint8    status: 0 for success, 1 for an error
+    uint32   number of words n
+    int32    n + 1 offsets, then the chunk lengths of all words, so that word i has the chunk lengths
+             values[offsets[i]:offsets[i + 1]] (as `Hyphenator.hyphenate_tokens`)
+
+An error response has the UTF-8 error message after the status instead.
+"""
+import asyncio
+import concurrent.futures
+import itertools
+import os
+import socket
+import stat
+import struct
+import threading
+from array import array
+
+from .core import Hyphenator
+
+_LENGTH = struct.Struct('<I')
+_REQUEST = struct.Struct('<IIH')
+_STATUS = struct.Struct('<IB')
+
+OK, ERROR = 0, 1
+
+# Frames larger than this close the connection
+MAX_FRAME = 64 << 20
+# Requests of a connection queued or being hyphenated at once. Further requests are read once responses are
+# written, so that a client that pipelines many requests and reads slowly holds a bounded amount of memory
+MAX_IN_FLIGHT = 64
+
+
+def _is_unix(address) -> bool:
+    return isinstance(address, (str, os.PathLike))
+
+
+class _Request:
+    __slots__ = ('writer', 'slots', 'id', 'n', 'words')
+
+    def __init__(self, writer, slots, request_id, n, words):
+        self.writer = writer
+        self.slots = slots
+        self.id = request_id
+        self.n = n
+        self.words = words
+
+
+class HyphenationServer:
+    """
+    Serve hyphenation requests for a set of dictionaries.
+
+    Args:
+        address: path of a Unix socket, or (host, port) to listen on TCP, port 0 picks a free port
+        dictionaries (dict): dictionary file path by name, the first one is the default
+        workers (int): number of batches hyphenated at once, in threads
+        max_batch (int): number of words above which pending requests are split into several batches
+    """
+
+    def __init__(self, address, dictionaries: dict, workers: int = 1, max_batch: int = 1 << 16):
+        if not dictionaries:
+            raise ValueError("No dictionary to serve")
+        self.address = address
+        self.hyphenators = {name: Hyphenator(mode="tokens", dictionary=str(path))
+                            for name, path in dictionaries.items()}
+        self.default = next(iter(self.hyphenators))
+        self.workers = workers
+        self.max_batch = max_batch
+        self.batches = 0
+        self.requests = 0
+        self._loop = None
+        self._server = None
+        self._queue = None
+        self._executor = None
+        self._connections = {}  # writer by connection handler task
+        self._thread = None
+        self._started = threading.Event()
+
+    async def _handle(self, reader, writer):
+        self._connections[asyncio.current_task()] = writer
+        sock = writer.get_extra_info('socket')
+        if sock is not None and sock.family != socket.AF_UNIX:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        # Released by the batchers once the response of a request is written
+        slots = asyncio.Semaphore(MAX_IN_FLIGHT)
+        try:
+            while True:
+                size, = _LENGTH.unpack(await reader.readexactly(_LENGTH.size))
+                if size < _REQUEST.size or size > MAX_FRAME:
+                    break
+                body = await reader.readexactly(size)
+                request_id, n, name_length = _REQUEST.unpack_from(body)
+                name = body[_REQUEST.size:_REQUEST.size + name_length].decode('utf-8', 'replace')
+                words = body[_REQUEST.size + name_length:]
+                hyphenator = self.hyphenators.get(name or self.default)
+                if hyphenator is None:
+                    self._respond_error(writer, request_id, f"Unknown dictionary: {name}")
+                elif n != (words.count(0) + 1 if n else 0) or (not n and words):
+                    self._respond_error(writer, request_id, f"Expected {n} words separated by zero bytes")
+                else:
+                    try:
+                        words = words.decode('utf-8').lower().encode('utf-8')
+                    except UnicodeDecodeError as e:
+                        self._respond_error(writer, request_id, f"Invalid UTF-8: {e}")
+                    else:
+                        await slots.acquire()
+                        self._queue.put_nowait((hyphenator, _Request(writer, slots, request_id, n, words)))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+            self._connections.pop(asyncio.current_task(), None)
+
+    @staticmethod
+    def _error_frame(request_id, message) -> bytes:
+        body = _STATUS.pack(request_id, ERROR) + message.encode('utf-8')
+        return _LENGTH.pack(len(body)) + body
+
+    def _respond_error(self, writer, request_id, message):
+        writer.write(self._error_frame(request_id, message))
+
+    async def _batcher(self):
+        """Take all pending requests at once and hyphenate them in one native call per dictionary."""
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = [await self._queue.get()]
+            words = pending[0][1].n
+            while words < self.max_batch and not self._queue.empty():
+                pending.append(self._queue.get_nowait())
+                words += pending[-1][1].n
+            self.batches += 1
+            self.requests += len(pending)
+
+            batches = {}
+            for hyphenator, request in pending:
+                batches.setdefault(hyphenator, []).append(request)
+            for hyphenator, requests in batches.items():
+                try:
+                    responses = await loop.run_in_executor(self._executor, self._hyphenate, hyphenator, requests)
+                except Exception as e:
+                    responses = [self._error_frame(request.id, str(e)) for request in requests]
+                for request, response in zip(requests, responses):
+                    if not request.writer.is_closing():
+                        request.writer.write(response)
+                    request.slots.release()
+
+    @staticmethod
+    def _hyphenate(hyphenator, requests):
+        """Return the response frames of requests, hyphenated together."""
+        # The words of the requests without words add no separator, so the joined words stay aligned
+        data = b'\0'.join(request.words for request in requests if request.n)
+        values, offsets = hyphenator.engine.hyphenate_joined_tokens(
+            hyphenator.dict, data, sum(request.n for request in requests)
+        )
+
+        responses = []
+        first = 0
+        for request in requests:
+            last = first + request.n
+            base = offsets[first]
+            word_offsets = offsets[first:last + 1]
+            if base:
+                word_offsets = array('i', [offset - base for offset in word_offsets])
+            chunks = values[base:offsets[last]]
+            header = _STATUS.pack(request.id, OK) + _LENGTH.pack(request.n)
+            size = len(header) + 4 * (len(word_offsets) + len(chunks))
+            responses.append(b''.join((_LENGTH.pack(size), header, word_offsets.tobytes(), chunks.tobytes())))
+            first = last
+        return responses
+
+    async def _serve(self):
+        self._queue = asyncio.Queue()
+        self._executor = concurrent.futures.ThreadPoolExecutor(self.workers, thread_name_prefix='hyperhyphen-batch')
+        if _is_unix(self.address):
+            # A socket left behind by a server that did not stop cleanly
+            if os.path.exists(self.address) and stat.S_ISSOCK(os.stat(self.address).st_mode):
+                os.unlink(self.address)
+            self._server = await asyncio.start_unix_server(self._handle, self.address)
+        else:
+            self._server = await asyncio.start_server(self._handle, *self.address)
+            self.address = self._server.sockets[0].getsockname()[:2]
+        batchers = [asyncio.ensure_future(self._batcher()) for _ in range(self.workers)]
+        self._started.set()
+        try:
+            await self._server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            for batcher in batchers:
+                batcher.cancel()
+            # Closing the connections ends their handlers
+            handlers = list(self._connections)
+            for writer in self._connections.values():
+                writer.close()
+            await asyncio.gather(*batchers, *handlers, return_exceptions=True)
+            self._executor.shutdown(wait=True)
+            if _is_unix(self.address) and os.path.exists(self.address):
+                os.unlink(self.address)
+
+    def serve_forever(self):
+        """Serve in this thread until interrupted or stopped."""
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._loop.run_until_complete(self._serve())
+        finally:
+            self._started.set()
+            self._loop.close()
+
+    def start(self):
+        """Serve from a background thread, return once the server listens."""
+        self._thread = threading.Thread(target=self.serve_forever, name='hyperhyphen-server', daemon=True)
+        self._thread.start()
+        self._started.wait()
+        return self
+
+    def stop(self):
+        """Stop serving, closing all connections."""
+        if self._loop is not None and self._server is not None:
+            self._loop.call_soon_threadsafe(self._server.close)
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+class _Connection:
+    """One client connection, whose requests are pipelined and matched with their responses by a reader thread."""
+
+    def __init__(self, address, timeout):
+        if _is_unix(address):
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            self.sock = socket.socket(socket.AF_INET6 if ':' in address[0] else socket.AF_INET, socket.SOCK_STREAM)
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock.settimeout(timeout)
+        self.sock.connect(address)
+        self.sock.settimeout(None)
+        self.pending = {}
+        self.closed = False
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self._reader = threading.Thread(target=self._read, name='hyperhyphen-client', daemon=True)
+        self._reader.start()
+
+    def submit(self, name: bytes, words: bytes, n: int) -> concurrent.futures.Future:
+        future = concurrent.futures.Future()
+        with self._lock:
+            if self.closed:
+                raise ConnectionError("Connection to the hyphenation server is closed")
+            request_id = next(self._ids) & 0xFFFFFFFF
+            self.pending[request_id] = future
+            body = _REQUEST.pack(request_id, n, len(name))
+            try:
+                self.sock.sendall(b''.join((_LENGTH.pack(len(body) + len(name) + len(words)), body, name, words)))
+            except OSError as e:
+                self.closed = True
+                del self.pending[request_id]
+                raise ConnectionError(f"Cannot send to the hyphenation server: {e}") from e
+        return future
+
+    def _recv(self, size):
+        data = bytearray(size)
+        view = memoryview(data)
+        while view:
+            received = self.sock.recv_into(view)
+            if not received:
+                raise ConnectionError("Connection closed by the hyphenation server")
+            view = view[received:]
+        return data
+
+    def _read(self):
+        try:
+            while True:
+                size, = _LENGTH.unpack(self._recv(_LENGTH.size))
+                if size > MAX_FRAME:
+                    raise ValueError(f"Response frame of {size} bytes")
+                body = self._recv(size)
+                request_id, status = _STATUS.unpack_from(body)
+                with self._lock:
+                    future = self.pending.pop(request_id, None)
+                if future is None:
+                    continue
+                if status != OK:
+                    future.set_exception(RuntimeError(bytes(body[_STATUS.size:]).decode('utf-8', 'replace')))
+                    continue
+                n, = _LENGTH.unpack_from(body, _STATUS.size)
+                start = _STATUS.size + _LENGTH.size
+                if start + 4 * (n + 1) > size or (size - start) % 4:
+                    # The future of this request is failed with the others
+                    with self._lock:
+                        self.pending[request_id] = future
+                    raise ValueError(f"Response of {size} bytes for {n} words")
+                offsets = array('i', body[start:start + 4 * (n + 1)])
+                values = array('i', body[start + 4 * (n + 1):])
+                future.set_result((values, offsets))
+        except OSError as e:
+            self._fail(e if isinstance(e, ConnectionError) else ConnectionError(str(e)))
+        except (struct.error, ValueError) as e:
+            self._fail(ConnectionError(f"Malformed response from the hyphenation server: {e}"))
+
+    def _fail(self, error):
+        with self._lock:
+            self.closed = True
+            pending, self.pending = self.pending, {}
+        # The stream can not be resynchronized, further requests go to a new connection
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        for future in pending.values():
+            future.set_exception(error)
+
+    def close(self):
+        with self._lock:
+            self.closed = True
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+        self._reader.join()
+
+
+class HyphenationClient:
+    """
+    Client of a `HyphenationServer`, safe to share between threads.
+
+    Requests are spread over a pool of connections, each of which pipelines them: `submit` sends a request and
+    returns at once, so that many requests are in flight at the same time. Broken connections are reopened on
+    the next request.
+
+    Args:
+        address: path of the server's Unix socket, or (host, port) of its TCP socket
+        connections (int): size of the connection pool
+        timeout (float): seconds to wait for a connection
+    """
+
+    def __init__(self, address, connections: int = 4, timeout: "float | None" = 10.0):
+        self.address = address
+        self.timeout = timeout
+        self._connections = [None] * connections
+        self._next = itertools.count()
+        self._lock = threading.Lock()
+
+    def _connection(self) -> _Connection:
+        i = next(self._next) % len(self._connections)
+        connection = self._connections[i]
+        if connection is None or connection.closed:
+            with self._lock:
+                connection = self._connections[i]
+                if connection is None or connection.closed:
+                    connection = self._connections[i] = _Connection(self.address, self.timeout)
+        return connection
+
+    def submit(self, words, dictionary: str = '') -> concurrent.futures.Future:
+        """
+        Send a request to hyphenate words, without waiting for the response.
+
+        Args:
+            words (sequence of str): words to hyphenate, without whitespace
+            dictionary (str): name of the dictionary on the server, empty for its default dictionary
+
+        Returns:
+            Future: of the (values, offsets) int32 arrays of the chunk lengths in CSR layout
+        """
+        data = '\0'.join(words).encode('utf-8')
+        return self._connection().submit(dictionary.encode('utf-8'), data, len(words))
+
+    def hyphenate(self, words, dictionary: str = ''):
+        """Hyphenate words on the server, see `submit`."""
+        return self.submit(words, dictionary).result()
+
+    def close(self):
+        for connection in self._connections:
+            if connection is not None:
+                connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -227,7 +227,7 @@ hnj_add_trans (HyphenDict *dict, int state1, int state2, char ch)
 						(num_trans << 1) *
 						sizeof(HyphenTrans));
     }
-  dict->states[state1].trans[num_trans].ch = ch;
+  dict->states[state1].trans[num_trans].ch = (unsigned char) ch;
   dict->states[state1].trans[num_trans].new_state = state2;
   dict->states[state1].num_trans++;
 }
@@ -378,6 +378,129 @@ void hnj_hyphen_load_line(char * buf, HyphenDict * dict, HashTab * hashtab) {
 	    }
 }
 
+/* Aho-Corasick automaton of the NOHYPHEN entries, matching all of them (overlaps included) in one pass.
+   Bytes are mapped to classes first, with class 0 for the bytes of no entry, so that the transition
+   table is num_states * num_classes. */
+struct _HyphenMatcher {
+  int num_states;
+  int num_classes;
+  int max_len;           /* length of the longest entry */
+  unsigned char cls[256];
+  int *next;             /* transitions, num_states * num_classes */
+  int *len;              /* length of the entry ending in a state, or 0 */
+  int *out;              /* next state on the fallback chain that ends an entry, or -1 */
+  size_t size;           /* bytes allocated */
+};
+
+static HyphenMatcher *
+hnj_matcher_new (const char *entries, int count)
+{
+  HyphenMatcher *m;
+  const char *e;
+  int i, c, s, t, n, nc, head, tail, total = 0, num_classes = 1;
+  int *queue, *fallback;
+  unsigned char cls[256];
+  size_t size;
+
+  memset (cls, 0, sizeof(cls));
+  for (i = 0, e = entries; i < count; i++, e += strlen (e) + 1) {
+    total += strlen (e);
+    for (c = 0; e[c]; c++)
+      if (!cls[(unsigned char) e[c]]) cls[(unsigned char) e[c]] = num_classes++;
+  }
+
+  n = total + 1;
+  nc = num_classes;
+  size = sizeof(HyphenMatcher) + (size_t) n * (nc + 2) * sizeof(int);
+  m = (HyphenMatcher *) malloc (size);
+  queue = (int *) malloc (2 * n * sizeof(int));
+  if (!m || !queue) {
+    free (m);
+    free (queue);
+    return NULL;
+  }
+  fallback = queue + n;
+  m->num_states = 1;
+  m->num_classes = nc;
+  m->max_len = 0;
+  m->size = size;
+  memcpy (m->cls, cls, sizeof(cls));
+  m->next = (int *) (m + 1);
+  m->len = m->next + (size_t) n * nc;
+  m->out = m->len + n;
+  for (i = 0; i < n * nc; i++) m->next[i] = -1;
+  for (i = 0; i < n; i++) {
+    m->len[i] = 0;
+    m->out[i] = -1;
+  }
+
+  /* trie of the entries, empty ones never match */
+  for (i = 0, e = entries; i < count; i++, e += strlen (e) + 1) {
+    if (!*e) continue;
+    for (s = 0, c = 0; e[c]; c++) {
+      int *tr = &m->next[s * nc + cls[(unsigned char) e[c]]];
+      if (*tr < 0) *tr = m->num_states++;
+      s = *tr;
+    }
+    m->len[s] = c;
+    if (c > m->max_len) m->max_len = c;
+  }
+
+  /* breadth first, complete the transitions with those of the fallback states */
+  head = tail = 0;
+  fallback[0] = 0;
+  queue[tail++] = 0;
+  while (head < tail) {
+    s = queue[head++];
+    for (c = 0; c < nc; c++) {
+      t = m->next[s * nc + c];
+      if (t < 0) {
+        m->next[s * nc + c] = s ? m->next[fallback[s] * nc + c] : 0;
+      } else {
+        int f = s ? m->next[fallback[s] * nc + c] : 0;
+        fallback[t] = f;
+        m->out[t] = m->len[f] ? f : m->out[f];
+        queue[tail++] = t;
+      }
+    }
+  }
+
+  free (queue);
+  return m;
+}
+
+/* zero the hyphenation values around every occurrence of a NOHYPHEN entry in word, as a strstr() loop
+   per entry does: the last byte of the occurrence and the byte before it */
+static void
+hnj_nohyphen (HyphenDict *dict, const char *word, char *hyphens)
+{
+  if (!dict->nohyphen) return;
+
+  if (dict->nohyphen_matcher) {
+    HyphenMatcher *m = dict->nohyphen_matcher;
+    int i, s = 0, t;
+    for (i = 0; word[i]; i++) {
+      s = m->next[s * m->num_classes + m->cls[(unsigned char) word[i]]];
+      for (t = m->len[s] ? s : m->out[s]; t >= 0; t = m->out[t]) {
+        hyphens[i] = 0;
+        if (i - m->len[t] >= 0) hyphens[i - m->len[t]] = 0;
+      }
+    }
+  } else {
+    char * nh = dict->nohyphen;
+    int nhi;
+    for (nhi = 0; nhi <= dict->nohyphenl; nhi++) {
+        char * nhy = (char *) strstr(word, nh);
+        while (nhy) {
+            hyphens[nhy - word + strlen(nh) - 1] = 0;
+            if (nhy - word  - 1 >= 0) hyphens[nhy - word - 1] = 0;
+            nhy = (char *) strstr(nhy + 1, nh);
+        }
+        nh = nh + strlen(nh) + 1;
+    }
+  }
+}
+
 DLL_EXPORT HyphenDict *
 hnj_hyphen_load (const char *fn)
 {
@@ -419,6 +542,10 @@ for (k = 0; k < 2; k++) {
   dict[k]->states[0].num_trans = 0;
   dict[k]->states[0].trans = NULL;
   dict[k]->nextlevel = NULL;
+  dict[k]->arena = NULL;
+  dict[k]->arena_size = 0;
+  dict[k]->hits = NULL;
+  dict[k]->nohyphen_matcher = NULL;
   dict[k]->lhmin = 0;
   dict[k]->rhmin = 0;
   dict[k]->clhmin = 0;
@@ -522,11 +649,21 @@ for (k = 0; k < 2; k++) {
       }
 #endif
 
+  /* without the matcher (out of memory), NOHYPHEN falls back to strstr() */
+  if (dict[k]->nohyphen)
+    dict[k]->nohyphen_matcher = hnj_matcher_new (dict[k]->nohyphen, dict[k]->nohyphenl + 1);
+
 #ifndef VERBOSE
   hnj_hash_free (hashtab);
 #endif
   state_num = 0;
 }
+  /* larger state numbers wrap around in the transitions */
+  if (dict[0]->num_states >= MAX_STATES || dict[1]->num_states >= MAX_STATES) {
+    hnj_hyphen_free (dict[0]);
+    hnj_hyphen_free (dict[1]);
+    return NULL;
+  }
   if (nextlevel) dict[0]->nextlevel = dict[1];
   else {
     dict[1] -> nextlevel = dict[0];
@@ -544,12 +681,14 @@ for (k = 0; k < 2; k++) {
   return dict[0];
 }
 
-void hnj_hyphen_free (HyphenDict *dict)
+DLL_EXPORT void
+hnj_hyphen_free (HyphenDict *dict)
 {
   int state_num;
   HyphenState *hstate;
 
-  for (state_num = 0; state_num < dict->num_states; state_num++)
+  if (dict->arena) hnj_free (dict->arena);
+  else for (state_num = 0; state_num < dict->num_states; state_num++)
     {
       hstate = &dict->states[state_num];
       if (hstate->match)
@@ -562,12 +701,187 @@ void hnj_hyphen_free (HyphenDict *dict)
   if (dict->nextlevel) hnj_hyphen_free(dict->nextlevel);
 
   if (dict->nohyphen) hnj_free(dict->nohyphen);
+  if (dict->nohyphen_matcher) free(dict->nohyphen_matcher);
 
   hnj_free (dict->states);
 
   hnj_free (dict);
 }
 
+/* smallest power of two >= n, the capacity of the arrays grown by doubling */
+static size_t
+hnj_capacity (size_t n)
+{
+  size_t c = 1;
+  while (c < n) c <<= 1;
+  return c;
+}
+
+static int
+hnj_hyphen_compact_level (HyphenDict *dict)
+{
+  int i, j;
+  size_t trans_size = 0, string_size = 0, n;
+  size_t table_size;
+  char **table;
+  char *arena, *strings;
+  HyphenTrans *trans;
+  HyphenState *states;
+
+  if (dict->arena) return 0;
+  if (dict->num_states >= MAX_STATES) return 1;
+
+  /* open addressing table of the distinct strings in the arena */
+  table_size = hnj_capacity (2 * (size_t) dict->num_states + 1);
+  table = (char **) calloc (table_size, sizeof(char *));
+  if (!table) return 1;
+
+  for (i = 0; i < dict->num_states; i++) {
+    trans_size += dict->states[i].num_trans * sizeof(HyphenTrans);
+    if (dict->states[i].match) string_size += strlen (dict->states[i].match) + 1;
+    if (dict->states[i].repl) string_size += strlen (dict->states[i].repl) + 1;
+  }
+
+  arena = (char *) malloc (trans_size + string_size);
+  if (!arena) {
+    free (table);
+    return 1;
+  }
+
+  trans = (HyphenTrans *) arena;
+  strings = arena + trans_size;
+  for (i = 0; i < dict->num_states; i++) {
+    HyphenState *hstate = &dict->states[i];
+    char **field[2];
+    field[0] = &hstate->match;
+    field[1] = &hstate->repl;
+
+    if (hstate->trans) {
+      memcpy (trans, hstate->trans, hstate->num_trans * sizeof(HyphenTrans));
+      hnj_free (hstate->trans);
+      hstate->trans = trans;
+      trans += hstate->num_trans;
+    }
+
+    for (j = 0; j < 2; j++) {
+      char *s = *field[j];
+      size_t h;
+      if (!s) continue;
+      /* match strings repeat a lot ("1", "2", "001"...), store each only once */
+      for (h = hnj_string_hash (s) & (table_size - 1); table[h]; h = (h + 1) & (table_size - 1))
+        if (!strcmp (table[h], s)) break;
+      if (!table[h]) {
+        n = strlen (s) + 1;
+        memcpy (strings, s, n);
+        table[h] = strings;
+        strings += n;
+      }
+      hnj_free (s);
+      *field[j] = table[h];
+    }
+  }
+  free (table);
+
+  /* shrink the state array from its doubled capacity to the exact size */
+  states = (HyphenState *) realloc (dict->states, dict->num_states * sizeof(HyphenState));
+  if (states) dict->states = states;
+
+  dict->arena = arena;
+  dict->arena_size = strings - arena;
+  return 0;
+}
+
+DLL_EXPORT int
+hnj_hyphen_compact (HyphenDict *dict)
+{
+  for (; dict; dict = dict->nextlevel)
+    if (hnj_hyphen_compact_level (dict)) return 1;
+  return 0;
+}
+
+DLL_EXPORT size_t
+hnj_hyphen_memsize (HyphenDict *dict)
+{
+  size_t size = 0;
+  int i;
+
+  for (; dict; dict = dict->nextlevel) {
+    size += sizeof(HyphenDict);
+    if (dict->nohyphen) size += strlen (dict->nohyphen) + 1;
+    if (dict->nohyphen_matcher) size += dict->nohyphen_matcher->size;
+    if (dict->arena) {
+      size += dict->num_states * sizeof(HyphenState) + dict->arena_size;
+      continue;
+    }
+    size += hnj_capacity (dict->num_states) * sizeof(HyphenState);
+    for (i = 0; i < dict->num_states; i++) {
+      HyphenState *hstate = &dict->states[i];
+      if (hstate->match) size += strlen (hstate->match) + 1;
+      if (hstate->repl) size += strlen (hstate->repl) + 1;
+      if (hstate->num_trans) size += hnj_capacity (hstate->num_trans) * sizeof(HyphenTrans);
+    }
+  }
+  return size;
+}
+
+static HyphenDict *
+hnj_hyphen_level (HyphenDict *dict, int level)
+{
+  for (; dict && level > 0; level--) dict = dict->nextlevel;
+  return level < 0 ? NULL : dict;
+}
+
+DLL_EXPORT int
+hnj_hyphen_profile (HyphenDict *dict, int level, int *hits)
+{
+  dict = hnj_hyphen_level (dict, level);
+  if (!dict) return -1;
+  dict->hits = hits;
+  return dict->num_states;
+}
+
+DLL_EXPORT int
+hnj_hyphen_state_keys (HyphenDict *dict, int level, char *out, int kk)
+{
+  int i, k, s, len, n = 0;
+  int *parent;
+  char *label;
+  char key[MAX_CHARS];
+
+  dict = hnj_hyphen_level (dict, level);
+  if (!dict) return -1;
+
+  /* the transitions form a trie: every state but the root has exactly one incoming transition */
+  parent = (int *) malloc (dict->num_states * sizeof(int));
+  label = (char *) malloc (dict->num_states);
+  if (!parent || !label) {
+    free (parent);
+    free (label);
+    return -1;
+  }
+  for (i = 0; i < dict->num_states; i++) parent[i] = -1;
+  for (i = 0; i < dict->num_states; i++)
+    for (k = 0; k < dict->states[i].num_trans; k++) {
+      parent[dict->states[i].trans[k].new_state] = i;
+      label[dict->states[i].trans[k].new_state] = (char) dict->states[i].trans[k].ch;
+    }
+
+  for (i = 0; i < dict->num_states; i++) {
+    len = 0;
+    for (s = i; s > 0 && len < MAX_CHARS; s = parent[s]) key[len++] = label[s];
+    if (n + len + 1 > kk) {
+      n = -1;
+      break;
+    }
+    while (len) out[n++] = key[--len];
+    out[n++] = '\0';
+  }
+
+  free (parent);
+  free (label);
+  return n;
+}
+
 #define MAX_WORD 256
 
 int hnj_hyphen_hyphenate (HyphenDict *dict,
@@ -631,7 +945,7 @@ int hnj_hyphen_hyphenate (HyphenDict *dict,
 
 	  hstate = &dict->states[state];
 	  for (k = 0; k < hstate->num_trans; k++)
-	    if (hstate->trans[k].ch == ch)
+	    if (hstate->trans[k].ch == (unsigned char) ch)
 	      {
 		state = hstate->trans[k].new_state;
 		goto found_state;
@@ -645,6 +959,7 @@ int hnj_hyphen_hyphenate (HyphenDict *dict,
 #ifdef VERBOSE
       printf ("found state %d\n",state);
 #endif
+      if (dict->hits) dict->hits[state]++;
       /* Additional optimization is possible here - especially,
 	 elimination of trailing zeroes from the match. Leading zeroes
 	 have already been optimized. */
@@ -787,11 +1102,108 @@ int hnj_hyphen_rhmin(int utf8, const char *word, int word_size, char * hyphens,
     return 0;
 }
 
+/* memo of the hyphenation of compound word segments, shared by the words of a batch */
+#define HNJ_CACHE_SLOTS 1024
+#define HNJ_CACHE_ARENA (1 << 16)
+
+struct _HyphenCache {
+  int count;
+  int used;
+  unsigned int hash[HNJ_CACHE_SLOTS];
+  int entry[HNJ_CACHE_SLOTS];  /* 1 + offset of the entry in arena, 0 for an empty slot */
+  char *arena;                 /* entries: key (size, lend, rend, clhmin, crhmin), segment, hyphens */
+};
+
+HyphenCache *
+hnj_cache_new (void)
+{
+  return (HyphenCache *) calloc (1, sizeof(HyphenCache));
+}
+
+void
+hnj_cache_free (HyphenCache *cache)
+{
+  if (!cache) return;
+  free (cache->arena);
+  free (cache);
+}
+
+/* key of a segment hyphenation: its size and the hyphenmin parameters that apply to it */
+static unsigned int
+hnj_cache_key (char *key, const char *segment, int size, int lend, int rend, int clhmin, int crhmin)
+{
+  unsigned int h = 2166136261u;
+  int i;
+
+  memcpy (key, &size, sizeof(int));
+  key[4] = (char) lend;
+  key[5] = (char) rend;
+  key[6] = (char) clhmin;
+  key[7] = (char) crhmin;
+  for (i = 0; i < 8; i++) h = (h ^ (unsigned char) key[i]) * 16777619u;
+  for (i = 0; i < size; i++) h = (h ^ (unsigned char) segment[i]) * 16777619u;
+  return h;
+}
+
+static int
+hnj_cache_get (HyphenCache *cache, unsigned int h, const char *key, const char *segment, int size,
+    char *hyphens)
+{
+  int i, e;
+
+  if (!cache->arena) return 0;
+  for (i = h & (HNJ_CACHE_SLOTS - 1); (e = cache->entry[i]); i = (i + 1) & (HNJ_CACHE_SLOTS - 1)) {
+    const char *p = cache->arena + e - 1;
+    if (cache->hash[i] == h && !memcmp (p, key, 8) && !memcmp (p + 8, segment, size)) {
+      memcpy (hyphens, p + 8 + size, size);
+      return 1;
+    }
+  }
+  return 0;
+}
+
+static void
+hnj_cache_put (HyphenCache *cache, unsigned int h, const char *key, const char *segment, int size,
+    const char *hyphens)
+{
+  int i, need = 8 + 2 * size;
+  char *p;
+
+  if (need > HNJ_CACHE_ARENA) return;
+  if (!cache->arena) {
+    cache->arena = (char *) malloc (HNJ_CACHE_ARENA);
+    if (!cache->arena) return;
+  }
+  if (cache->used + need > HNJ_CACHE_ARENA || 2 * (cache->count + 1) > HNJ_CACHE_SLOTS) {
+    /* full, start over */
+    memset (cache->entry, 0, sizeof(cache->entry));
+    cache->count = cache->used = 0;
+  }
+
+  p = cache->arena + cache->used;
+  memcpy (p, key, 8);
+  memcpy (p + 8, segment, size);
+  memcpy (p + 8 + size, hyphens, size);
+  for (i = h & (HNJ_CACHE_SLOTS - 1); cache->entry[i]; i = (i + 1) & (HNJ_CACHE_SLOTS - 1));
+  cache->entry[i] = cache->used + 1;
+  cache->hash[i] = h;
+  cache->used += need;
+  cache->count++;
+}
+
+/* the scratch space of hnj_hyphen_hyph_() is on the stack for words up to this size */
+#define HNJ_SMALL_WORD 64
+
 /* recursive function for compound level hyphenation */
-int hnj_hyphen_hyph_(HyphenDict *dict, const char *word, int word_size,
+static int hnj_hyphen_hyph_cached(HyphenDict *dict, const char *word, int word_size,
     char * hyphens, char *** rep, int ** pos, int ** cut,
-    int clhmin, int crhmin, int lend, int rend)
+    int clhmin, int crhmin, int lend, int rend, HyphenCache *cache)
 {
+  char prep_small[HNJ_SMALL_WORD + 3];
+  int matchlen_small[HNJ_SMALL_WORD + 3];
+  int matchindex_small[HNJ_SMALL_WORD + 3];
+  char *matchrepl_small[HNJ_SMALL_WORD + 3];
+  int small = (word_size <= HNJ_SMALL_WORD);
   char *prep_word;
   int i, j, k;
   int state;
@@ -806,13 +1218,19 @@ int hnj_hyphen_hyph_(HyphenDict *dict, const char *word, int word_size,
   int * matchindex;
   char ** matchrepl;  
   int isrepl = 0;
-  int nHyphCount;
 
   size_t prep_word_size = word_size + 3;
-  prep_word = (char*) hnj_malloc (prep_word_size);
-  matchlen = (int*) hnj_malloc ((word_size + 3) * sizeof(int));
-  matchindex = (int*) hnj_malloc ((word_size + 3) * sizeof(int));
-  matchrepl = (char**) hnj_malloc ((word_size + 3) * sizeof(char *));
+  if (small) {
+    prep_word = prep_small;
+    matchlen = matchlen_small;
+    matchindex = matchindex_small;
+    matchrepl = matchrepl_small;
+  } else {
+    prep_word = (char*) hnj_malloc (prep_word_size);
+    matchlen = (int*) hnj_malloc ((word_size + 3) * sizeof(int));
+    matchindex = (int*) hnj_malloc ((word_size + 3) * sizeof(int));
+    matchrepl = (char**) hnj_malloc ((word_size + 3) * sizeof(char *));
+  }
 
   j = 0;
   prep_word[j++] = '.';
@@ -863,7 +1281,7 @@ int hnj_hyphen_hyph_(HyphenDict *dict, const char *word, int word_size,
 
 	  hstate = &dict->states[state];
 	  for (k = 0; k < hstate->num_trans; k++)
-	    if (hstate->trans[k].ch == ch)
+	    if (hstate->trans[k].ch == (unsigned char) ch)
 	      {
 		state = hstate->trans[k].new_state;
 		goto found_state;
@@ -877,6 +1295,7 @@ int hnj_hyphen_hyph_(HyphenDict *dict, const char *word, int word_size,
 #ifdef VERBOSE
       printf ("found state %d\n",state);
 #endif
+      if (dict->hits) dict->hits[state]++;
       /* Additional optimization is possible here - especially,
 	 elimination of trailing zeroes from the match. Leading zeroes
 	 have already been optimized. */
@@ -905,7 +1324,8 @@ int hnj_hyphen_hyph_(HyphenDict *dict, const char *word, int word_size,
 	  for (k = 0; match[k]; k++) {
 	    if ((hyphens[offset + k] < match[k])) {
 	      hyphens[offset + k] = match[k];
-              if (match[k]&1) {
+              /* the replacements are only tracked once a replacing pattern matched */
+              if ((match[k]&1) && isrepl) {
                 matchrepl[offset + k] = repl;
                 if (repl && (k >= replindex) && (k <= replindex + replcut)) {
                     matchindex[offset + replindex] = offset + k;
@@ -939,15 +1359,10 @@ int hnj_hyphen_hyph_(HyphenDict *dict, const char *word, int word_size,
     hyphens[i] = '0';
   hyphens[word_size] = '\0';
 
-       /* now create a new char string showing hyphenation positions */
-       /* count the hyphens and allocate space for the new hyphenated string */
-       nHyphCount = 0;
-       for (i = 0; i < word_size; i++)
-          if (hyphens[i]&1)
-             nHyphCount++;
+       /* collect the non-standard hyphenations, if any replacing pattern matched */
        j = 0;
-       for (i = 0; i < word_size; i++) {
-           if (isrepl && (matchindex[i] >= 0) && matchrepl[matchindex[i]]) { 
+       for (i = 0; isrepl && i < word_size; i++) {
+           if ((matchindex[i] >= 0) && matchrepl[matchindex[i]]) { 
                 if (rep && pos && cut) {
                     if (!*rep)
                         *rep = (char **) calloc(word_size, sizeof(char *));
@@ -965,92 +1380,137 @@ int hnj_hyphen_hyph_(HyphenDict *dict, const char *word, int word_size,
           }
        }
 
-  hnj_free (matchrepl);
-  hnj_free (matchlen);
-  hnj_free (matchindex);
+  if (!small) {
+    hnj_free (matchrepl);
+    hnj_free (matchlen);
+    hnj_free (matchindex);
+  }
 
   /* recursive hyphenation of the first (compound) level segments */
   if (dict->nextlevel) {
+     char *rep2_small[HNJ_SMALL_WORD];
+     int pos2_small[HNJ_SMALL_WORD];
+     int cut2_small[HNJ_SMALL_WORD];
+     char hyphens2_small[HNJ_SMALL_WORD + 3];
      char ** rep2;
      int * pos2;
      int * cut2;
      char * hyphens2;
      int begin = 0;
-
-     rep2 = (char**) hnj_malloc (word_size * sizeof(char *));
-     pos2 = (int*) hnj_malloc (word_size * sizeof(int));
-     cut2 = (int*) hnj_malloc (word_size * sizeof(int));
-     hyphens2 = (char*) hnj_malloc (word_size + 3);
-     for (i = 0; i < word_size; i++) rep2[i] = NULL;
-     for (i = 0; i < word_size; i++) if 
-        (hyphens[i]&1 || (begin > 0 && i + 1 == word_size)) {
-        if (i - begin > 0) {
-            int hyph = 0;
-            prep_word[i + 2] = '\0';
-            /* non-standard hyphenation at compound boundary (Schiffahrt) */
-            if (rep && *rep && *pos && *cut && (*rep)[i]) {
-                char * l = strchr((*rep)[i], '=');
-                size_t offset = 2 + i - (*pos)[i];
-                strncpy(prep_word + offset, (*rep)[i], prep_word_size - offset - 1);
-                prep_word[prep_word_size - 1] = '\0';
-                if (l) {
-                    hyph = (l - (*rep)[i]) - (*pos)[i];
-                    prep_word[2 + i + hyph] = '\0';
-                }
-            }
-            hnj_hyphen_hyph_(dict, prep_word + begin + 1, i - begin + 1 + hyph,
-                hyphens2, &rep2, &pos2, &cut2, clhmin,
-                crhmin, (begin > 0 ? 0 : lend), (hyphens[i]&1 ? 0 : rend));
-            for (j = 0; j < i - begin; j++) {
-                hyphens[begin + j] = hyphens2[j];
-                if (rep2[j] && rep && pos && cut) {
-                    if (!*rep && !*pos && !*cut) {
-                        int k;
-                        *rep = (char **) malloc(sizeof(char *) * word_size);
-                        *pos = (int *) malloc(sizeof(int) * word_size);
-                        *cut = (int *) malloc(sizeof(int) * word_size);
-                        for (k = 0; k < word_size; k++) {
-                            (*rep)[k] = NULL;
-                            (*pos)[k] = 0;
-                            (*cut)[k] = 0;
-                        }
-                    }
-                    (*rep)[begin + j] = rep2[j];
-                    (*pos)[begin + j] = pos2[j];
-                    (*cut)[begin + j] = cut2[j];
-                }
-            }
-            prep_word[i + 2] = word[i + 1];
-            if (*rep && *pos && *cut && (*rep)[i]) {
-                size_t offset = 1;
-                strncpy(prep_word + offset, word, prep_word_size - offset - 1);
-                prep_word[prep_word_size - 1] = '\0';
-            }
-        }
-        begin = i + 1;
-        for (j = 0; j < word_size; j++) rep2[j] = NULL;
+     /* segment results are not memoized while profiling, so that every state visit is counted */
+     int memo = cache && !dict->hits && !dict->nextlevel->hits;
+
+     /* most words have no compound boundary, look for one before setting up the segments */
+     for (i = 0; i < word_size && !(hyphens[i]&1); i++);
+
+     if (i < word_size) {
+       if (small) {
+         rep2 = rep2_small;
+         pos2 = pos2_small;
+         cut2 = cut2_small;
+         hyphens2 = hyphens2_small;
+       } else {
+         rep2 = (char**) hnj_malloc (word_size * sizeof(char *));
+         pos2 = (int*) hnj_malloc (word_size * sizeof(int));
+         cut2 = (int*) hnj_malloc (word_size * sizeof(int));
+         hyphens2 = (char*) hnj_malloc (word_size + 3);
+       }
+       for (i = 0; i < word_size; i++) rep2[i] = NULL;
+       for (i = 0; i < word_size; i++) if
+          (hyphens[i]&1 || (begin > 0 && i + 1 == word_size)) {
+          if (i - begin > 0) {
+              int hyph = 0;
+              int seg_lend = (begin > 0 ? 0 : lend);
+              int seg_rend = (hyphens[i]&1 ? 0 : rend);
+              int seg_size;
+              char key[8];
+              unsigned int h = 0;
+              prep_word[i + 2] = '\0';
+              /* non-standard hyphenation at compound boundary (Schiffahrt) */
+              if (rep && *rep && *pos && *cut && (*rep)[i]) {
+                  char * l = strchr((*rep)[i], '=');
+                  size_t offset = 2 + i - (*pos)[i];
+                  strncpy(prep_word + offset, (*rep)[i], prep_word_size - offset - 1);
+                  prep_word[prep_word_size - 1] = '\0';
+                  if (l) {
+                      hyph = (l - (*rep)[i]) - (*pos)[i];
+                      prep_word[2 + i + hyph] = '\0';
+                  }
+              }
+              seg_size = i - begin + 1 + hyph;
+              if (memo) h = hnj_cache_key(key, prep_word + begin + 1, seg_size, seg_lend, seg_rend, clhmin, crhmin);
+              if (!memo || !hnj_cache_get(cache, h, key, prep_word + begin + 1, seg_size, hyphens2)) {
+                  hnj_hyphen_hyph_cached(dict, prep_word + begin + 1, seg_size,
+                      hyphens2, &rep2, &pos2, &cut2, clhmin,
+                      crhmin, seg_lend, seg_rend, cache);
+                  /* segments with non-standard hyphenation are not memoized */
+                  if (memo) {
+                      for (j = 0; j < word_size && !rep2[j]; j++);
+                      if (j == word_size)
+                          hnj_cache_put(cache, h, key, prep_word + begin + 1, seg_size, hyphens2);
+                  }
+              }
+              for (j = 0; j < i - begin; j++) {
+                  hyphens[begin + j] = hyphens2[j];
+                  if (rep2[j] && rep && pos && cut) {
+                      if (!*rep && !*pos && !*cut) {
+                          int k;
+                          *rep = (char **) malloc(sizeof(char *) * word_size);
+                          *pos = (int *) malloc(sizeof(int) * word_size);
+                          *cut = (int *) malloc(sizeof(int) * word_size);
+                          for (k = 0; k < word_size; k++) {
+                              (*rep)[k] = NULL;
+                              (*pos)[k] = 0;
+                              (*cut)[k] = 0;
+                          }
+                      }
+                      (*rep)[begin + j] = rep2[j];
+                      (*pos)[begin + j] = pos2[j];
+                      (*cut)[begin + j] = cut2[j];
+                  }
+              }
+              prep_word[i + 2] = word[i + 1];
+              if (*rep && *pos && *cut && (*rep)[i]) {
+                  size_t offset = 1;
+                  strncpy(prep_word + offset, word, prep_word_size - offset - 1);
+                  prep_word[prep_word_size - 1] = '\0';
+              }
+          }
+          begin = i + 1;
+          for (j = 0; j < word_size; j++) rep2[j] = NULL;
+       }
+       if (!small) {
+         free(rep2);
+         free(cut2);
+         free(pos2);
+         free(hyphens2);
+       }
      }
-     
+
      /* non-compound */
      if (begin == 0) {
-        hnj_hyphen_hyph_(dict->nextlevel, word, word_size,
-            hyphens, rep, pos, cut, clhmin, crhmin, lend, rend);
+        hnj_hyphen_hyph_cached(dict->nextlevel, word, word_size,
+            hyphens, rep, pos, cut, clhmin, crhmin, lend, rend, cache);
         if (!lend) hnj_hyphen_lhmin(dict->utf8, word, word_size, hyphens,
             rep, pos, cut, clhmin);
         if (!rend) hnj_hyphen_rhmin(dict->utf8, word, word_size, hyphens,
             rep, pos, cut, crhmin);
      }
-     
-     free(rep2);
-     free(cut2);
-     free(pos2);
-     free(hyphens2);
   }
 
-  hnj_free (prep_word);
+  if (!small) hnj_free (prep_word);
   return 0;
 }
 
+/* recursive function for compound level hyphenation, without a memo */
+int hnj_hyphen_hyph_(HyphenDict *dict, const char *word, int word_size,
+    char * hyphens, char *** rep, int ** pos, int ** cut,
+    int clhmin, int crhmin, int lend, int rend)
+{
+  return hnj_hyphen_hyph_cached(dict, word, word_size, hyphens, rep, pos, cut,
+    clhmin, crhmin, lend, rend, NULL);
+}
+
 /* UTF-8 normalization of hyphen and non-standard positions */
 int hnj_hyphen_norm(const char *word, int word_size, char * hyphens,
 	char *** rep, int ** pos, int ** cut)
@@ -1169,38 +1629,129 @@ int hnj_hyphen_hyphenate2 (HyphenDict *dict,
   return 0;
 }
 
+/* end of the bytes cleared by hnj_hyphen_lhmin() when there is no non-standard hyphenation */
+static int
+hnj_lhmin_end (int utf8, const char *word, int lhmin)
+{
+    int i = 1, j;
+
+    /* Unicode ligature support */
+    if (utf8 && ((unsigned char) word[0] == 0xEF) && ((unsigned char) word[1] == 0xAC))  {
+      i += hnj_ligature(word[2]);
+    }
+
+    /* ignore numbers */
+    for (j = 0; word[j] <= '9' && word[j] >= '0'; j++) i--;
+
+    for (j = 0; i < lhmin && word[j] != '\0'; i++) do {
+       j++;
+
+       /* Unicode ligature support */
+       if (utf8 && ((unsigned char) word[j] == 0xEF) && ((unsigned char) word[j + 1] == 0xAC))  {
+         i += hnj_ligature(word[j + 2]);
+       }
+    } while (utf8 && (word[j] & 0xc0) == 0x80);
+    return j;
+}
+
+/* start of the bytes cleared by hnj_hyphen_rhmin() when there is no non-standard hyphenation */
+static int
+hnj_rhmin_start (int utf8, const char *word, int word_size, int rhmin)
+{
+    int i = 0;
+    int j;
+
+    /* ignore numbers */
+    for (j = word_size - 1; j > 0 && word[j] <= '9' && word[j] >= '0'; j--) i--;
+
+    for (j = word_size - 1; i < rhmin && j > 0; j--) {
+       if (!utf8 || (word[j] & 0xc0) == 0xc0 || (word[j] & 0x80) != 0x80) i++;
+    }
+    return j + 1;
+}
+
+/* hnj_hyphen_lhmin(), hnj_hyphen_rhmin(), hnj_hyphen_hyphword(), NOHYPHEN and hnj_hyphen_norm() of
+   hnj_hyphen_hyphenate3() fused into a single sweep over a word without non-standard hyphenation.
+   The UTF-8 normalization trails the NOHYPHEN matching by the longest entry, as a match clears the
+   byte before its start. */
+static void
+hnj_hyphen_finish (HyphenDict *dict, const char *word, int word_size, char *hyphens,
+    char *hyphword, int lhmin, int rhmin)
+{
+  HyphenMatcher *m = dict->nohyphen_matcher;
+  int utf8 = dict->utf8;
+  int left = hnj_lhmin_end (utf8, word, lhmin);
+  int right = hnj_rhmin_start (utf8, word, word_size, rhmin);
+  int delay = m ? m->max_len : 0;
+  int hyphword_size = 2 * word_size - 1;
+  int scanning = (m != NULL);
+  int i, k, t, s = 0, j = 0, c = -1;
+
+  for (i = 0; i < word_size + delay; i++) {
+    if (i < word_size) {
+      if (i < left || i >= right) hyphens[i] = '0';
+      if (hyphword && j < hyphword_size) {
+        hyphword[j++] = word[i];
+        if (hyphens[i] & 1 && j < hyphword_size) hyphword[j++] = '=';
+      }
+      /* like strstr(), NOHYPHEN matching stops at a zero byte */
+      if (scanning && !word[i]) scanning = 0;
+      if (scanning) {
+        s = m->next[s * m->num_classes + m->cls[(unsigned char) word[i]]];
+        for (t = m->len[s] ? s : m->out[s]; t >= 0; t = m->out[t]) {
+          hyphens[i] = 0;
+          if (i - m->len[t] >= 0) hyphens[i - m->len[t]] = 0;
+        }
+      }
+    }
+    k = i - delay;
+    if (utf8 && k >= 0) {
+      /* beginning of an UTF-8 character (not '10' start bits) */
+      if ((((unsigned char) word[k]) >> 6) != 2) c++;
+      hyphens[c] = hyphens[k];
+    }
+  }
+  if (hyphword) hyphword[j] = '\0';
+  if (utf8) hyphens[c + 1] = '\0';
+}
+
 /* previous main api function with hyphenmin parameters */
 int hnj_hyphen_hyphenate3 (HyphenDict *dict,
 	const char *word, int word_size, char * hyphens,
 	char *hyphword, char *** rep, int ** pos, int ** cut,
 	int lhmin, int rhmin, int clhmin, int crhmin)
+{
+  return hnj_hyphen_hyphenate4(dict, word, word_size, hyphens, hyphword, rep, pos, cut,
+    lhmin, rhmin, clhmin, crhmin, NULL);
+}
+
+int hnj_hyphen_hyphenate4 (HyphenDict *dict,
+	const char *word, int word_size, char * hyphens,
+	char *hyphword, char *** rep, int ** pos, int ** cut,
+	int lhmin, int rhmin, int clhmin, int crhmin, HyphenCache *cache)
 {
   lhmin = (lhmin > dict->lhmin) ? lhmin : dict->lhmin;
   rhmin = (rhmin > dict->rhmin) ? rhmin : dict->rhmin;
   clhmin = (clhmin > dict->clhmin) ? clhmin : dict->clhmin;
   crhmin = (crhmin > dict->crhmin) ? crhmin : dict->crhmin;
-  hnj_hyphen_hyph_(dict, word, word_size, hyphens, rep, pos, cut,
-    clhmin, crhmin, 1, 1);
+  hnj_hyphen_hyph_cached(dict, word, word_size, hyphens, rep, pos, cut,
+    clhmin, crhmin, 1, 1, cache);
+
+  /* standard hyphenation, the common case */
+  if ((!rep || !*rep) && word_size > 0 && (!dict->nohyphen || dict->nohyphen_matcher)
+      && !(dict->utf8 && (((unsigned char) word[0]) >> 6) == 2)) {
+    hnj_hyphen_finish(dict, word, word_size, hyphens, hyphword,
+      (lhmin > 0 ? lhmin : 2), (rhmin > 0 ? rhmin : 2));
+    return 0;
+  }
+
   hnj_hyphen_lhmin(dict->utf8, word, word_size, hyphens,
     rep, pos, cut, (lhmin > 0 ? lhmin : 2));
   hnj_hyphen_rhmin(dict->utf8, word, word_size, hyphens,
     rep, pos, cut, (rhmin > 0 ? rhmin : 2));
   if (hyphword) hnj_hyphen_hyphword(word, word_size, hyphens, hyphword, rep, pos, cut);
 
-  /* nohyphen */
-  if (dict->nohyphen) {
-    char * nh = dict->nohyphen;
-    int nhi;
-    for (nhi = 0; nhi <= dict->nohyphenl; nhi++) {
-        char * nhy = (char *) strstr(word, nh);
-        while (nhy) {
-            hyphens[nhy - word + strlen(nh) - 1] = 0;
-            if (nhy - word  - 1 >= 0) hyphens[nhy - word - 1] = 0;
-            nhy = (char *) strstr(nhy + 1, nh);
-        }
-        nh = nh + strlen(nh) + 1;
-    }
-  }
+  hnj_nohyphen(dict, word, hyphens);
 
   if (dict->utf8) return hnj_hyphen_norm(word, word_size, hyphens, rep, pos, cut);
   return 0;
@@ -60,8 +60,12 @@ extern "C" {
 typedef struct _HyphenDict HyphenDict;
 typedef struct _HyphenState HyphenState;
 typedef struct _HyphenTrans HyphenTrans;
+typedef struct _HyphenMatcher HyphenMatcher;
+typedef struct _HyphenCache HyphenCache;
 #define MAX_CHARS 100
 #define MAX_NAME 20
+/* number of states of a dictionary level that fits in HyphenTrans.new_state */
+#define MAX_STATES (1 << 23)
 
 #ifdef _MSC_VER
 #define DLL_EXPORT  __declspec( dllexport )
@@ -84,26 +88,51 @@ struct _HyphenDict {
   int utf8;
   HyphenState *states;
   HyphenDict *nextlevel;
+  char *arena;   /* match, repl and trans storage after hnj_hyphen_compact(), or NULL */
+  size_t arena_size;
+  int *hits;     /* visits per state while profiling, or NULL */
+  HyphenMatcher *nohyphen_matcher; /* nohyphen compiled into a single automaton, or NULL */
 };
 
+/* fields ordered by size, to avoid padding */
 struct _HyphenState {
   char *match;
   char *repl;
+  HyphenTrans *trans;
+  int fallback_state;
+  unsigned short num_trans;
   signed char replindex;
   signed char replcut;
-  int fallback_state;
-  int num_trans;
-  HyphenTrans *trans;
 };
 
+/* packed in 4 bytes: 8 bits character (a byte, unsigned whatever the signedness
+   of char), 24 bits state number, less than MAX_STATES */
 struct _HyphenTrans {
-  char ch;
-  int new_state;
+  unsigned int ch : 8;
+  signed int new_state : 24;
 };
 
 DLL_EXPORT HyphenDict *hnj_hyphen_load (const char *fn);
 DLL_EXPORT HyphenDict *hnj_hyphen_load_file (FILE *f);
-void hnj_hyphen_free (HyphenDict *dict);
+DLL_EXPORT void hnj_hyphen_free (HyphenDict *dict);
+
+/* pack the states of a loaded dictionary (and its next level) into a single arena,
+   with duplicate match strings stored once. Returns 0 on success. */
+DLL_EXPORT int hnj_hyphen_compact (HyphenDict *dict);
+
+/* bytes of memory used by a dictionary and its next level */
+DLL_EXPORT size_t hnj_hyphen_memsize (HyphenDict *dict);
+
+/* attach an array of num_states visit counters to a level of the dictionary
+   (0: the dictionary itself, 1: its next level), or detach it with NULL.
+   While attached, every state reached by the pattern automaton is counted.
+   Returns the number of states of the level, or -1 if there is no such level. */
+DLL_EXPORT int hnj_hyphen_profile (HyphenDict *dict, int level, int *hits);
+
+/* write the pattern string (letters without digits) of every state of a level,
+   NUL terminated and in state order. Returns the number of bytes written, or
+   -1 if there is no such level or out is too small. */
+DLL_EXPORT int hnj_hyphen_state_keys (HyphenDict *dict, int level, char *out, int kk);
 
 /* obsolete, use hnj_hyphen_hyphenate2() or *hyphenate3() functions) */
 int hnj_hyphen_hyphenate (HyphenDict *dict,
@@ -174,6 +203,18 @@ int hnj_hyphen_hyphenate3 (HyphenDict *dict,
 	char *hyphword, char *** rep, int ** pos, int ** cut,
 	int lhmin, int rhmin, int clhmin, int crhmin);
 
+/* memo of the hyphenation of compound word segments, to share between the words
+   of a batch hyphenated with one dictionary. Not thread-safe, use one per thread. */
+HyphenCache *hnj_cache_new (void);
+void hnj_cache_free (HyphenCache *cache);
+
+/* like hnj_hyphen_hyphenate3, with the segments of compound words (of two-level
+   dictionaries, and hyphenated words) memoized in cache, which may be NULL */
+int hnj_hyphen_hyphenate4 (HyphenDict *dict,
+	const char *word, int word_size, char * hyphens,
+	char *hyphword, char *** rep, int ** pos, int ** cut,
+	int lhmin, int rhmin, int clhmin, int crhmin, HyphenCache *cache);
+
 #ifdef __cplusplus
 }
 #endif /* __cplusplus */
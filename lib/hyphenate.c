@@ -5,6 +5,7 @@
 #include <ctype.h>
 
 #include "hyphen.h"
+#include "hyphenate.h"
 
 #ifdef _MSC_VER
 #define DLL_EXPORT  __declspec( dllexport )
@@ -71,25 +72,78 @@ size_t count_utf8_code_points(const char *s) {
 }
 
 
-DLL_EXPORT int parse_word(HyphenDict *dict, char *word, char *out, int k, int kk, int optn, int opts, int optnn, int optdd) {
-    int i, j, c, n, z = 0;
-    size_t utf8_k;
-    int  nHyphCount;
-    char *hyphens;
-    char *hyphword;
-    char hword[BUFSIZE * 2];
+/* Chunk lengths (in code points) of a word of k bytes from its hyphenation vector, written to out. The code
+   points are counted along the way instead of in a pass of their own. If priorities is not NULL, the pattern
+   priority (1, 3, 5, 7 or 9) of the break after every chunk is written to it, 0 after the last one. Returns
+   the number of chunks, or -1 if they do not fit in cap values. */
+static int hyphen_chunks(const char *word, int k, const char *hyphens, int *out, unsigned char *priorities,
+                         int cap) {
+    int j, i = 0, c = 0, n = 0, started = 0;
+
+    for (j = 0; j < k; j++) {
+        if ((word[j] & 0xC0) == 0x80) continue;
+        /* a code point starts here, so the previous one (number i) is followed by another one */
+        if (started) {
+            c++;
+            if (hyphens[i] % 2 == 1) {
+                if (n >= cap) return -1;
+                if (priorities) priorities[n] = (unsigned char) (hyphens[i] - '0');
+                out[n++] = c;
+                c = 0;
+            }
+            i++;
+        }
+        started = 1;
+    }
+    if (n >= cap) return -1;
+    if (priorities) priorities[n] = 0;
+    out[n++] = c + 1;
+    return n;
+}
+
+/* Write a positive number followed by sep to out (kk bytes). Returns the number of bytes written, or -1 if
+   they do not fit with a terminating zero byte. */
+static int put_number(char *out, int kk, int v, char sep) {
+    char digits[12];
+    int n = 0, z;
+
+    do {
+        digits[n++] = (char) ('0' + v % 10);
+        v /= 10;
+    } while (v > 0);
+    z = n + 1;
+    if (z >= kk) return -1;
+    while (n > 0) *out++ = digits[--n];
+    *out++ = sep;
+    *out = '\0';
+    return z;
+}
+
+static int parse_word_cached(HyphenDict *dict, char *word, char *out, int k, int kk, int optn, int opts, int optnn,
+                             int optdd, HyphenCache *cache) {
+    int i, z = 0;
+    int size = kk;
+    char hyphens_small[256];
+    int chunks_small[256];
+    char *hyphens = hyphens_small;
+    int *chunks = chunks_small;
+    char hword_buffer[BUFSIZE * 2];
+    /* only the hyphenated string output needs the hyphenated word, which libhyphen builds on request */
+    char *hword = (!optn && (opts || !optnn)) ? hword_buffer : NULL;
     char ** rep = NULL;
     int * pos = NULL;
     int * cut = NULL;
 
     /* Set aside a buffer to hold hyphen information */
-    hyphens = (char *) malloc(k+5);
-    if (!hyphens) return -2;
+    if (k + 5 > (int) sizeof(hyphens_small)) {
+        hyphens = (char *) malloc(k + 5);
+        if (!hyphens) return -2;
+    }
 
-    hword[0] = '\0';
+    if (hword) hword[0] = '\0';
 
-    if (hnj_hyphen_hyphenate3(dict, word, k, hyphens, hword, &rep, &pos, &cut, 4, 3, 2, 2)) {
-      free(hyphens);
+    if (hnj_hyphen_hyphenate4(dict, word, k, hyphens, hword, &rep, &pos, &cut, 4, 3, 2, 2, cache)) {
+      if (hyphens != hyphens_small) free(hyphens);
       // Do not exit, return error code
       return -1;
     }
@@ -100,27 +154,24 @@ DLL_EXPORT int parse_word(HyphenDict *dict, char *word, char *out, int k, int kk
       z = snprintf(out, kk, "%s\n", word);
     }
     else if (optnn) {
-        char remainder = BUFSIZE;
         if (rep) {
             z = snprintf(out, kk, "%d\n", k);
         }
         else {
-            z = 0;
-            c = 0;
-            utf8_k = count_utf8_code_points(word);
-            for (i = 0; i < utf8_k - 1; i++) {
-              c++;
-              if (hyphens[i] % 2 == 1) {
-                int n = snprintf(out, kk, "%d ", c);
-                if (n < 0 || n >= kk) break;
-                z += n;
-                out += n;
-                kk -= n;
-                c = 0;
-              }
+            /* a word of k bytes has at most k chunks */
+            int n = 0;
+            if (k > (int) (sizeof(chunks_small) / sizeof(int))) chunks = (int *) malloc(k * sizeof(int));
+            if (chunks) n = hyphen_chunks(word, k, hyphens, chunks, NULL, k > 0 ? k : 1);
+            else z = -2;
+            for (i = 0; i < n; i++) {
+                int w = put_number(out + z, kk - z, chunks[i], i + 1 < n ? ' ' : '\n');
+                if (w < 0) {
+                    z = size;
+                    break;
+                }
+                z += w;
             }
-            int n = snprintf(out, kk, "%d\n", c + 1);
-            if (n > 0 && n < kk) z += n;
+            if (chunks != chunks_small) free(chunks);
         }
     }
     else {
@@ -138,33 +189,471 @@ DLL_EXPORT int parse_word(HyphenDict *dict, char *word, char *out, int k, int kk
     if (pos) free(pos);
     if (cut) free(cut);
 
-    free(hyphens);
+    if (hyphens != hyphens_small) free(hyphens);
 
     return z;
 }
 
+/* Hyphenate a word of k bytes and format it into out (kk bytes) as selected by the options. Returns the
+   number of bytes written, a value >= kk if the output did not fit, or a negative number on failure. */
+DLL_EXPORT int parse_word(HyphenDict *dict, char *word, char *out, int k, int kk, int optn, int opts, int optnn, int optdd) {
+    return parse_word_cached(dict, word, out, k, kk, optn, opts, optnn, optdd, NULL);
+}
+
+/* Format n zero-terminated words stored one after the other in words into out (kk bytes).
+   Returns 0, -1 if the output did not fit, or -2 on failure. See parse_words_from to resume instead. */
 DLL_EXPORT int parse_words(HyphenDict *dict, char *words, char *out, int n, int kk, int optn, int opts, int optnn, int optdd) {
-    int k, z;
+    int k, z = 0;
+    HyphenCache *cache = hnj_cache_new();
+    if (!cache) return -2;
 
     for (int i = 0; i < n; i++) {
         k = strlen(words);
-        if (k < 0 || kk <= 0) return -2;
+        if (k < 0 || kk <= 0) {
+            z = -2;
+            break;
+        }
 
-        z = parse_word(dict, words, out, k, kk, optn, opts, optnn, optdd);
-        if (z < 0) return z;
+        z = parse_word_cached(dict, words, out, k, kk, optn, opts, optnn, optdd, cache);
+        if (z < 0) break;
 
         words += k + 1;
         out += z;
         kk -= z;
 
         if (kk <= 0) {
-            return -1;
+            z = -1;
+            break;
+        }
+        z = 0;
+    }
+
+    hnj_cache_free(cache);
+    return z;
+}
+
+/* Resumable form of parse_words: format the n zero-terminated words stored one after the other in words
+   into out (kk bytes), starting at word start, which begins at byte *position of words. Stops before the
+   first word whose output does not fit and returns its number (n when all words are done), with *position
+   updated to its first byte and the number of bytes written in *written, or a negative number on failure.
+   The caller can then keep going with the same buffer, or a larger one if no word fitted at all. */
+DLL_EXPORT int parse_words_from(HyphenDict *dict, char *words, int n, int start, int *position,
+                                char *out, int kk, int *written, int optn, int opts, int optnn, int optdd) {
+    int t, k, z, o = 0;
+    char *word = words + *position;
+    HyphenCache *cache = hnj_cache_new();
+    if (!cache) return -2;
+
+    for (t = start; t < n; t++) {
+        k = strlen(word);
+        z = parse_word_cached(dict, word, out + o, k, kk - o, optn, opts, optnn, optdd, cache);
+        if (z < 0) {
+            hnj_cache_free(cache);
+            return z;
         }
+        if (z >= kk - o) break;
+        o += z;
+        word += k + 1;
     }
 
+    hnj_cache_free(cache);
+    *position = (int) (word - words);
+    *written = o;
+    return t;
+}
+
+/* byte length of the whitespace character at p (same set as Python's str.isspace), 0 if p is not whitespace */
+static int utf8_space(const unsigned char *p, const unsigned char *end) {
+    if (*p == ' ' || (*p >= '\t' && *p <= '\r') || (*p >= 0x1c && *p <= 0x1f)) return 1;
+    if (*p < 0xc2 || p + 1 >= end) return 0;
+    if (p[0] == 0xc2) return (p[1] == 0x85 || p[1] == 0xa0) ? 2 : 0;
+    if (p + 2 >= end) return 0;
+    if (p[0] == 0xe1) return (p[1] == 0x9a && p[2] == 0x80) ? 3 : 0;
+    if (p[0] == 0xe2 && p[1] == 0x80) return (p[2] <= 0x8a || p[2] == 0xa8 || p[2] == 0xa9 || p[2] == 0xaf) ? 3 : 0;
+    if (p[0] == 0xe2 && p[1] == 0x81) return (p[2] == 0x9f) ? 3 : 0;
+    if (p[0] == 0xe3 && p[1] == 0x80) return (p[2] == 0x80) ? 3 : 0;
     return 0;
 }
 
+/* Whether utf8_lower lowercases the code point cp as Python's str.lower() does: ASCII, Latin-1, Latin
+   Extended-A but U+0130, IPA and combining marks, unaccented Greek and basic Cyrillic, and blocks of scripts
+   without case (Hebrew to Myanmar, Hangul, Ethiopic, CJK, punctuation and symbols). U+03A3 is left out as
+   Python lowercases it depending on its position in the word. */
+static int lower_known(int cp) {
+    return cp < 0x130 || (cp > 0x130 && cp <= 0x17f) || (cp >= 0x250 && cp <= 0x36f)
+        || (cp >= 0x391 && cp <= 0x3ce && cp != 0x3a2 && cp != 0x3a3 && (cp <= 0x3a9 || cp >= 0x3ac))
+        || (cp >= 0x400 && cp <= 0x45f) || (cp >= 0x590 && cp <= 0x109f) || (cp >= 0x1100 && cp <= 0x139f)
+        || (cp >= 0x2000 && cp <= 0x20ff) || (cp >= 0x3000 && cp <= 0x9fff) || (cp >= 0xac00 && cp <= 0xd7ff)
+        || (cp >= 0xf900 && cp <= 0xfaff) || (cp >= 0xfb00 && cp <= 0xfb4f) || (cp >= 0x1f000 && cp <= 0x3ffff);
+}
+
+/* lowercase a UTF-8 string of k bytes into out (which must hold k + 1 bytes), keeping its byte length.
+   Returns 0 if it is lowercased as Python's str.lower() would do it, 1 if it holds a code point that only
+   Python lowercases (see lower_known), which the caller has to leave to Python. */
+static int utf8_lower(const unsigned char *word, int k, unsigned char *out) {
+    int i = 0, unknown = 0;
+    while (i < k) {
+        unsigned char c = word[i];
+        if (c < 0x80) {
+            out[i] = (c >= 'A' && c <= 'Z') ? c + 32 : c;
+            i++;
+        } else if ((c & 0xe0) == 0xc0 && i + 1 < k) {
+            int cp = ((c & 0x1f) << 6) | (word[i + 1] & 0x3f);
+            if ((word[i + 1] & 0xc0) == 0x80 && !lower_known(cp)) unknown = 1;
+            if ((cp >= 0xc0 && cp <= 0xde && cp != 0xd7) || (cp >= 0x391 && cp <= 0x3a9 && cp != 0x3a2)
+                || (cp >= 0x410 && cp <= 0x42f)) cp += 0x20;
+            else if (cp >= 0x400 && cp <= 0x40f) cp += 0x50;
+            else if (cp == 0x178) cp = 0xff;
+            else if ((cp >= 0x100 && cp <= 0x12f) || (cp >= 0x132 && cp <= 0x137) || (cp >= 0x14a && cp <= 0x177)) cp |= 1;
+            else if ((cp >= 0x139 && cp <= 0x148) || (cp >= 0x179 && cp <= 0x17e)) cp += cp & 1;
+            out[i] = 0xc0 | (cp >> 6);
+            out[i + 1] = 0x80 | (cp & 0x3f);
+            i += 2;
+        } else if ((c & 0xf0) == 0xe0 && i + 2 < k && (word[i + 1] & 0xc0) == 0x80 && (word[i + 2] & 0xc0) == 0x80) {
+            if (!lower_known(((c & 0x0f) << 12) | ((word[i + 1] & 0x3f) << 6) | (word[i + 2] & 0x3f))) unknown = 1;
+            memcpy(out + i, word + i, 3);
+            i += 3;
+        } else if ((c & 0xf8) == 0xf0 && i + 3 < k && (word[i + 1] & 0xc0) == 0x80 && (word[i + 2] & 0xc0) == 0x80
+                   && (word[i + 3] & 0xc0) == 0x80) {
+            if (!lower_known(((c & 0x07) << 18) | ((word[i + 1] & 0x3f) << 12) | ((word[i + 2] & 0x3f) << 6)
+                             | (word[i + 3] & 0x3f))) unknown = 1;
+            memcpy(out + i, word + i, 4);
+            i += 4;
+        } else {
+            out[i] = c;
+            i++;
+        }
+    }
+    out[k] = '\0';
+    return unknown;
+}
+
+/* Hyphenate a (lowercased) word of k bytes and write the length of every chunk, in code points, to out, and
+   the priority of the break after it to priorities, if not NULL (see hyphen_chunks). Returns the number of
+   chunks, -1 if they do not fit in cap values, -2 on failure. cache (or NULL) is shared by the words of a
+   batch */
+static int word_chunks(HyphenDict *dict, const char *word, int k, int *out, unsigned char *priorities, int cap,
+                       HyphenCache *cache) {
+    int i, n = 0;
+    char hyphens_small[256];
+    char *hyphens = hyphens_small;
+    char ** rep = NULL;
+    int * pos = NULL;
+    int * cut = NULL;
+
+    if (k + 5 > (int) sizeof(hyphens_small)) {
+        hyphens = (char *) malloc(k + 5);
+        if (!hyphens) return -2;
+    }
+
+    if (hnj_hyphen_hyphenate4(dict, word, k, hyphens, NULL, &rep, &pos, &cut, 4, 3, 2, 2, cache)) {
+        if (hyphens != hyphens_small) free(hyphens);
+        return -2;
+    }
+
+    if (rep) {
+        /* non-standard hyphenation can not be expressed in chunks of the original word */
+        if (cap < 1) n = -1;
+        else {
+            if (priorities) priorities[n] = 0;
+            out[n++] = (int) count_utf8_code_points(word);
+        }
+    } else {
+        n = hyphen_chunks(word, k, hyphens, out, priorities, cap);
+    }
+
+    if (rep) {
+        for (i = 0; i < k - 1; i++) {
+          if (rep[i]) free(rep[i]);
+        }
+        free(rep);
+    }
+    if (pos) free(pos);
+    if (cut) free(cut);
+    if (hyphens != hyphens_small) free(hyphens);
+
+    return n;
+}
+
+/* Hyphenate a single word of k bytes, lowercased here, and write the positions (in code points from the start
+   of the word) of its breaks of at least min_priority to breaks. Returns the number of breaks, -1 if they do
+   not fit in cap values, -2 on failure, -3 if the word holds a letter that only Python lowercases (see
+   utf8_lower). Short words are handled without any allocation besides the one of
+   libhyphen. */
+DLL_EXPORT int word_breaks(HyphenDict *dict, const char *word, int k, int *breaks, int cap, int min_priority) {
+    unsigned char lower_small[256];
+    int chunks_small[256];
+    unsigned char priorities_small[256];
+    unsigned char *lower = lower_small;
+    int *chunks = chunks_small;
+    unsigned char *priorities = priorities_small;
+    int i, z, n = 0, c = 0;
+
+    if (k <= 0) return 0;
+    if (k >= 256) {
+        lower = (unsigned char *) malloc(k + 1);
+        chunks = (int *) malloc(k * sizeof(int));
+        priorities = (unsigned char *) malloc(k);
+        if (!lower || !chunks || !priorities) {
+            free(lower);
+            free(chunks);
+            free(priorities);
+            return -2;
+        }
+    }
+
+    if (utf8_lower((const unsigned char *) word, k, lower)) {
+        z = 0;
+        n = -3;
+    } else {
+        /* a word of k bytes has at most k chunks */
+        z = word_chunks(dict, (char *) lower, k, chunks, priorities, k, NULL);
+        if (z < 0) n = -2;
+    }
+    for (i = 0; i + 1 < z; i++) {
+        c += chunks[i];
+        if (priorities[i] < min_priority) continue;
+        if (n >= cap) {
+            n = -1;
+            break;
+        }
+        breaks[n++] = c;
+    }
+
+    if (lower != lower_small) {
+        free(lower);
+        free(chunks);
+        free(priorities);
+    }
+    return n;
+}
+
+/* Return the last break position of a word of k bytes at or before column (in code points) among its breaks
+   of at least min_priority, 0 if there is none, or a negative number as word_breaks does. */
+DLL_EXPORT int best_break(HyphenDict *dict, const char *word, int k, int column, int min_priority) {
+    int breaks_small[256];
+    int *breaks = breaks_small;
+    int i, n, best = 0;
+
+    if (k >= 256) {
+        breaks = (int *) malloc(k * sizeof(int));
+        if (!breaks) return -2;
+    }
+
+    n = word_breaks(dict, word, k, breaks, k > 256 ? k : 256, min_priority);
+    if (n < 0) best = n;
+    for (i = 0; i < n && breaks[i] <= column; i++) best = breaks[i];
+
+    if (breaks != breaks_small) free(breaks);
+    return best;
+}
+
+/* Hyphenate rows of an Arrow-style string column: row r is data[offsets[r]:offsets[r + 1]], with
+   offsets of offset_width (4 or 8) bytes into data of size bytes. Whitespace runs are written as their
+   negated length and words as their chunk lengths (both in code points) to
+   values[out_offsets[r]:out_offsets[r + 1]]. out_offsets[start] must be set by the caller. Returns the
+   first row that did not fit in capacity values (n when all rows are done), so the caller can grow values
+   and resume from there, -3 if the offsets of a row are decreasing or out of the data, or another negative
+   number on failure. *casing is set to 1 if instead the returned row holds a word that only Python
+   lowercases (see utf8_lower), for the caller to hyphenate before resuming after it. */
+DLL_EXPORT int hyphenate_column(HyphenDict *dict, const char *data, long long size, const void *offsets,
+                                int offset_width, int n, int start, int *out_offsets, int *values, int capacity,
+                                int *casing) {
+    int r, z, len;
+    int scratch_size = 256;
+    unsigned char *scratch = (unsigned char *) malloc(scratch_size);
+    HyphenCache *cache = hnj_cache_new();
+    if (!scratch || !cache) {
+        free(scratch);
+        hnj_cache_free(cache);
+        return -2;
+    }
+
+    *casing = 0;
+    for (r = start; r < n; r++) {
+        long long begin, end;
+        if (offset_width == 8) {
+            begin = ((const long long *) offsets)[r];
+            end = ((const long long *) offsets)[r + 1];
+        } else {
+            begin = ((const int *) offsets)[r];
+            end = ((const int *) offsets)[r + 1];
+        }
+        if (begin < 0 || end < begin || end > size) {
+            free(scratch);
+            hnj_cache_free(cache);
+            return -3;
+        }
+        const unsigned char *p = (const unsigned char *) data + begin;
+        const unsigned char *stop = (const unsigned char *) data + end;
+        int v = out_offsets[r];
+        int full = 0;
+
+        while (p < stop && !full) {
+            if ((len = utf8_space(p, stop))) {
+                int ws = 0;
+                do {
+                    p += len;
+                    ws++;
+                } while (p < stop && (len = utf8_space(p, stop)));
+                if (v >= capacity) full = 1;
+                else values[v++] = -ws;
+            } else {
+                const unsigned char *w = p;
+                while (p < stop && !utf8_space(p, stop)) p++;
+                len = (int) (p - w);
+                if (len + 1 > scratch_size) {
+                    free(scratch);
+                    scratch_size = len + 1;
+                    scratch = (unsigned char *) malloc(scratch_size);
+                    if (!scratch) {
+                        hnj_cache_free(cache);
+                        return -2;
+                    }
+                }
+                if (utf8_lower(w, len, scratch)) {
+                    *casing = full = 1;
+                    break;
+                }
+                z = word_chunks(dict, (char *) scratch, len, values + v, NULL, capacity - v, cache);
+                if (z == -1) full = 1;
+                else if (z < 0) {
+                    free(scratch);
+                    hnj_cache_free(cache);
+                    return z;
+                }
+                else v += z;
+            }
+        }
+        if (full) break;
+        out_offsets[r + 1] = v;
+    }
+
+    free(scratch);
+    hnj_cache_free(cache);
+    return r;
+}
+
+/* Hyphenate n zero-terminated, lowercased tokens stored one after the other in words, and write the chunk
+   lengths of token t to values[out_offsets[t]:out_offsets[t + 1]]. Starts at token start, which begins at
+   byte *position of words; out_offsets[start] must be set by the caller. If priorities is not NULL, the
+   priority of the break after every chunk (1 to 9, 0 at the end of a token) is written to it at the same
+   index as the chunk length. Returns the first token that did not fit in capacity values (n when all are
+   done), with *position updated to its first byte, or a negative number on failure. */
+DLL_EXPORT int hyphenate_tokens(HyphenDict *dict, const char *words, int n, int start, int *position,
+                                int *out_offsets, int *values, unsigned char *priorities, int capacity) {
+    int t, k, z;
+    const char *word = words + *position;
+    HyphenCache *cache = hnj_cache_new();
+    if (!cache) return -2;
+
+    for (t = start; t < n; t++) {
+        int v = out_offsets[t];
+        k = strlen(word);
+        if (k > 0) {
+            z = word_chunks(dict, word, k, values + v, priorities ? priorities + v : NULL, capacity - v, cache);
+            if (z == -1) break;
+            if (z < 0) {
+                hnj_cache_free(cache);
+                return z;
+            }
+            v += z;
+        }
+        out_offsets[t + 1] = v;
+        word += k + 1;
+    }
+
+    hnj_cache_free(cache);
+    *position = (int) (word - words);
+    return t;
+}
+
+/* Copy the UTF-8 text of k bytes to out with sep (of seplen bytes) inserted at every hyphenation point.
+   Whitespace and case are preserved; words are lowercased only for the lookup. Stops at a word boundary
+   when the next word does not fit in kk bytes, and stores the number of input bytes done in *consumed.
+   Also stops before a word that holds a letter only Python lowercases (see utf8_lower), for the caller to
+   hyphenate, with its byte length in *casing (0 otherwise). Returns the number of bytes written (without a
+   terminating zero byte) or a negative number on failure. */
+DLL_EXPORT int hyphenate_insert(HyphenDict *dict, const char *text, int k, const char *sep, int seplen,
+                                char *out, int kk, int *consumed, int *casing) {
+    const unsigned char *p = (const unsigned char *) text;
+    const unsigned char *stop = p + k;
+    int len, z, i, o = 0;
+    int scratch_size = 256;
+    unsigned char *scratch = (unsigned char *) malloc(scratch_size);
+    int *chunks = (int *) malloc(scratch_size * sizeof(int));
+    HyphenCache *cache = hnj_cache_new();
+    if (!scratch || !chunks || !cache) {
+        free(scratch);
+        free(chunks);
+        hnj_cache_free(cache);
+        return -2;
+    }
+
+    *consumed = 0;
+    *casing = 0;
+    while (p < stop) {
+        if ((len = utf8_space(p, stop))) {
+            if (o + len > kk) break;
+            memcpy(out + o, p, len);
+            o += len;
+            p += len;
+        } else {
+            const unsigned char *w = p;
+            const unsigned char *end = p;
+            while (end < stop && !utf8_space(end, stop)) end++;
+            len = (int) (end - w);
+            if (len + 1 > scratch_size) {
+                free(scratch);
+                free(chunks);
+                scratch_size = len + 1;
+                scratch = (unsigned char *) malloc(scratch_size);
+                chunks = (int *) malloc(scratch_size * sizeof(int));
+                if (!scratch || !chunks) {
+                    free(scratch);
+                    free(chunks);
+                    hnj_cache_free(cache);
+                    return -2;
+                }
+            }
+            if (utf8_lower(w, len, scratch)) {
+                *casing = len;
+                break;
+            }
+            z = word_chunks(dict, (char *) scratch, len, chunks, NULL, scratch_size, cache);
+            if (z < 0) {
+                free(scratch);
+                free(chunks);
+                hnj_cache_free(cache);
+                return z;
+            }
+            if (o + len + (z - 1) * seplen > kk) break;
+
+            /* copy the chunks, counting code points to find their byte boundaries */
+            for (i = 0; i < z; i++) {
+                int c = chunks[i];
+                if (i > 0) {
+                    memcpy(out + o, sep, seplen);
+                    o += seplen;
+                }
+                while (p < end && c > 0) {
+                    out[o++] = *p++;
+                    while (p < end && (*p & 0xc0) == 0x80) out[o++] = *p++;
+                    c--;
+                }
+            }
+            /* copy anything left over, e.g. when lowercasing changed the number of code points */
+            while (p < end) out[o++] = *p++;
+        }
+        *consumed = (int) (p - (const unsigned char *) text);
+    }
+
+    free(scratch);
+    free(chunks);
+    hnj_cache_free(cache);
+    return o;
+}
+
 /* CLI program for when compiled as executable */
 int main(int argc, char** argv)
 {
@@ -1,8 +1,26 @@
+#ifndef __HYPHENATE_H__
+#define __HYPHENATE_H__
+
+#include "hyphen.h"
+
 #ifdef _MSC_VER
 #define DLL_EXPORT  __declspec( dllexport )
 #else
 #define DLL_EXPORT
 #endif
 
-DLL_EXPORT int parse_word(HyphenDict *dict, char *word, int k, int optn, int opts, int optnn, int optdd)
-DLL_EXPORT int parse_words(HyphenDict *dict, char *words, char *out, int n, int kk, int optn, int opts, int optnn, int optdd)
\ No newline at end of file
+DLL_EXPORT int parse_word(HyphenDict *dict, char *word, char *out, int k, int kk, int optn, int opts, int optnn, int optdd);
+DLL_EXPORT int parse_words(HyphenDict *dict, char *words, char *out, int n, int kk, int optn, int opts, int optnn, int optdd);
+DLL_EXPORT int parse_words_from(HyphenDict *dict, char *words, int n, int start, int *position,
+                                char *out, int kk, int *written, int optn, int opts, int optnn, int optdd);
+DLL_EXPORT int hyphenate_column(HyphenDict *dict, const char *data, long long size, const void *offsets,
+                                int offset_width, int n, int start, int *out_offsets, int *values, int capacity,
+                                int *casing);
+DLL_EXPORT int hyphenate_tokens(HyphenDict *dict, const char *words, int n, int start, int *position,
+                                int *out_offsets, int *values, unsigned char *priorities, int capacity);
+DLL_EXPORT int hyphenate_insert(HyphenDict *dict, const char *text, int k, const char *sep, int seplen,
+                                char *out, int kk, int *consumed, int *casing);
+DLL_EXPORT int word_breaks(HyphenDict *dict, const char *word, int k, int *breaks, int cap, int min_priority);
+DLL_EXPORT int best_break(HyphenDict *dict, const char *word, int k, int column, int min_priority);
+
+#endif /* __HYPHENATE_H__ */
@@ -57,6 +57,14 @@ class build_ext(build_ext_orig):
 class CTypes(Extension):
     pass
 
+
+# The cffi backend is optional, hyperhyphen falls back to ctypes when it is not built or cffi is missing
+try:
+    import cffi  # noqa: F401
+    cffi_options = {"cffi_modules": ["hyperhyphen/_cffi_build.py:ffibuilder"]}
+except ImportError:
+    cffi_options = {}
+
 setup(
     ext_modules=[
         CTypes(
@@ -65,6 +73,16 @@ setup(
             define_macros=[("Py_LIMITED_API", "0x03090000")],
             py_limited_api=True,
         ),
+        # Unmodified upstream libhyphen, the reference engine that the native library is verified against
+        CTypes(
+            "hyperhyphen.hyphenref",
+            sources=["./lib/hnjalloc.c", "./lib/reference/hyphen.c"],
+            include_dirs=["./lib"],
+            export_symbols=["hnj_hyphen_load", "hnj_hyphen_free", "hnj_hyphen_hyphenate3", "hnj_free"],
+            define_macros=[("Py_LIMITED_API", "0x03090000")],
+            py_limited_api=True,
+        ),
     ],
-    cmdclass={"build_ext": build_ext, "bdist_wheel": bdist_wheel_abi3}
+    cmdclass={"build_ext": build_ext, "bdist_wheel": bdist_wheel_abi3},
+    **cffi_options,
 )
\ No newline at end of file
@@ -0,0 +1,49 @@
+import json
+import os
+import pathlib
+import subprocess
+import sys
+
+import pytest
+
+from hyperhyphen._lib import BACKEND
+
+DIR = pathlib.Path(__file__).parent.resolve(strict=False)
+
+SCRIPT = """
+import json, sys
+from hyperhyphen import Hyphenator
+from hyperhyphen._lib import BACKEND
+text = "Reconciliation microprocessing\\t\\tmiracle      messaging character 𱍊character 𱍊character𱍊"
+results = {"backend": BACKEND}
+for mode in ("raw", "int", "insert"):
+    results[mode] = Hyphenator(mode=mode, dictionary=sys.argv[1])(text)
+breaks, offsets = Hyphenator(dictionary=sys.argv[1]).hyphenate_tokens(text.split())
+results["tokens"] = [breaks.tolist(), offsets.tolist()]
+print(json.dumps(results))
+"""
+
+
+def run_with_backend(backend):
+    pythonpath = os.pathsep.join(filter(None, [str(DIR.parent), os.environ.get("PYTHONPATH")]))
+    result = subprocess.run(
+        [sys.executable, "-c", SCRIPT, str(DIR / "hyph_en_US.dic")],
+        env={**os.environ, "HYPERHYPHEN_BACKEND": backend, "PYTHONPATH": pythonpath},
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout)
+
+
+def test_default_backend():
+    assert BACKEND in ("ctypes", "cffi")
+
+
+def test_cffi_backend_matches_ctypes():
+    pytest.importorskip("hyperhyphen._hyphen_cffi")
+
+    cffi_results = run_with_backend("cffi")
+    ctypes_results = run_with_backend("ctypes")
+
+    assert cffi_results.pop("backend") == "cffi"
+    assert ctypes_results.pop("backend") == "ctypes"
+    assert cffi_results == ctypes_results
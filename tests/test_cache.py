@@ -0,0 +1,150 @@
+import multiprocessing
+import os
+import pathlib
+import pickle
+import sqlite3
+import time
+
+import pytest
+
+from hyperhyphen import Hyphenator, ResultCache
+from hyperhyphen.cache import dictionary_hash
+from hyperhyphen.dictionaries import DictionaryManager
+
+DIR = pathlib.Path(__file__).parent.resolve(strict=False)
+
+LANGUAGE = 'en_US'
+
+TEXT = "reconciliation microprocessing\t\tmiracle      messaging character 𱍊character"
+
+
+def test_hyphenator_with_cache(tmp_path):
+    manager = DictionaryManager(directory=DIR)
+    path = tmp_path / "results.db"
+
+    for mode in ("raw", "str", "int", "spans", "lazy", "insert"):
+        plain = Hyphenator(manager, language=LANGUAGE, mode=mode)
+        # A second hyphenator stands for a later run, it finds the results of the first one
+        for _ in range(2):
+            cached = Hyphenator(manager, language=LANGUAGE, mode=mode, cache=str(path))
+            assert cached(TEXT) == plain(TEXT)
+            assert cached(TEXT) == plain(TEXT)
+            cached.cache.close()
+    cached = Hyphenator(manager, language=LANGUAGE, mode="insert", cache=str(path))
+    assert cached(TEXT.encode()) == Hyphenator(manager, language=LANGUAGE, mode="insert")(TEXT.encode())
+    cached.cache.close()
+
+    with ResultCache(path) as cache:
+        stats = cache.stats()
+        # raw, int (shared by str, spans and lazy) and insert
+        assert stats['entries'] == 3
+        assert stats['total_misses'] == 3
+        assert stats['total_hits'] == 6 * 4 - 3 + 1
+        assert 0 < stats['size'] <= stats['file_size']
+
+
+def test_cache_keys(tmp_path):
+    cache = ResultCache(tmp_path / "results.db")
+    h = Hyphenator(language=LANGUAGE, mode="int", dictionary=str(DIR / "hyph_en_US.dic"), cache=cache)
+    assert h.dictionary_hash == dictionary_hash(DIR / "hyph_en_US.dic")
+
+    h(TEXT)
+    h(TEXT + " mirrored")
+    h(TEXT)
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert cache.stats()['hit_rate'] == 1 / 3
+
+    # A different dictionary misses
+    patterns = (DIR / "hyph_en_US.dic").read_text(encoding="utf-8")
+    other = tmp_path / "hyph_other.dic"
+    other.write_text(patterns + "\nzz1z\n", encoding="utf-8")
+    Hyphenator(language=LANGUAGE, mode="int", dictionary=str(other), cache=cache)(TEXT)
+    assert cache.misses == 3
+
+    cache.clear()
+    assert cache.stats()['entries'] == cache.stats()['size'] == 0
+    cache.close()
+
+
+def test_cache_keys_of_loaded_dictionary(tmp_path):
+    path = tmp_path / "hyph_swapped.dic"
+    original = (DIR / "hyph_en_US.dic").read_bytes()
+    path.write_bytes(original)
+    cache = ResultCache(tmp_path / "results.db")
+    h = Hyphenator(mode="int", dictionary=str(path), cache=cache)
+    expected = h(TEXT)
+
+    # Replaced after the load: the results of the loaded dictionary are kept under the hash of its content
+    changed = tmp_path / "hyph_changed.dic"
+    changed.write_bytes(original.replace(b"LEFTHYPHENMIN 2", b"LEFTHYPHENMIN 6"))
+    os.replace(changed, path)
+    fresh = Hyphenator(mode="int", dictionary=str(path), cache=cache)
+    assert fresh.dictionary_hash == h.dictionary_hash == dictionary_hash(DIR / "hyph_en_US.dic")
+    assert fresh(TEXT) == expected and cache.hits == 1
+
+    h.reload()
+    assert h.dictionary_hash == dictionary_hash(path)
+    assert h(TEXT) != expected and cache.misses == 2
+    cache.close()
+
+
+def test_cache_setup_errors(tmp_path):
+    path = tmp_path / "results.db"
+    with sqlite3.connect(path) as db:
+        db.execute("CREATE TABLE counters (name TEXT)")
+    db.close()
+
+    # An error that waiting does not clear is raised at once, not retried until the timeout
+    start = time.monotonic()
+    with pytest.raises(sqlite3.OperationalError):
+        ResultCache(path, timeout=10)
+    assert time.monotonic() - start < 5
+
+
+def test_cache_eviction(tmp_path):
+    cache = ResultCache(tmp_path / "results.db", max_bytes=1000)
+    key = b"0" * 16
+    for i in range(50):
+        cache.put(key, "raw", f"text {i}", bytes(100))
+        # Recently looked up results are kept
+        assert cache.get(key, "raw", "text 0") is not None
+        cache.flush()
+
+    stats = cache.stats()
+    assert 900 <= stats['size'] <= 1000
+    assert stats['entries'] == stats['size'] // 100
+    assert cache.get(key, "raw", "text 49") is not None
+    assert cache.get(key, "raw", "text 1") is None
+    assert cache.get(key, "raw", "text 0") is not None
+    cache.close()
+
+
+def _fill_cache(args):
+    path, worker = args
+    h = Hyphenator(language=LANGUAGE, mode="int", dictionary=str(DIR / "hyph_en_US.dic"), cache=path)
+    for i in range(20):
+        # Half the texts are shared by all the workers
+        h(f"{TEXT} shared {i % 10}" if i % 2 else f"{TEXT} worker {worker}")
+    h.cache.close()
+    return h.cache.hits + h.cache.misses
+
+
+def test_cache_concurrent_writers(tmp_path):
+    path = str(tmp_path / "results.db")
+    with multiprocessing.get_context("spawn").Pool(4) as pool:
+        assert pool.map(_fill_cache, [(path, worker) for worker in range(4)]) == [20] * 4
+
+    with ResultCache(path) as cache:
+        stats = cache.stats()
+        assert stats['total_hits'] + stats['total_misses'] == 80
+        # Workers that miss the same text at once both store it, which is harmless
+        assert stats['entries'] == 5 + 4 <= stats['total_misses']
+
+
+def test_cache_pickle(tmp_path):
+    h = Hyphenator(language=LANGUAGE, mode="spans", cache=str(tmp_path / "results.db"))
+    expected = h(TEXT)
+    clone = pickle.loads(pickle.dumps(h))
+    assert clone(TEXT) == expected
+    assert clone.cache.path == h.cache.path
+    assert clone.cache.hits == 1
@@ -0,0 +1,45 @@
+import pathlib
+import struct
+
+from hyperhyphen import Hyphenator
+from hyperhyphen.cli import main
+
+DIR = pathlib.Path(__file__).parent.resolve(strict=False)
+
+DICTIONARY = str(DIR / "hyph_en_US.dic")
+
+LINES = ["reconciliation microprocessing\t\tmiracle", "", "messaging character 𱍊character 𱍊character𱍊"]
+
+
+def run(tmp_path, *args):
+    src = tmp_path / "input.txt"
+    dst = tmp_path / "output"
+    src.write_text('\n'.join(LINES) + '\n', encoding='utf-8')
+    main(["hyphenate", "-q", "-d", DICTIONARY, "-o", str(dst), *args, str(src)])
+    return dst.read_bytes()
+
+
+def test_cli_int(tmp_path):
+    h = Hyphenator(mode="int", dictionary=DICTIONARY)
+    expected = [' '.join(map(str, h(line))) if line else '' for line in LINES]
+    assert run(tmp_path, "-m", "int").decode('utf-8').split('\n')[:-1] == expected
+
+
+def test_cli_str(tmp_path):
+    h = Hyphenator(mode="str", dictionary=DICTIONARY)
+    output = run(tmp_path, "-m", "str", "-s", "\u00ad", "--block-size", "20", "--jobs", "2").decode('utf-8')
+    assert output.replace("\u00ad", "") == '\n'.join(LINES) + '\n'
+    assert output.split('\n')[0] == "\u00ad".join(h(LINES[0])).replace("\u00ad\t\t\u00ad", "\t\t").replace("\u00ad \u00ad", " ")
+
+
+def test_cli_binary(tmp_path):
+    h = Hyphenator(mode="int", dictionary=DICTIONARY)
+    data = run(tmp_path, "-m", "binary")
+
+    offset, records = 0, []
+    while offset < len(data):
+        count, = struct.unpack_from('<I', data, offset)
+        records.append(list(struct.unpack_from(f'<{count}i', data, offset + 4)))
+        offset += 4 + 4 * count
+
+    assert records == [h(line) if line else [] for line in LINES]
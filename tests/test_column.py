@@ -0,0 +1,104 @@
+import pathlib
+from array import array
+from itertools import accumulate
+
+import pytest
+
+from hyperhyphen import Hyphenator
+
+DIR = pathlib.Path(__file__).parent.resolve(strict=False)
+
+DICTIONARY = str(DIR / "hyph_en_US.dic")
+
+ROWS = [
+    "reconciliation microprocessing\t\tmiracle",
+    "",
+    "Messaging CHARACTER 𱍊character 𱍊character𱍊",
+    "élan",
+]
+
+
+def column(rows, typecode):
+    encoded = [row.encode('utf-8') for row in rows]
+    return array(typecode, [0, *accumulate(map(len, encoded))]), b''.join(encoded)
+
+
+@pytest.mark.parametrize("typecode", ["i", "q"])
+def test_column_matches_int_mode(typecode):
+    h = Hyphenator(mode="int", dictionary=DICTIONARY)
+    offsets, values = h.hyphenate_column(*column(ROWS, typecode))
+
+    assert len(offsets) == len(ROWS) + 1
+    for i, row in enumerate(ROWS):
+        assert values[offsets[i]:offsets[i + 1]].tolist() == (h(row) if row else [])
+
+
+def test_column_resumes_on_large_input():
+    h = Hyphenator(mode="int", dictionary=DICTIONARY)
+    rows = [" reconciliation microprocessing "] * 2000
+    offsets, data = column(rows, "q")
+    out_offsets, values = h.hyphenate_column(memoryview(offsets), bytearray(data))
+
+    assert values[:out_offsets[1]].tolist() == [-1, *h(rows[0].strip()), -1]
+    assert len(values) == out_offsets[-1] == 2000 * out_offsets[1]
+
+
+# Uppercase letters that the native library leaves to Python to lowercase: Latin Extended-B, Armenian,
+# Georgian, a final sigma and a dotted capital I, which lowercases to two code points
+CASED = ["ȘCOALĂȘCOALĂ", "ՀԱՅԱՍՏԱՆԱԱԱ", "ႠႡႢႠႡႢႡ", "ΟΔΟΣΟΔΟΣΟΔΟΣ", "İSTANBULİSTANBUL", "Școală şcoală"]
+
+
+@pytest.fixture
+def cased_dictionary(tmp_path):
+    path = tmp_path / "hyph_cased.dic"
+    path.write_text("UTF-8\nLEFTHYPHENMIN 1\nRIGHTHYPHENMIN 1\n1ș1\n1ա1\n1ⴁ1\n1ς1\n1σ1\n1i̇1\n", encoding="utf-8")
+    return str(path)
+
+
+def test_column_lowercases_like_int_mode(cased_dictionary):
+    rows = [*CASED, " ".join(CASED), "reconciliation"] * 3
+    h = Hyphenator(mode="int", dictionary=cased_dictionary)
+    offsets, values = h.hyphenate_column(*column(rows, "i"))
+    for i, row in enumerate(rows):
+        assert values[offsets[i]:offsets[i + 1]].tolist() == h(row)
+    assert values[offsets[0]:offsets[1]].tolist() == [6, 1, 5]
+    assert values[offsets[3]:offsets[4]].tolist() == [4, 3, 1, 4]
+    assert Hyphenator(mode="str", dictionary=cased_dictionary)("ΟΔΟΣΟΔΟΣΟΔΟΣ") == ["ΟΔΟΣ", "ΟΔΟ", "Σ", "ΟΔΟΣ"]
+    python = Hyphenator(mode="int", dictionary=cased_dictionary, engine="python")
+    assert python.hyphenate_column(*column(rows, "i")) == (offsets, values)
+
+
+@pytest.mark.parametrize("engine", ["native", "python"])
+@pytest.mark.parametrize("bad", [[0, 5, 3], [-1, 4], [0, 100], [0, 1 << 40]])
+def test_column_rejects_malformed_offsets(engine, bad):
+    h = Hyphenator(mode="int", dictionary=DICTIONARY, engine=engine)
+    with pytest.raises(ValueError):
+        h.hyphenate_column(array("q", bad), b"reconciliation")
+
+
+def test_column_read_only_buffers_are_not_copied():
+    import tracemalloc
+
+    h = Hyphenator(mode="int", dictionary=DICTIONARY)
+    # Read-only buffers like those of Arrow arrays, with a large part before the rows
+    data = memoryview(b"x" * (32 << 20) + b" reconciliation microprocessing")[1:]
+    offsets = memoryview(array('q', [len(data) - 30, len(data)])).toreadonly()
+
+    tracemalloc.start()
+    try:
+        out_offsets, values = h.hyphenate_column(offsets, data)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert values.tolist() == h("reconciliation microprocessing")
+    assert peak < 1 << 20
+
+
+def test_column_arrow():
+    pa = pytest.importorskip("pyarrow")
+    from hyperhyphen.columnar import hyphenate_arrow
+
+    h = Hyphenator(mode="int", dictionary=DICTIONARY)
+    strings = pa.array(["x" * (32 << 20), *ROWS, None], type=pa.large_string()).slice(1)
+    result = hyphenate_arrow(h, strings)
+    assert result.to_pylist() == [h(row) if row else [] for row in ROWS] + [None]
@@ -0,0 +1,93 @@
+import os
+import pathlib
+from array import array
+
+import pytest
+
+from hyperhyphen import Hyphenator
+from hyperhyphen.cli import main
+from hyperhyphen.corpus import iter_results, read_index, read_shard, run_corpus
+
+DIR = pathlib.Path(__file__).parent.resolve(strict=False)
+
+DICTIONARY = str(DIR / "hyph_en_US.dic")
+
+LINES = ["reconciliation microprocessing\t\tmiracle", "", "  messaging character 𱍊character 𱍊character𱍊 "]
+
+
+def make_corpus(tmp_path, n=30):
+    corpus = tmp_path / "corpus"
+    (corpus / "sub").mkdir(parents=True)
+    files = []
+    for i in range(n):
+        path = corpus / ("sub" if i % 3 else ".") / f"doc{i:02d}.txt"
+        path.write_text("\n".join(LINES[:i % 4]) * (i % 5), encoding="utf-8")
+        files.append(str(path))
+    return corpus, files
+
+
+def expected(path):
+    data = pathlib.Path(path).read_bytes()
+    offsets, values = Hyphenator(dictionary=DICTIONARY).hyphenate_column(array('i', [0, len(data)]), data)
+    return values
+
+
+def test_run_corpus(tmp_path):
+    corpus, files = make_corpus(tmp_path)
+    output = tmp_path / "out"
+    reports = []
+    stats = run_corpus(output, files, dictionary=DICTIONARY, jobs=2, shard_bytes=300, progress=reports.append)
+
+    assert stats['files'] == stats['total_files'] == len(files)
+    assert stats['shards'] == stats['total_shards'] == len(reports) > 2
+    assert stats['bytes'] == sum(os.path.getsize(path) for path in files)
+    assert reports[-1]['files'] == len(files) and reports[-1]['files_per_second'] > 0
+
+    assert [entry[3] for entry in read_index(output)] == files
+    for path, values in iter_results(output):
+        assert values == expected(path)
+    offsets, values = read_shard(output / "shard-00000.bin")
+    assert offsets[0] == 0 and len(values) == offsets[-1]
+
+
+def test_run_corpus_resume(tmp_path):
+    corpus, files = make_corpus(tmp_path)
+    output = tmp_path / "out"
+
+    def interrupt(stats):
+        if stats['shards'] == 3:
+            raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        run_corpus(output, files, dictionary=DICTIONARY, shard_bytes=300, progress=interrupt)
+    assert (output / "checkpoint").read_text().split() == ["0", "1", "2"]
+
+    # A shard file lost since is done again
+    os.remove(output / "shard-00001.bin")
+    stats = run_corpus(output, files, dictionary=DICTIONARY, shard_bytes=300)
+    assert stats['skipped'] == 2 and stats['shards'] == stats['total_shards'] - 2
+    assert [values for _, values in iter_results(output)] == [expected(path) for path in files]
+
+    # A completed run has nothing left to do, and a run of other settings or files is refused
+    assert run_corpus(output, dictionary=DICTIONARY, shard_bytes=300)['shards'] == 0
+    with pytest.raises(ValueError):
+        run_corpus(output, files, dictionary=DICTIONARY, shard_bytes=1000)
+    with pytest.raises(ValueError):
+        run_corpus(output, files[1:], dictionary=DICTIONARY, shard_bytes=300)
+
+
+def test_cli_run(tmp_path, capsys):
+    corpus, files = make_corpus(tmp_path)
+    output = tmp_path / "out"
+    manifest = tmp_path / "manifest.txt"
+    manifest.write_text("\n".join(files[:2]) + "\n", encoding="utf-8")
+
+    main(["run", "-d", DICTIONARY, "-o", str(output), "-m", str(manifest), str(corpus / "sub" / "*.txt")])
+    assert "files/s" in capsys.readouterr().err
+    sub = sorted(path for path in files if "sub" in path)
+    assert [entry[3] for entry in read_index(output)] == sub + files[:2]
+
+    # Running it again without inputs resumes the run, which is complete
+    main(["run", "-d", DICTIONARY, "-o", str(output)])
+    assert "1 of 1 shards" in capsys.readouterr().err
+    assert dict(iter_results(output))[files[0]] == expected(files[0])
@@ -0,0 +1,161 @@
+import pathlib
+import pickle
+import random
+import string
+from array import array
+
+import pytest
+
+from hyperhyphen import Hyphenator
+from hyperhyphen.cli import main
+from hyperhyphen.engines import Engine, available_engines, compare_engines, get_engine
+
+DIR = pathlib.Path(__file__).parent.resolve(strict=False)
+
+DICTIONARY = str(DIR / "hyph_en_US.dic")
+
+TEXT = "Reconciliation microprocessing\t\tmiracle      messaging character 𱍊character 𱍊character𱍊"
+
+PATTERNS = (DIR / "hyph_en_US.dic").read_text(encoding="utf-8").split("\n", 1)[1]
+
+STEMS = ["donau", "dampf", "schiff", "fahrt", "gesellschaft", "kapitän", "haus", "tür", "schlüssel"]
+
+
+def _words(n, seed=0):
+    """Real words of the dictionary and README glued into compounds, and random strings of letters and the
+    characters that the library treats specially (digits, hyphens, apostrophes, ligatures, non-BMP)."""
+    rng = random.Random(seed)
+    vocabulary = [w for w in PATTERNS.translate(str.maketrans("", "", string.digits + ".")).split() if w.isalpha()]
+    vocabulary += STEMS + (DIR.parent / "README.md").read_text(encoding="utf-8").split()
+    alphabet = string.ascii_lowercase * 3 + "0123-'’–éüßΣΑﬀﬁﬃﬄ𱍊"
+    words = []
+    for i in range(n):
+        if i % 3 == 0:
+            words.append("".join(rng.choice(alphabet) for _ in range(rng.randint(1, 25))))
+        else:
+            separator = rng.choice(["", "", "-", "'", "’", "–", "1"])
+            words.append(separator.join(rng.choice(vocabulary) for _ in range(rng.randint(1, 3))))
+    return words
+
+
+@pytest.fixture(scope="module")
+def dictionaries(tmp_path_factory):
+    tmp_path = tmp_path_factory.mktemp("engines")
+    compound = tmp_path / "hyph_compound.dic"
+    compound.write_text("UTF-8\nCOMPOUNDLEFTHYPHENMIN 2\nCOMPOUNDRIGHTHYPHENMIN 2\n"
+                        + "".join(stem + "1\n" for stem in STEMS) + "NEXTLEVEL\n" + PATTERNS, encoding="utf-8")
+    nohyphen = tmp_path / "hyph_nohyphen.dic"
+    nohyphen.write_text("UTF-8\nNOHYPHEN on,n,ati,ssi,-,'\n1-1\n1'1\nNEXTLEVEL\n" + PATTERNS, encoding="utf-8")
+    return [DICTIONARY, str(compound), str(nohyphen)]
+
+
+@pytest.fixture(scope="module")
+def replacement(tmp_path_factory):
+    path = tmp_path_factory.mktemp("engines") / "hyph_replacement.dic"
+    path.write_text("UTF-8\nschif1fahrt/ff=f,5,2\n" + PATTERNS, encoding="utf-8")
+    return str(path)
+
+
+def test_engine_selection():
+    assert available_engines()[0] == "native"
+    assert available_engines() == ["native", "reference", "python"]
+    assert get_engine("auto") is get_engine("native") is get_engine()
+    python = get_engine("python")
+    assert get_engine(python) is python
+    assert pickle.loads(pickle.dumps(python)) is python
+    with pytest.raises(ValueError):
+        get_engine("missing")
+
+
+def test_native_matches_reference(dictionaries, replacement):
+    # The differential harness: breaks and their priorities of every word, with the native batch path, against
+    # the upstream library
+    words = _words(30000) + ["schiffahrt", "dampfschiffahrt", "schiffahrtsgesellschaft"]
+    for dictionary in dictionaries + [replacement]:
+        assert compare_engines(dictionary, words, "native", batch_size=5000) == []
+
+
+def test_reference_engine_non_standard_hyphenation(replacement):
+    reference = get_engine("reference")
+    handle = reference.open(replacement)
+    try:
+        # A word with a replacement is a single chunk, as in the native library
+        values, offsets, levels = reference.hyphenate_tokens(handle, ["Schiffahrt", "", "reconciliation"], True)
+        assert (values.tolist(), offsets.tolist(), levels.tolist()) == (
+            [10, 5, 3, 1, 1, 4], [0, 1, 1, 6], [0, 3, 3, 1, 1, 0])
+    finally:
+        reference.free(handle)
+    assert (Hyphenator(mode="str", dictionary=replacement, engine="reference")("schiffahrt reconciliation")
+            == Hyphenator(mode="str", dictionary=replacement)("schiffahrt reconciliation"))
+
+
+def test_python_engine_matches_native(dictionaries):
+    words = _words(30000)
+    for dictionary in dictionaries:
+        assert compare_engines(dictionary, words, "native", "python", batch_size=5000) == []
+
+
+def test_python_engine_on_system_word_list():
+    path = pathlib.Path("/usr/share/dict/words")
+    if not path.exists():
+        pytest.skip("no system word list")
+    words = path.read_text(encoding="utf-8", errors="ignore").split()
+    assert compare_engines(DICTIONARY, words, "native", "python") == []
+
+
+def test_compare_engines_reports_mismatches():
+    class ShortEngine(Engine):
+        """Breaks every word after its first character."""
+        name = "short"
+
+        def open(self, path):
+            return path
+
+        def free(self, handle):
+            pass
+
+        def hyphenate_tokens(self, handle, tokens, priorities=False):
+            values, offsets, levels = array('i'), array('i', [0]), array('B')
+            for token in tokens:
+                if token:
+                    values.extend([1, len(token) - 1] if len(token) > 1 else [1])
+                    levels.extend([1, 0] if len(token) > 1 else [0])
+                offsets.append(len(values))
+            return (values, offsets, levels) if priorities else (values, offsets)
+
+    assert compare_engines(DICTIONARY, ["a", "ab", "reconciliation"], ShortEngine()) == ["ab", "reconciliation"]
+
+
+@pytest.mark.parametrize("mode", ["raw", "str", "int", "spans", "insert", "weighted"])
+def test_hyphenator_with_python_engine(mode):
+    native = Hyphenator(mode=mode, dictionary=DICTIONARY)
+    python = Hyphenator(mode=mode, dictionary=DICTIONARY, engine="python")
+    assert python.engine.name == "python"
+    assert python(TEXT) == native(TEXT)
+    assert python.breaks("reconciliation", 3) == native.breaks("reconciliation", 3) == (5, 8)
+    assert python.break_before("reconciliation", 7) == native.break_before("reconciliation", 7) == 5
+    assert pickle.loads(pickle.dumps(python))(TEXT) == native(TEXT)
+
+
+def test_python_engine_column():
+    rows = [" " + TEXT, "", "MIRACLE ", "𱍊character"]
+    data = "".join(rows).encode("utf-8")
+    offsets = array('i', [0])
+    for row in rows:
+        offsets.append(offsets[-1] + len(row.encode("utf-8")))
+    native = Hyphenator(dictionary=DICTIONARY).hyphenate_column(offsets, data)
+    assert Hyphenator(dictionary=DICTIONARY, engine="python").hyphenate_column(offsets, data) == native
+
+
+def test_python_engine_rejects_non_standard_hyphenation(tmp_path):
+    path = tmp_path / "hyph_rep.dic"
+    path.write_text("UTF-8\nschif1fahrt/ff=f,5,2\n" + PATTERNS, encoding="utf-8")
+    with pytest.raises(ValueError):
+        Hyphenator(dictionary=str(path), engine="python")
+
+
+def test_cli_verify(tmp_path, capsys):
+    words = tmp_path / "words.txt"
+    words.write_text("\n".join(_words(2000, seed=1)), encoding="utf-8")
+    main(["verify", "-d", DICTIONARY, str(words)])
+    assert "2000 of 2000 words hyphenated identically" in capsys.readouterr().err
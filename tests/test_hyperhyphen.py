@@ -1,4 +1,5 @@
 import os
+import threading
 import pytest
 from hyperhyphen import Hyphenator
 from hyperhyphen.core import whitespace_pattern
@@ -54,3 +55,438 @@ def test_hyperhyphen_strip_error():
 
     with pytest.raises(ValueError):
         h(" batmobile ")
+
+
+def test_hyperhyphen_lazy():
+    hs = Hyphenator(mode="str", language=LANGUAGE)
+    hp = Hyphenator(mode="spans", language=LANGUAGE)
+    hl = Hyphenator(mode="lazy", language=LANGUAGE)
+
+    words = """reconciliation microprocessing\t\tmiracle      messaging character 𱍊character 𱍊character𱍊"""
+    str_output = hs(words)
+    lazy_output = hl(words)
+
+    assert lazy_output == str_output
+    assert len(lazy_output) == len(str_output)
+    assert lazy_output[-1] == str_output[-1]
+    assert list(lazy_output[3:7]) == str_output[3:7]
+    assert lazy_output[::2] == str_output[::2]
+    assert list(lazy_output.spans()) == hp(words)
+
+    word_chunks = [list(word) for word in lazy_output.words()]
+    assert len(word_chunks) == 7
+    assert word_chunks[0] == ["recon", "cil", "i", "a", "tion"]
+    assert "".join(lazy_output[7:]) == words[lazy_output.span(7)[0]:]
+
+    # Spans of a slice stay within it
+    view = lazy_output[3:7]
+    assert view.span(0) == lazy_output.span(3) and view.span(-1) == lazy_output.span(6)
+    for i in (4, -5, len(lazy_output)):
+        with pytest.raises(IndexError):
+            view.span(i)
+
+
+def test_hyperhyphen_insert():
+    hs = Hyphenator(mode="str", language=LANGUAGE)
+    hi = Hyphenator(mode="insert", language=LANGUAGE, separator="=")
+
+    words = """Reconciliation MICROPROCESSING\t\tmiracle      messaging character 𱍊character 𱍊character𱍊"""
+    expected = re.sub(r"=(\s+)=", r"\1", "=".join(hs(words)))
+
+    assert hi(words) == expected
+    assert hi(words.encode('utf-8')) == expected.encode('utf-8')
+    assert hi(f"  {words}\n") == f"  {expected}\n"
+    assert Hyphenator(mode="insert", language=LANGUAGE)(words).replace("\u00ad", "") == words
+
+
+def test_compact_dictionary():
+    from hyperhyphen._lib import load_dictionary, dictionary_footprint, hyphenate_words_numbers
+
+    dictpath = str(DIR / "hyph_en_US.dic")
+    loose = load_dictionary(dictpath, compact=False)
+    compact = load_dictionary(dictpath)
+    assert dictionary_footprint(compact) < dictionary_footprint(loose)
+    assert Hyphenator(language=LANGUAGE).memory_footprint > 0
+
+    words = "reconciliation microprocessing miracle messaging character 𱍊character 𱍊character𱍊".split()
+    assert hyphenate_words_numbers(compact, words) == hyphenate_words_numbers(loose, words)
+
+
+def test_non_ascii_patterns(tmp_path):
+    from hyperhyphen._lib import load_dictionary, hyphenate_words_simple
+
+    # Transitions on bytes >= 0x80 match whatever the signedness of char on the platform
+    path = tmp_path / "hyph_utf8.dic"
+    path.write_text("UTF-8\nLEFTHYPHENMIN 1\nRIGHTHYPHENMIN 1\n1é1\n1ü1\nb1c\n", encoding="utf-8")
+    for compact in (False, True):
+        assert hyphenate_words_simple(load_dictionary(str(path), compact), ["abababécécéc", "ababcécü"]) == [
+            "ababab=é=c=é=céc", "abab=c=écü",
+        ]
+
+
+def _hyphenate_in_worker(args):
+    h, text = args
+    return h(text)
+
+
+def test_hyperhyphen_pickle(tmp_path):
+    import multiprocessing
+    import pickle
+
+    from hyperhyphen import build_index
+
+    index = tmp_path / "vocabulary.idx"
+    build_index(index, ["reconciliation"], str(DIR / "hyph_en_US.dic"))
+
+    words = "reconciliation microprocessing\t\tmiracle      messaging"
+    for mode in ("raw", "str", "int", "spans", "insert"):
+        h = Hyphenator(mode=mode, language=LANGUAGE, index=str(index))
+        clone = pickle.loads(pickle.dumps(h))
+        assert clone._dict is None
+        assert clone(words) == h(words)
+        assert clone.index.path == h.index.path
+
+    h = Hyphenator(mode="spans", language=LANGUAGE)
+    with multiprocessing.get_context("spawn").Pool(2) as pool:
+        assert pool.map(_hyphenate_in_worker, [(h, words)] * 4) == [h(words)] * 4
+
+
+def test_hyperhyphen_pickle_moved_dictionary(tmp_path):
+    import pickle
+
+    path = tmp_path / "hyph_custom.dic"
+    path.write_bytes((DIR / "hyph_en_US.dic").read_bytes())
+    data = pickle.dumps(Hyphenator(mode="int", dictionary=str(path)))
+    os.replace(path, tmp_path / "hyph_moved.dic")
+
+    # A dictionary given by path is never replaced by the installed dictionary of the language
+    clone = pickle.loads(data)
+    with pytest.raises(FileNotFoundError):
+        clone("reconciliation")
+
+
+def test_hyperhyphen_tokens():
+    from hyperhyphen._lib import hyphenate_words_numbers
+
+    h = Hyphenator(mode="int", language=LANGUAGE)
+    tokens = ["Reconciliation", "", "microprocessing", "miracle", "𱍊character"] * 2000
+    breaks, offsets = h.hyphenate_tokens(tokens)
+
+    expected = hyphenate_words_numbers(h.dict, ["reconciliation", "microprocessing", "miracle", "𱍊character"])
+    assert len(offsets) == len(tokens) + 1
+    assert breaks[offsets[0]:offsets[1]].tolist() == expected[0]
+    assert offsets[1] == offsets[2]
+    assert [breaks[offsets[i]:offsets[i + 1]].tolist() for i in range(2, 5)] == expected[1:]
+    assert len(breaks) == offsets[-1] == 2000 * offsets[5]
+
+    with pytest.raises(TypeError):
+        h.hyphenate_tokens(["reconciliation", 42])
+
+
+def test_hyperhyphen_breaks():
+    h = Hyphenator(mode="tokens", language=LANGUAGE)
+    hi = Hyphenator(mode="int", language=LANGUAGE)
+
+    for word in ("reconciliation", "Microprocessing", "𱍊character𱍊", "a", ""):
+        lens = hi(word) if word else [0]
+        positions = [sum(lens[:i + 1]) for i in range(len(lens) - 1)]
+        assert h.breaks(word) == tuple(positions)
+
+    assert h.breaks("reconciliation") == (5, 8, 9, 10)
+    assert h.break_before("reconciliation", 9) == 9
+    assert h.break_before("reconciliation", 7) == 5
+    assert h.break_before("reconciliation", 4) == 0
+    assert h.break_before("reconciliation", 100) == 10
+
+
+def test_hyperhyphen_breaks_and_insert_lowercase_like_str_mode(tmp_path):
+    # Uppercase letters that the native library leaves to Python to lowercase, among ones it lowercases itself
+    path = tmp_path / "hyph_cased.dic"
+    path.write_text("UTF-8\nLEFTHYPHENMIN 1\nRIGHTHYPHENMIN 1\n1ș1\n1ա1\n1ⴁ1\n1ς1\n1σ1\n1é1\n", encoding="utf-8")
+    words = ["ȘCOALĂȘCOALĂ", "ՀԱՅԱՍՏԱՆԱԱԱ", "ႠႡႢႠႡႢႡ", "ΟΔΟΣΟΔΟΣΟΔΟΣ", "ÉCOLEÉCOLE", "Școală"]
+    hs = Hyphenator(mode="str", dictionary=str(path))
+    ht = Hyphenator(mode="tokens", dictionary=str(path))
+    hi = Hyphenator(mode="insert", dictionary=str(path), separator="=")
+
+    for word in words:
+        chunks = hs(word)
+        positions = tuple(sum(map(len, chunks[:i + 1])) for i in range(len(chunks) - 1))
+        assert ht.breaks(word) == positions
+        assert ht.break_before(word, 7) == max((p for p in positions if p <= 7), default=0)
+        assert hi(word) == "=".join(chunks)
+    assert ht.breaks("ΟΔΟΣΟΔΟΣΟΔΟΣ") == (4, 7, 8)
+
+    text = "  ".join(words) + "\n"
+    assert hi(text) == "  ".join("=".join(hs(word)) for word in words) + "\n"
+    assert hi(text.encode("utf-8")) == hi(text).encode("utf-8")
+
+
+def test_hyperhyphen_priorities():
+    h = Hyphenator(mode="weighted", language=LANGUAGE)
+    hi = Hyphenator(mode="int", language=LANGUAGE)
+
+    text = "reconciliation  Microprocessing\t𱍊character𱍊 a"
+    lens, priorities = h(text)
+    assert lens == hi(text)
+    assert len(priorities) == len(lens)
+    assert priorities[:6].tolist() == [3, 3, 1, 1, 0, 0]
+    # Breaks have odd priorities, the ends of words and whitespace have none
+    for n, priority in zip(lens, priorities):
+        assert priority % 2 == 1 or priority == 0
+        if n < 0:
+            assert priority == 0
+
+    words = text.split()
+    breaks, offsets, levels = h.hyphenate_tokens(words, priorities=True)
+    assert breaks.tolist() == [n for n in lens if n > 0]
+    assert levels.tolist() == [p for n, p in zip(lens, priorities) if n > 0]
+    for word in words:
+        positions = h.breaks(word)
+        for min_priority in (1, 3, 5):
+            selected = h.breaks(word, min_priority)
+            assert set(selected) <= set(positions)
+            assert h.break_before(word, 100, min_priority) == (selected[-1] if selected else 0)
+
+    assert h.breaks("reconciliation", min_priority=3) == (5, 8)
+    assert h.break_before("reconciliation", 9, min_priority=3) == 8
+
+
+def test_hyperhyphen_tokenize_only():
+    h = Hyphenator(mode="tokens", language=LANGUAGE)
+    text = " reconciliation microprocessing\t\tmiracle "
+
+    tokens = h(text)
+    assert list(tokens) == [" ", "reconciliation", " ", "microprocessing", "\t\t", "miracle", " "]
+    assert [list(word) for word in tokens.words()] == [["reconciliation"], ["microprocessing"], ["miracle"]]
+    assert list(tokens.spans()) == [(1, 15), (16, 31), (33, 40)]
+    assert list(h("")) == []
+
+
+def test_hyperhyphen_buffer_reuse():
+    from hyperhyphen._lib import BufferPool, _new_buffer, hyphenate_words_numbers, hyphenate_words_simple
+
+    h = Hyphenator(mode="int", language=LANGUAGE)
+    words = ["reconciliation", "microprocessing", "miracle", "𱍊character𱍊"] * 50
+    expected = hyphenate_words_numbers(h.dict, words)
+
+    # A buffer too small for a single word is grown, a full buffer is emptied and reused
+    pool = BufferPool()
+    pool.release(_new_buffer(4), 4)
+    assert hyphenate_words_numbers(h.dict, words, pool) == expected
+    pool.release(_new_buffer(64), 64)
+    assert hyphenate_words_simple(h.dict, words, pool)[:2] == ["recon=cil=i=a=tion", "micro=pro=cess=ing"]
+
+    # Repeated calls of a hyphenator take their buffer from its pool
+    h(" ".join(words))
+    buffer, capacity = h._buffers._free[-1]
+    h(" ".join(words))
+    assert h._buffers._free[-1][0] is buffer
+
+    hi = Hyphenator(mode="insert", separator="=", language=LANGUAGE)
+    hi._buffers.release(_new_buffer(4), 4)
+    assert hi("Reconciliation  MICROPROCESSING") == "Recon=cil=i=a=tion  MICRO=PRO=CESS=ING"
+
+
+def test_hyperhyphen_nohyphen(tmp_path):
+    patterns = (DIR / "hyph_en_US.dic").read_text(encoding="utf-8").split("\n", 1)[1]
+    entries = ["on", "n", "ati", "ssi", "-", "'"]
+    plain = tmp_path / "hyph_plain.dic"
+    plain.write_text("UTF-8\n1-1\n1'1\nNEXTLEVEL\n" + patterns, encoding="utf-8")
+    nohyphen = tmp_path / "hyph_nohyphen.dic"
+    nohyphen.write_text(f"UTF-8\nNOHYPHEN {','.join(entries)}\n1-1\n1'1\nNEXTLEVEL\n" + patterns, encoding="utf-8")
+
+    words = ["reconciliation", "microprocessing", "nation", "assimilation", "well-known", "don't", "onion"]
+    hp = Hyphenator(mode="tokens", dictionary=str(plain))
+    hn = Hyphenator(mode="tokens", dictionary=str(nohyphen))
+    for word in words:
+        # No break right before or right after any occurrence of an entry, overlapping ones included
+        blocked = set()
+        for entry in entries:
+            blocked.update(p for i in range(len(word)) if word.startswith(entry, i) for p in (i, i + len(entry)))
+        assert hn.breaks(word) == tuple(p for p in hp.breaks(word) if p not in blocked)
+
+    assert hn.breaks("reconciliation") == (8, 10)
+
+
+def test_hyperhyphen_compound(tmp_path):
+    from hyperhyphen._lib import hyphenate_words_simple
+
+    patterns = (DIR / "hyph_en_US.dic").read_text(encoding="utf-8").split("\n", 1)[1]
+    stems = ["donau", "dampf", "schiff", "fahrt", "gesellschaft", "kapitän", "haus", "tür", "schlüssel"]
+    compound = tmp_path / "hyph_compound.dic"
+    compound.write_text("UTF-8\nCOMPOUNDLEFTHYPHENMIN 2\nCOMPOUNDRIGHTHYPHENMIN 2\n"
+                        + "".join(stem + "1\n" for stem in stems)
+                        + "schif1fahrt/ff=f,5,2\nNEXTLEVEL\n" + patterns, encoding="utf-8")
+
+    h = Hyphenator(mode="tokens", dictionary=str(compound))
+    words = ["donaudampfschiffahrtsgesellschaftskapitän", "haustürschlüssel", "schlüsselhaus", "dampfhaus",
+             "reconciliation", "schiffahrt"] * 300
+    # Segments shared by the words of a batch are hyphenated once, with the same result as word by word
+    breaks, offsets = h.hyphenate_tokens(words)
+    for i, word in enumerate(words[:6]):
+        lens = breaks[offsets[i]:offsets[i + 1]].tolist()
+        assert h.breaks(word) == tuple(sum(lens[:j + 1]) for j in range(len(lens) - 1))
+
+    assert h.breaks("haustürschlüssel") == (4, 7, 13)
+    # Words with the non-standard schiff-fahrt break are left as they are
+    assert hyphenate_words_simple(h.dict, words[:6]) == [
+        "donaudampfschiffahrtsgesellschaftskapitän", "haus=tür=schlüs=sel", "schlüs=sel=haus",
+        "dampf=haus", "recon=cil=i=a=tion", "schiffahrt",
+    ]
+
+
+def test_hyperhyphen_threads():
+    from concurrent.futures import ThreadPoolExecutor
+    from hyperhyphen._lib import load_dictionary
+
+    dictpath = str(DIR / "hyph_en_US.dic")
+    texts = [" ".join(["reconciliation", "microprocessing", "miracle", "𱍊character"][i % 4:] * (i + 1))
+             for i in range(64)]
+
+    with ThreadPoolExecutor(8) as pool:
+        # Concurrent first loads give the same dictionary
+        dicts = list(pool.map(lambda _: load_dictionary(dictpath, False), range(16)))
+        assert all(d is dicts[0] for d in dicts)
+
+        for mode in ("int", "raw", "insert"):
+            h = Hyphenator(mode=mode, dictionary=dictpath)
+            expected = [h(text) for text in texts]
+            assert list(pool.map(h, texts * 4)) == expected * 4
+
+    # Every thread reuses buffers of its own
+    h = Hyphenator(mode="int", dictionary=dictpath)
+    h(texts[-1])
+    buffers = []
+    thread = threading.Thread(target=lambda: (h(texts[-1]), buffers.extend(h._buffers._free)))
+    thread.start()
+    thread.join()
+    assert buffers and buffers[0][0] is not h._buffers._free[0][0]
+
+
+def test_hyperhyphen_reload(tmp_path, monkeypatch):
+    from hyperhyphen import _lib
+    from hyperhyphen.dictionaries import DictionaryManager
+
+    freed = []
+    free = _lib._free_owned
+    monkeypatch.setattr(_lib, "_free_owned", lambda dict_ptr: (freed.append(1), free(dict_ptr)))
+
+    contents = [(DIR / "hyph_en_US.dic").read_bytes(), b"UTF-8\n1c\n"]
+    expected = [(5, 8, 9, 10), (5,)]
+    manager = DictionaryManager(directory=tmp_path)
+    manager.storage.add_dictionary(LANGUAGE, contents[0])
+    h = Hyphenator(manager, language=LANGUAGE, mode="tokens")
+    hc = Hyphenator(manager, language=LANGUAGE, mode="int", cache=str(tmp_path / "results.db"))
+    assert hc("reconciliation") == [5, 3, 1, 1, 4]
+
+    # Installing a new version swaps it into the hyphenators in use, calls in progress are not disturbed
+    manager.downloader.download_dictionary = lambda url, **request_args: contents[installs[0] % 2]
+    installs = [0]
+    results = set()
+    stop = threading.Event()
+
+    def work():
+        while not stop.is_set():
+            results.add(h.breaks("reconciliation"))
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for installs[0] in range(1, 21):
+        manager.install(LANGUAGE, use_description=False, overwrite=True)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == set(expected)
+    assert h.breaks("reconciliation") == expected[0]
+    assert [p.name for p in tmp_path.glob("*.dic")] == ["hyph_en_US.dic"]
+    # The cached results of the previous dictionary are not used
+    installs[0] += 1
+    manager.install(LANGUAGE, use_description=False, overwrite=True)
+    assert h.breaks("reconciliation") == expected[1]
+    assert hc("reconciliation") == [5, 9]
+    del hc
+    # Every previous version was freed once unused
+    assert len(freed) == 21
+
+
+def test_install_languages_in_parallel(tmp_path):
+    from hyperhyphen.dictionaries import DictionaryManager
+
+    manager = DictionaryManager(directory=tmp_path)
+    content = (DIR / "hyph_en_US.dic").read_bytes()
+    # The downloads of two languages only get past the barrier if they run at the same time
+    barrier = threading.Barrier(2, timeout=10)
+    downloads = []
+
+    def download_dictionary(url, **request_args):
+        downloads.append(url)
+        barrier.wait()
+        return content
+
+    manager.downloader.download_dictionary = download_dictionary
+    languages = ["en_US", "en_GB", "en_US", "en_GB"]
+    threads = [threading.Thread(target=manager.install, args=(language, False)) for language in languages]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # Each language was downloaded once, by whichever thread came first
+    assert sorted(url.rsplit("/", 1)[1] for url in downloads) == ["hyph_en_GB.dic", "hyph_en_US.dic"]
+    assert sorted(manager.list_installed()) == ["en_GB", "en_US"]
+
+
+def test_dictionary_watcher(tmp_path):
+    from hyperhyphen import DictionaryWatcher
+
+    path = tmp_path / "hyph_en_US.dic"
+    path.write_bytes((DIR / "hyph_en_US.dic").read_bytes())
+    h = Hyphenator(mode="tokens", dictionary=str(path))
+    assert h.breaks("reconciliation") == (5, 8, 9, 10)
+
+    with DictionaryWatcher(interval=0.01) as watcher:
+        (tmp_path / "hyph_new.dic").write_bytes(b"UTF-8\n1c\n")
+        os.replace(tmp_path / "hyph_new.dic", path)
+        for _ in range(500):
+            if h.breaks("reconciliation") == (5,):
+                break
+            threading.Event().wait(0.01)
+        assert h.breaks("reconciliation") == (5,)
+        assert watcher.reloads == 1 and not watcher.errors
+        assert watcher.check() == 0
+
+
+def test_preload(tmp_path, monkeypatch):
+    from hyperhyphen import _lib, preload
+    from hyperhyphen.dictionaries import DictionaryManager
+
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"hyph_copy{i}.dic"
+        path.write_bytes((DIR / "hyph_en_US.dic").read_bytes() + f"% copy {i}\n".encode())
+        paths.append(str(path))
+
+    # The loads of the three copies only get past the barrier if they run at the same time
+    barrier = threading.Barrier(3, timeout=10)
+    open_dictionary = _lib.open_dictionary
+
+    def open_together(path, compact=True):
+        if path in paths:
+            barrier.wait()
+        return open_dictionary(path, compact)
+
+    monkeypatch.setattr(_lib, "open_dictionary", open_together)
+    loaded = preload([LANGUAGE], workers=3, dictionaries=paths[1:] + paths[:1],
+                     manager=DictionaryManager(directory=DIR))
+    assert list(loaded) == [LANGUAGE, *paths[1:], paths[0]]
+    assert loaded[paths[0]]['path'] == paths[0]
+    assert all(info['load_time'] >= 0 and info['memory'] > 0 for info in loaded.values())
+    assert all(loaded[path]['load_time'] > 0 for path in paths)
+
+    # Hyphenators of preloaded dictionaries load nothing, and neither does preloading them again
+    monkeypatch.setattr(_lib, "open_dictionary", None)
+    again = preload([LANGUAGE], dictionaries=paths, manager=DictionaryManager(directory=DIR))
+    assert [info['load_time'] for info in again.values()] == [0.0] * 4
+    for path in paths:
+        assert Hyphenator(mode="tokens", dictionary=path).breaks("reconciliation") == (5, 8, 9, 10)
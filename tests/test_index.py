@@ -0,0 +1,63 @@
+import os
+import pathlib
+
+import pytest
+
+from hyperhyphen import Hyphenator, VocabularyIndex, build_index
+from hyperhyphen._lib import load_dictionary, hyphenate_words_numbers
+from hyperhyphen.cache import dictionary_hash
+from hyperhyphen.dictionaries import DictionaryManager
+
+DIR = pathlib.Path(__file__).parent.resolve(strict=False)
+
+LANGUAGE = 'en_US'
+
+WORDS = ["reconciliation", "microprocessing", "Miracle", "messaging", "character", "𱍊character", "miracle"]
+
+
+def test_build_and_lookup(tmp_path):
+    dictpath = str(DIR / f"hyph_{LANGUAGE}.dic")
+    path = tmp_path / "vocabulary.idx"
+
+    assert build_index(path, WORDS, dictpath) == 6
+
+    expected = hyphenate_words_numbers(load_dictionary(dictpath), [w.lower() for w in WORDS])
+    with VocabularyIndex(path) as index:
+        assert len(index) == 6
+        assert list(index.words()) == sorted({w.lower() for w in WORDS})
+        assert [index.get(w.lower()) for w in WORDS] == expected
+        assert "miracle" in index
+        assert index.get("batmobile") is None
+
+
+def test_hyphenator_with_index(tmp_path):
+    manager = DictionaryManager(directory=DIR)
+    path = tmp_path / "vocabulary.idx"
+    build_index(path, WORDS[:3], manager.get_dictionary_path(LANGUAGE))
+
+    text = "reconciliation microprocessing\t\tmiracle      messaging character 𱍊character 𱍊character𱍊"
+    for mode in ("int", "str", "spans"):
+        plain = Hyphenator(manager, language=LANGUAGE, mode=mode)
+        indexed = Hyphenator(manager, language=LANGUAGE, mode=mode, index=str(path))
+        assert indexed(text) == plain(text)
+
+
+def test_index_of_another_dictionary(tmp_path):
+    dictpath = tmp_path / "hyph_en_US.dic"
+    dictpath.write_bytes((DIR / "hyph_en_US.dic").read_bytes())
+    path = tmp_path / "vocabulary.idx"
+    build_index(path, WORDS, str(dictpath))
+    with VocabularyIndex(path) as index:
+        assert index.dictionary_hash == dictionary_hash(dictpath)
+
+    other = tmp_path / "hyph_other.dic"
+    other.write_bytes(dictpath.read_bytes().replace(b"LEFTHYPHENMIN 2", b"LEFTHYPHENMIN 6"))
+    with pytest.raises(ValueError):
+        Hyphenator(mode="int", dictionary=str(other), index=str(path))
+
+    # After the dictionary is reloaded with other content, the index of the previous one is ignored
+    h = Hyphenator(mode="int", dictionary=str(dictpath), index=str(path))
+    assert h("reconciliation") == [5, 3, 1, 1, 4]
+    os.replace(other, dictpath)
+    h.reload()
+    assert h("reconciliation") == Hyphenator(mode="int", dictionary=str(dictpath))("reconciliation") == [8, 1, 1, 4]
@@ -0,0 +1,65 @@
+import io
+import pathlib
+
+from hyperhyphen import Hyphenator
+from hyperhyphen.markup import hyphenate_markup, stream_markup
+
+DIR = pathlib.Path(__file__).parent.resolve(strict=False)
+
+DICTIONARY = str(DIR / "hyph_en_US.dic")
+
+DOCUMENT = """<!DOCTYPE html><html><head><style>p < a { color: red }</style>
+<script>if (a<b) { reconciliation() }</script></head>
+<body><p class="reconciliation">Reconciliation &amp; microprocessing<b>character</b>istic
+<!-- reconciliation --> caf&eacute;s</p><pre>reconciliation</pre><code>microprocessing</code>
+<p>messaging<br/>organizational</p><![CDATA[reconciliation]]></body></html>"""
+
+
+def test_markup_soft_hyphens():
+    h = Hyphenator(dictionary=DICTIONARY)
+    output = hyphenate_markup(h, DOCUMENT)
+
+    assert output.replace("\u00ad", "") == DOCUMENT
+    assert "Recon\u00adcil\u00adi\u00ada\u00adtion &amp; micro\u00adpro\u00adcess\u00ading" in output
+    assert "<b>char\u00adac\u00adter</b>istic" in output
+    assert "<p>messag\u00ading<br/>orga\u00adni\u00adza\u00adtional</p>" in output
+    # Attributes, comments, CDATA and skipped elements are left alone
+    for part in ('class="reconciliation"', "<!-- reconciliation -->", "<pre>reconciliation</pre>",
+                 "<code>microprocessing</code>", "{ reconciliation() }", "<![CDATA[reconciliation]]>"):
+        assert part in output
+
+
+def test_markup_streaming():
+    h = Hyphenator(dictionary=DICTIONARY)
+    expected = hyphenate_markup(h, DOCUMENT, separator="&shy;", skip=("pre",))
+    assert "<code>micro&shy;pro&shy;cess&shy;ing</code>" in expected
+
+    for size in (1, 2, 5, 64):
+        chunks = [DOCUMENT[i:i + size] for i in range(0, len(DOCUMENT), size)]
+        streamed = stream_markup(h, chunks, separator="&shy;", skip=("pre",), batch_size=2)
+        assert "".join(streamed) == expected
+
+    f = io.StringIO(DOCUMENT)
+    assert "".join(stream_markup(h, f, separator="&shy;", skip=("pre",), chunk_size=7)) == expected
+
+
+def test_markup_streaming_bounded():
+    h = Hyphenator(dictionary=DICTIONARY)
+    for element in ("script", "pre"):
+        body = "var reconciliation = microprocessing(a < b);\n" * 60000
+        document = f"<html><body><{element}>{body}</{element}><p>reconciliation</p></body></html>"
+        chunks = [document[i:i + 1000] for i in range(0, len(document), 1000)]
+        read = []
+
+        def source():
+            for chunk in chunks:
+                read.append(chunk)
+                yield chunk
+
+        # Content that is copied verbatim is written out as it comes, not buffered up to the end
+        pieces = []
+        for piece in stream_markup(h, source(), separator="=", max_pending=1 << 16):
+            pieces.append((len(read), piece))
+        assert pieces[0][0] < len(chunks) // 10
+        assert max(len(piece) for _, piece in pieces) < (1 << 16) + 2000
+        assert "".join(piece for _, piece in pieces) == document.replace("<p>reconciliation", "<p>recon=cil=i=a=tion")
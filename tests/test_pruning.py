@@ -0,0 +1,78 @@
+import pathlib
+
+import pytest
+
+from hyperhyphen import Hyphenator
+from hyperhyphen.cli import main
+from hyperhyphen.pruning import measure_dictionary, profile_patterns, prune_dictionary, verify_dictionary
+
+DIR = pathlib.Path(__file__).parent.resolve(strict=False)
+
+DICTIONARY = str(DIR / "hyph_en_US.dic")
+
+SAMPLE = ("Reconciliation microprocessing miracle messaging character hyphenation dictionary automaton "
+          "reconciliation Characters MESSAGING").split()
+
+
+def test_prune_keeps_sample_hyphenation(tmp_path):
+    pruned = tmp_path / "pruned.dic"
+    profile = profile_patterns(DICTIONARY, SAMPLE)
+    kept, total = prune_dictionary(DICTIONARY, pruned, profile)
+
+    assert len(profile) == 1 and profile[0]
+    assert 0 < kept < total / 10
+    assert verify_dictionary(DICTIONARY, pruned, SAMPLE) == []
+
+    full = Hyphenator(mode="str", dictionary=DICTIONARY)
+    small = Hyphenator(mode="str", dictionary=str(pruned))
+    assert small(' '.join(SAMPLE)) == full(' '.join(SAMPLE))
+    assert small.memory_footprint < full.memory_footprint
+
+    # Words outside the sample are not guaranteed to be hyphenated the same
+    assert verify_dictionary(DICTIONARY, pruned, ["encyclopedia", "reconciliation"]) == ["encyclopedia"]
+
+
+def test_prune_two_levels(tmp_path):
+    dictionary = tmp_path / "hyph_xx.dic"
+    dictionary.write_text(
+        "UTF-8\nLEFTHYPHENMIN 2\nRIGHTHYPHENMIN 2\n% first level\n1ba\na1b\nx1y\nNEXTLEVEL\nc1d\nz1z\n",
+        encoding='utf-8',
+    )
+    pruned = tmp_path / "pruned.dic"
+    profile = profile_patterns(dictionary, ["abab", "ccdd"])
+
+    assert [set(level) for level in profile] == [{b"a", b"b", b"ba", b"ab"}, {b"c", b"cd"}]
+    assert prune_dictionary(dictionary, pruned, profile) == (3, 5)
+    assert pruned.read_text(encoding='utf-8') == (
+        "UTF-8\n% pruned for a corpus by hyperhyphen\nLEFTHYPHENMIN 2\nRIGHTHYPHENMIN 2\n1ba\na1b\na\nb\n"
+        "NEXTLEVEL\nc1d\nc\n"
+    )
+    assert verify_dictionary(dictionary, pruned, ["abab", "ccdd"]) == []
+
+
+def test_prune_profile_mismatch(tmp_path):
+    with pytest.raises(ValueError):
+        prune_dictionary(DICTIONARY, tmp_path / "pruned.dic", [{}, {}])
+
+
+def test_measure_dictionary():
+    measured = measure_dictionary(DICTIONARY, SAMPLE, repeat=2)
+    assert measured['load_time'] > 0
+    assert measured['memory'] > 0
+    assert measured['words_per_second'] > 0
+
+
+def test_cli_prune(tmp_path, capsys):
+    sample = tmp_path / "sample.txt"
+    sample.write_text(' '.join(SAMPLE) + '\n', encoding='utf-8')
+    pruned = tmp_path / "pruned.dic"
+
+    main(["prune", "-d", DICTIONARY, "-o", str(pruned), str(sample), "--held-out", str(sample)])
+    err = capsys.readouterr().err
+    assert f"{len(SAMPLE)} of {len(SAMPLE)} held-out words hyphenated identically" in err
+    assert "throughput" in err
+
+    with pytest.raises(SystemExit):
+        held_out = tmp_path / "held_out.txt"
+        held_out.write_text("encyclopedia\n", encoding='utf-8')
+        main(["prune", "-d", DICTIONARY, "-o", str(pruned), str(sample), "--held-out", str(held_out)])
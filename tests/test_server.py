@@ -0,0 +1,128 @@
+import pathlib
+import socket
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from hyperhyphen import Hyphenator
+from hyperhyphen import server as server_module
+from hyperhyphen.server import HyphenationClient, HyphenationServer
+
+DIR = pathlib.Path(__file__).parent.resolve(strict=False)
+
+DICTIONARY = str(DIR / "hyph_en_US.dic")
+
+WORDS = ["Reconciliation", "microprocessing", "", "a", "𱍊character𱍊", "MIRACLE"]
+
+
+def test_server(tmp_path):
+    h = Hyphenator(mode="tokens", dictionary=DICTIONARY)
+    address = str(tmp_path / "hyperhyphen.sock")
+    with HyphenationServer(address, {"en_US": DICTIONARY}) as server, HyphenationClient(address) as client:
+        assert client.hyphenate(WORDS) == h.hyphenate_tokens(WORDS)
+        assert client.hyphenate(WORDS, "en_US") == h.hyphenate_tokens(WORDS)
+        assert client.hyphenate([]) == h.hyphenate_tokens([])
+
+        # Pipelined requests of many threads are hyphenated together
+        requests = [WORDS[i % 6:] * (i % 5) for i in range(2000)]
+        with ThreadPoolExecutor(8) as pool:
+            futures = list(pool.map(client.submit, requests))
+        assert [future.result() for future in futures] == [h.hyphenate_tokens(words) for words in requests]
+        assert server.requests == 2003
+        assert server.batches < server.requests
+
+        with pytest.raises(RuntimeError, match="Unknown dictionary: de"):
+            client.hyphenate(WORDS, "de")
+
+        # A request whose word count does not match its words is rejected
+        with socket.socket(socket.AF_UNIX) as sock:
+            sock.connect(address)
+            body = struct.pack('<IIH', 7, 3, 0) + b"one\0two"
+            sock.sendall(struct.pack('<I', len(body)) + body)
+            size, = struct.unpack('<I', sock.recv(4))
+            response = sock.recv(size)
+            assert struct.unpack_from('<IB', response) == (7, 1)
+            assert response[5:].decode() == "Expected 3 words separated by zero bytes"
+
+    assert not pathlib.Path(address).exists()
+    # The server went away
+    with pytest.raises(OSError):
+        client.hyphenate(WORDS)
+
+
+def test_server_tcp():
+    h = Hyphenator(mode="tokens", dictionary=DICTIONARY)
+    with HyphenationServer(("127.0.0.1", 0), {"en_US": DICTIONARY}, workers=2) as server:
+        assert server.address[1] != 0
+        with HyphenationClient(server.address, connections=2) as client:
+            futures = [client.submit(WORDS[i % 6:]) for i in range(100)]
+            assert [future.result() for future in futures] == [h.hyphenate_tokens(WORDS[i % 6:]) for i in range(100)]
+
+
+def _request(request_id, words):
+    body = struct.pack('<IIH', request_id, len(words), 0) + "\0".join(words).encode()
+    return struct.pack('<I', len(body)) + body
+
+
+def _recv_exactly(sock, size):
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("Connection closed")
+        data += chunk
+    return data
+
+
+def _recv_frame(sock):
+    size, = struct.unpack('<I', _recv_exactly(sock, 4))
+    return _recv_exactly(sock, size)
+
+
+@pytest.mark.parametrize("failing", [False, True])
+def test_server_bounds_requests_in_flight(tmp_path, monkeypatch, failing):
+    monkeypatch.setattr(server_module, "MAX_IN_FLIGHT", 2)
+    if failing:
+        def _hyphenate(hyphenator, requests):
+            raise RuntimeError("hyphenation failed")
+        monkeypatch.setattr(HyphenationServer, "_hyphenate", staticmethod(_hyphenate))
+
+    address = str(tmp_path / "hyperhyphen.sock")
+    with HyphenationServer(address, {"en_US": DICTIONARY}), socket.socket(socket.AF_UNIX) as sock:
+        sock.connect(address)
+        # Many more pipelined requests than may be in flight, the responses are read afterwards
+        sock.sendall(b"".join(_request(i, WORDS[:2]) for i in range(50)))
+        sock.settimeout(10)
+        statuses = [struct.unpack_from('<IB', _recv_frame(sock)) for _ in range(50)]
+    assert sorted(statuses) == [(i, 1 if failing else 0) for i in range(50)]
+
+
+@pytest.mark.parametrize("response", [
+    b"\x01\x02\x03",                                             # shorter than its header
+    struct.pack('<IBI', 0, 0, 1000) + b"\0" * 8,                   # more words than the frame holds
+    struct.pack('<IBI', 0, 0, 0) + b"\0" * 6,                      # not whole int32 values
+])
+def test_client_malformed_response(tmp_path, response):
+    address = str(tmp_path / "fake.sock")
+    listener = socket.socket(socket.AF_UNIX)
+    listener.bind(address)
+    listener.listen()
+
+    def serve():
+        connection, _ = listener.accept()
+        with connection:
+            _recv_frame(connection)
+            connection.sendall(struct.pack('<I', len(response)) + response)
+            connection.recv(1)
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    with HyphenationClient(address, connections=1) as client:
+        future = client.submit(WORDS)
+        # The future fails instead of waiting forever for a response that will not come
+        with pytest.raises(ConnectionError, match="Malformed response"):
+            future.result(timeout=10)
+    thread.join(10)
+    listener.close()